@@ -0,0 +1,27 @@
+import argparse
+import datetime
+from decimal import Decimal
+
+import numpy as np
+import simplejson as json
+
+from models.Backtest import Backtest, PriceSeries
+import main
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Replay a price series (csv or Bitvavo candles json) through the trailing alert rules.')
+    parser.add_argument('file', help='csv with dt or timestamp and price or close columns, or candles json')
+    parser.add_argument('--market', default=None, help='market of csv rows with a market column')
+    parser.add_argument('--trailing-percentages', type=Decimal, nargs='+', default=[Decimal('0.9')])
+    parser.add_argument('--start', type=datetime.datetime.fromisoformat, default=None, help='alert is set at the first price from, ISO datetime')
+    args = parser.parse_args()
+
+    series = PriceSeries.load(args.file, args.market)
+    start = 0
+
+    if args.start is not None:
+        start = int(np.searchsorted(series.dt, np.datetime64(args.start, 'ms')))
+
+    for result in Backtest(series=series).run_many(args.trailing_percentages, start):
+        print(json.dumps(result.attributes(), sort_keys=True, default=str))
@@ -0,0 +1,64 @@
+import datetime
+import random
+from decimal import Decimal
+
+from models.Alert import Alert
+from simulator.fake_exchange import PriceFeed
+
+
+def get_markets(count: int):
+    return ['M' + str(idx) + '-EUR' for idx in range(count)]
+
+
+def get_alert(rnd: random.Random, status: str, market: str, ticker_price: Decimal, actions: list = None):
+    """
+    Same relations as get_alert of tests/test_alert_handler_logic.py, drawn by random.Random around the ticker price
+    instead of by Faker, which is too slow for a million alerts
+    """
+    places = Decimal(1).scaleb(ticker_price.as_tuple().exponent)
+    trailing_percentage = Decimal('0.' + str(rnd.randint(70, 97)))
+
+    price = (ticker_price * Decimal(str(1 + rnd.uniform(0, 0.05)))).quantize(places)
+    init_price = (price * Decimal(str(1 + rnd.uniform(0, 0.05)))).quantize(places)
+
+    if status == Alert.STATUS_HIT:
+        trailing_price = price * trailing_percentage
+    else:
+        trailing_price = (price * trailing_percentage * Decimal(str(1 - rnd.uniform(0, 0.05)))).quantize(places)
+
+    dt = datetime.datetime(2021, 5, 1) + datetime.timedelta(seconds=rnd.randint(0, 86400 * 365), microseconds=1)
+
+    return Alert(
+        amount=None,
+        actions=actions or [],
+        dt=dt,
+        init_dt=dt,
+        init_price=init_price,
+        market=market,
+        price=price,
+        status=status,
+        trailing_percentage=trailing_percentage,
+        trailing_price=trailing_price
+    )
+
+
+def get_book(count: int, feed: PriceFeed, hit_ratio: float = 0.0, seed: int = 1, actions: list = None):
+    """
+    Alerts spread round robin over the markets of the feed
+    :param count: number of alerts
+    :param feed: prices the alerts are set around
+    :param hit_ratio: share of alerts already hit
+    :param seed:
+    :param actions: actions of all alerts
+    :return: list of alerts
+    """
+    rnd = random.Random(seed)
+    alerts = []
+
+    for idx in range(count):
+        market = feed.markets[idx % len(feed.markets)]
+        status = Alert.STATUS_HIT if rnd.random() < hit_ratio else Alert.STATUS_ACTIVE
+
+        alerts.append(get_alert(rnd, status, market, feed.get_price(market), actions))
+
+    return alerts
@@ -0,0 +1,52 @@
+import argparse
+import datetime
+import gc
+import tracemalloc
+from decimal import Decimal
+
+from models.Alert import Alert
+
+
+def get_alert(idx: int):
+    """
+    Alert as loaded from a store, every value a distinct object
+    """
+    dt = datetime.datetime(2021, 5, 1) + datetime.timedelta(seconds=idx)
+
+    return Alert(
+        amount=None,
+        actions=['send_email', 'sell_asset'] if idx % 2 else ['send_email'],
+        dt=dt,
+        init_dt=dt - datetime.timedelta(days=1),
+        init_price=Decimal(str(1000 + idx % 1000)),
+        market=''.join(['M', str(idx % 100), '-EUR']),
+        price=Decimal(str(1000 + idx % 1000)) + 1,
+        status=Alert.STATUS_ACTIVE,
+        trailing_percentage=Decimal('0.9'),
+        trailing_price=Decimal(str(900 + idx % 1000))
+    )
+
+
+def run(count: int):
+    gc.collect()
+    tracemalloc.start()
+
+    alerts = [get_alert(idx) for idx in range(count)]
+
+    gc.collect()
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'alerts': len(alerts),
+        'bytes': size,
+        'bytes_per_alert': size / count
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Memory held per Alert, values included.')
+    parser.add_argument('--alerts', type=int, default=1000000)
+    args = parser.parse_args()
+
+    print(run(args.alerts))
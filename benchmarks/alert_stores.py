@@ -0,0 +1,88 @@
+import argparse
+import datetime
+import tempfile
+import time
+from decimal import Decimal
+
+from models.Alert import Alert
+from models.stores.BinaryAlertStore import BinaryAlertStore
+from models.stores.JsonAlertStore import JsonAlertStore
+from models.stores.SqliteAlertStore import SqliteAlertStore
+
+
+def get_alerts(count: int):
+    alerts = []
+
+    for idx in range(count):
+        alerts.append(Alert(
+            amount=None,
+            actions=[],
+            dt=datetime.datetime.now(),
+            init_dt=datetime.datetime.now(),
+            init_price=Decimal('1000'),
+            market='M' + str(idx % 100) + '-EUR',
+            price=Decimal('1000'),
+            status=Alert.STATUS_ACTIVE if idx % 10 else Alert.STATUS_HIT,
+            trailing_percentage=Decimal('0.5'),
+            trailing_price=Decimal('500')
+        ))
+
+    return alerts
+
+
+def get_stores(file_path: str):
+    return {
+        'json': JsonAlertStore(file_path=file_path, file_name='alerts.json'),
+        'json_journal': JsonAlertStore(file_path=file_path, file_name='alerts_j.json', journal_file_name='alerts.journal'),
+        'sqlite': SqliteAlertStore(file_path=file_path + 'alerts.sqlite'),
+        'binary': BinaryAlertStore(file_path=file_path, file_name='alerts_b.json', binary_file_name='alerts.bin')
+    }
+
+
+def run(count: int, changed: int):
+    """
+    Load and save durations of every store, saving after `changed` alerts changed their price
+    """
+    results = []
+
+    for name, store in get_stores(tempfile.mkdtemp() + '/').items():
+        if isinstance(store, SqliteAlertStore):
+            store.import_alerts(get_alerts(count))
+        else:
+            store.save_snapshot(get_alerts(count))
+
+        started = time.perf_counter()
+        alerts = store.load()
+        load_seconds = time.perf_counter() - started
+
+        changed_attributes = {}
+
+        for alert in alerts[:changed]:
+            alert.price += 1
+            changed_attributes[alert._id] = {'price'}
+
+        started = time.perf_counter()
+        store.save(alerts, changed_attributes)
+        save_seconds = time.perf_counter() - started
+
+        results.append({
+            'store': name,
+            'alerts': count,
+            'loaded': len(alerts),
+            'changed': changed,
+            'load_seconds': load_seconds,
+            'save_seconds': save_seconds
+        })
+
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Load and save durations of alert stores.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 100000, 1000000])
+    parser.add_argument('--changed', type=int, default=100)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        for result in run(size, args.changed):
+            print(result)
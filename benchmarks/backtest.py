@@ -0,0 +1,46 @@
+import argparse
+import time
+from decimal import Decimal
+
+import numpy as np
+
+from models.Backtest import Backtest, PriceSeries
+
+
+def get_series(years: float, seed: int = 1):
+    """
+    Random walk of minute prices with 2 decimal places, built as scaled ints without Decimal
+    """
+    count = int(years * 365 * 24 * 60)
+    rnd = np.random.default_rng(seed)
+
+    price = np.maximum(1, np.round(100000 * np.exp(np.cumsum(rnd.normal(0, 0.001, count))))).astype(np.int64)
+    dt = (np.int64(1609459200000) + np.arange(count, dtype=np.int64) * 60000).astype('datetime64[ms]')
+
+    return PriceSeries(market='M0-EUR', scale=2, dt=dt, price=price)
+
+
+def run(years: float, trailing_percentages: list):
+    series = get_series(years)
+
+    started = time.perf_counter()
+    results = Backtest(series=series).run_many(trailing_percentages)
+    seconds = time.perf_counter() - started
+
+    return {
+        'years': years,
+        'prices': len(series),
+        'trailing_percentages': len(trailing_percentages),
+        'seconds': seconds,
+        'prices_per_second': len(series) * len(trailing_percentages) / seconds,
+        'hit': sum(result.hit for result in results)
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Backtest speed on years of minute prices of one market.')
+    parser.add_argument('--years', type=float, default=5)
+    parser.add_argument('--trailing-percentages', type=Decimal, nargs='+', default=[Decimal('0.5'), Decimal('0.7'), Decimal('0.9')])
+    args = parser.parse_args()
+
+    print(run(args.years, args.trailing_percentages))
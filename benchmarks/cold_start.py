@@ -0,0 +1,137 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import simplejson as json
+
+from benchmarks.alert_books import get_book, get_markets
+from models.stores.JsonAlertStore import JsonAlertStore
+from simulator.fake_exchange import PriceFeed
+from simulator.rest_server import FakeRestServer
+
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# modules a tick without hits must not load
+HEAVY_MODULES = [
+    'requests',
+    'python_bitvavo_api',
+    'websocket',
+    'smtplib',
+    'email.mime',
+    'numpy',
+    'http.server',
+    'concurrent.futures'
+]
+
+# runs handle_alerts.py like cron does, then prints the loaded modules
+PROBE = (
+    'import runpy, sys\n'
+    'runpy.run_path("handle_alerts.py", run_name="__main__")\n'
+    'print("\\n".join(sorted(sys.modules)))\n'
+)
+
+
+def get_env(alerts_file_path: str, server: FakeRestServer):
+    env = dict(os.environ)
+
+    for key in ['APIKEY', 'APISECRET', 'NEW_ALERTS_FILE_NAME', 'ALERTS_JOURNAL_FILE_NAME', 'ALERT_STORE', 'ALERT_ENGINE',
+                'HTTP_TRANSPORT', 'PRICE_HISTORY_PATH', 'NOTIFICATION_OUTBOX_PATH', 'METRICS_FILE']:
+        env.pop(key, None)
+
+    env['ALERTS_FILE_PATH'] = alerts_file_path
+    env['ALERTS_FILE_NAME'] = 'alerts.json'
+    env['BITVAVO_REST_URL'] = server.get_bitvavo_url()
+    env['CRYPTOWATCH_URL'] = server.get_cryptowatch_url()
+    env['LOGGING_LEVEL'] = 'ERROR'
+
+    return env
+
+
+def get_seconds(args: list, env: dict):
+    started = time.perf_counter()
+
+    subprocess.run([sys.executable] + args, cwd=ROOT_PATH, env=env, check=True, stdout=subprocess.DEVNULL)
+
+    return time.perf_counter() - started
+
+
+def get_median_seconds(args: list, env: dict, runs: int):
+    return statistics.median(get_seconds(args, env) for idx in range(runs))
+
+
+def get_loaded_modules(env: dict):
+    """
+    :return: heavy modules loaded by a run of handle_alerts.py
+    """
+    r = subprocess.run([sys.executable, '-c', PROBE], cwd=ROOT_PATH, env=env, check=True, capture_output=True, text=True)
+    modules = r.stdout.split()
+
+    return [module for module in HEAVY_MODULES if module in modules]
+
+
+def run(alerts_count: int, markets_count: int, runs: int):
+    """
+    Runs of handle_alerts.py in new processes, as started by cron, against the local REST simulator.
+    Prices stay the same, so no alert is hit
+    :return: median seconds of an empty interpreter, of the imports of handle_alerts and of a whole tick
+    """
+    markets = get_markets(markets_count)
+    feed = PriceFeed(markets=markets)
+    server = FakeRestServer(price_paths={market: [str(feed.get_price(market))] for market in markets}).start()
+
+    alerts_file_path = tempfile.mkdtemp() + '/'
+    JsonAlertStore(file_path=alerts_file_path, file_name='alerts.json').save_snapshot(get_book(alerts_count, feed))
+
+    env = get_env(alerts_file_path, server)
+
+    try:
+        interpreter_seconds = get_median_seconds(['-c', 'pass'], env, runs)
+        import_seconds = get_median_seconds(['-c', 'import handle_alerts'], env, runs)
+        tick_seconds = get_median_seconds(['handle_alerts.py'], env, runs)
+        loaded_modules = get_loaded_modules(env)
+    finally:
+        server.stop()
+
+    return {
+        'alerts': alerts_count,
+        'markets': markets_count,
+        'runs': runs,
+        'interpreter_seconds': interpreter_seconds,
+        'import_seconds': import_seconds - interpreter_seconds,
+        'tick_seconds': tick_seconds,
+        'heavy_modules_loaded': loaded_modules
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Cold start of a cron run of handle_alerts.py without hits, fails over budget.')
+    parser.add_argument('--alerts', type=int, default=100)
+    parser.add_argument('--markets', type=int, default=10)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget', type=float, default=0.5, help='seconds of a whole tick, median of runs')
+    parser.add_argument('--import-budget', type=float, default=0.15, help='seconds of the imports over an empty interpreter')
+    args = parser.parse_args()
+
+    result = run(args.alerts, args.markets, args.runs)
+
+    print(json.dumps(result, indent=4))
+
+    failures = []
+
+    if result['tick_seconds'] > args.budget:
+        failures.append('tick %.3fs over budget of %.3fs' % (result['tick_seconds'], args.budget))
+
+    if result['import_seconds'] > args.import_budget:
+        failures.append('imports %.3fs over budget of %.3fs' % (result['import_seconds'], args.import_budget))
+
+    if result['heavy_modules_loaded']:
+        failures.append('loaded ' + ', '.join(result['heavy_modules_loaded']))
+
+    if failures:
+        print('COLD_START:OVER_BUDGET:' + '; '.join(failures), file=sys.stderr)
+
+        sys.exit(1)
@@ -0,0 +1,53 @@
+import argparse
+
+import simplejson as json
+
+from benchmarks.suite import get_key
+
+
+def compare(baseline: dict, current: dict):
+    """
+    :return: list of (key, baseline mean, current mean, ratio) of results in both reports
+    """
+    baseline_results = {get_key(result): result for result in baseline['results']}
+    rows = []
+
+    for result in current['results']:
+        key = get_key(result)
+
+        if key not in baseline_results:
+            continue
+
+        baseline_mean = baseline_results[key]['seconds']['mean']
+        current_mean = result['seconds']['mean']
+
+        rows.append((key, baseline_mean, current_mean, current_mean / baseline_mean if baseline_mean else None))
+
+    return rows
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare mean durations of two benchmark suite results.')
+    parser.add_argument('baseline')
+    parser.add_argument('current')
+    parser.add_argument('--threshold', type=float, default=1.2, help='ratio reported as regression')
+    args = parser.parse_args()
+
+    with open(args.baseline, 'r') as fp:
+        baseline = json.load(fp)
+
+    with open(args.current, 'r') as fp:
+        current = json.load(fp)
+
+    regressions = 0
+
+    for key, baseline_mean, current_mean, ratio in compare(baseline, current):
+        flag = ''
+
+        if ratio is not None and ratio >= args.threshold:
+            flag = ' REGRESSION'
+            regressions += 1
+
+        print('%s: %.4fs -> %.4fs (x%.2f)%s' % ('/'.join(map(str, key)), baseline_mean, current_mean, ratio or 0, flag))
+
+    exit(1 if regressions else 0)
@@ -0,0 +1,117 @@
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.alert_books import get_book, get_markets
+from models.Alert import Alert
+from models.AlertHandler import AlertHandler
+from models.clients.Bitvavo import BitvavoClient
+from models.clients.HttpSession import HttpSession
+from simulator.fake_exchange import PriceFeed
+from simulator.rest_server import FakeRestServer
+
+
+def get_percentile(values: list, percentile: float):
+    if not values:
+        return None
+
+    values = sorted(values)
+
+    return values[min(len(values) - 1, int(len(values) * percentile))]
+
+
+def run(alerts_count: int, markets_count: int, ticks: int, hit_tick: int, **server_options):
+    """
+    Ticks against the local REST simulator, prices of all markets drop below every trailing price at hit_tick
+    :return: tick durations and latency from start of the hit tick to each order arriving at the simulator
+    """
+    markets = get_markets(markets_count)
+    feed = PriceFeed(markets=markets)
+    price_paths = {market: [str(feed.get_price(market))] * hit_tick + [str(feed.get_price(market) / 2)] for market in markets}
+
+    server = FakeRestServer(price_paths=price_paths, **server_options).start()
+
+    os.environ['BITVAVO_REST_URL'] = server.get_bitvavo_url()
+    os.environ['CRYPTOWATCH_URL'] = server.get_cryptowatch_url()
+    os.environ['APIKEY'] = 'benchmark'
+    os.environ['APISECRET'] = 'benchmark'
+    HttpSession.close()
+
+    ah = AlertHandler(
+        alerts_file_path=tempfile.mkdtemp() + '/',
+        alerts_file_name='alerts.json',
+        new_alert_file_name=None,
+        alerts=get_book(alerts_count, feed, actions=[Alert.ACTION_SELL_ASSET]),
+        gap_seconds=0,
+        _client=BitvavoClient()
+    )
+
+    tick_seconds = []
+    tick_started = []
+    failed = 0
+
+    try:
+        for idx in range(ticks):
+            started = time.perf_counter()
+            tick_started.append(started)
+
+            ah._client.reset_responses()
+
+            try:
+                ah.update_alerts()
+            except Exception:
+                failed += 1
+
+            tick_seconds.append(time.perf_counter() - started)
+    finally:
+        server.stop()
+        HttpSession.close()
+
+    hit_started = tick_started[hit_tick] if len(tick_started) > hit_tick else None
+    order_latencies = [order[0] - hit_started for order in server.orders] if hit_started is not None else []
+    statuses = [request[3] for request in server.requests]
+
+    return {
+        'alerts': alerts_count,
+        'markets': markets_count,
+        'ticks': ticks,
+        'failed_ticks': failed,
+        'ticks_per_second': len(tick_seconds) / sum(tick_seconds),
+        'tick_seconds_p50': get_percentile(tick_seconds, 0.5),
+        'tick_seconds_p95': get_percentile(tick_seconds, 0.95),
+        'orders': len(server.orders),
+        'hit_to_order_seconds_p50': get_percentile(order_latencies, 0.5),
+        'hit_to_order_seconds_p95': get_percentile(order_latencies, 0.95),
+        'hit_to_order_seconds_max': max(order_latencies) if order_latencies else None,
+        'requests': len(statuses),
+        'rate_limited_requests': statuses.count(429)
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Tick throughput and hit to order latency against the local REST simulator.')
+    parser.add_argument('--alerts', type=int, default=100)
+    parser.add_argument('--markets', type=int, default=10)
+    parser.add_argument('--ticks', type=int, default=5)
+    parser.add_argument('--hit-tick', type=int, default=3, help='tick all alerts are hit')
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--latency-distribution', default=FakeRestServer.LATENCY_LOGNORMAL)
+    parser.add_argument('--rate-limit', type=int, default=None)
+    parser.add_argument('--rate-limit-ratio', type=float, default=0.0)
+    parser.add_argument('--timeout-ratio', type=float, default=0.0)
+    parser.add_argument('--timeout-seconds', type=float, default=30.0)
+    args = parser.parse_args()
+
+    print(run(
+        args.alerts,
+        args.markets,
+        args.ticks,
+        args.hit_tick,
+        latency=args.latency,
+        latency_distribution=args.latency_distribution,
+        rate_limit=args.rate_limit,
+        rate_limit_ratio=args.rate_limit_ratio,
+        timeout_ratio=args.timeout_ratio,
+        timeout_seconds=args.timeout_seconds
+    ))
@@ -0,0 +1,71 @@
+import argparse
+import copy
+import time
+
+from models.Alert import Alert
+from models.FixedPointAlertEngine import FixedPointAlertEngine
+from benchmarks.alert_books import get_book, get_markets
+from simulator.fake_exchange import PriceFeed
+
+
+def run(count: int, markets_count: int, ticks: int, seed: int = 1):
+    """
+    Evaluation throughput of the Decimal path of Alert against the fixed point engine on the same book and ticks,
+    results of both are compared alert by alert
+    """
+    feed = PriceFeed(markets=get_markets(markets_count), seed=seed)
+    alerts = get_book(count, feed, seed=seed)
+    decimal_alerts = copy.deepcopy(alerts)
+
+    snapshots = []
+
+    for idx in range(ticks):
+        feed.step()
+        snapshots.append({market: feed.get_price(market) for market in feed.markets})
+
+    started = time.perf_counter()
+
+    for ticker_prices in snapshots:
+        for alert in decimal_alerts:
+            alert.update_by_client(ticker_prices[alert.market])
+
+    decimal_seconds = time.perf_counter() - started
+
+    engine = FixedPointAlertEngine(precisions={market: 5 for market in feed.markets})
+    engine.load(alerts)
+
+    started = time.perf_counter()
+
+    for ticker_prices in snapshots:
+        engine.update(ticker_prices)
+
+    fixed_seconds = time.perf_counter() - started
+
+    engine.sync_alerts()
+
+    mismatches = sum(
+        1 for alert, decimal_alert in zip(alerts, decimal_alerts)
+        if (alert.status, alert.price, alert.trailing_price) != (decimal_alert.status, decimal_alert.price, decimal_alert.trailing_price)
+    )
+
+    return {
+        'alerts': count,
+        'markets': markets_count,
+        'ticks': ticks,
+        'decimal_alerts_per_second': count * ticks / decimal_seconds,
+        'fixed_alerts_per_second': count * ticks / fixed_seconds,
+        'speedup': decimal_seconds / fixed_seconds,
+        'hit': sum(1 for alert in alerts if alert.status == Alert.STATUS_HIT),
+        'mismatches': mismatches
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Evaluation throughput of the Decimal path against the fixed point engine.')
+    parser.add_argument('--alerts', type=int, default=100000)
+    parser.add_argument('--markets', type=int, default=20)
+    parser.add_argument('--ticks', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    print(run(args.alerts, args.markets, args.ticks, args.seed))
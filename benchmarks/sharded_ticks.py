@@ -0,0 +1,123 @@
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from decimal import Decimal
+
+import simplejson as json
+
+from benchmarks.alert_books import get_alert, get_book, get_markets
+from models.Alert import Alert
+from models.ShardedAlertHandler import ShardedAlertHandler
+from models.stores.JsonAlertStore import JsonAlertStore
+from simulator.fake_exchange import PriceFeed
+
+
+def get_alerts(alerts_count: int, feed: PriceFeed, hot_ratio: float):
+    """
+    :param hot_ratio: share of alerts in the first market of the feed on top of the alerts spread over all markets
+    :return: list of alerts
+    """
+    hot_count = int(alerts_count * hot_ratio)
+    rnd = random.Random(2)
+    hot_market = feed.markets[0]
+
+    alerts = get_book(alerts_count - hot_count, feed)
+    alerts.extend(get_alert(rnd, Alert.STATUS_ACTIVE, hot_market, feed.get_price(hot_market)) for idx in range(hot_count))
+
+    return alerts
+
+
+def run(alerts_count: int, markets_count: int, shards: int, ticks: int, hot_ratio: float, alert_engine: str):
+    """
+    Ticks of a sharded handler, each waited for until all shards evaluated it. Prices rise every tick, so every
+    alert is updated and none is hit
+    :return: alerts evaluated per second and seconds from sending a snapshot until each shard is done with it
+    """
+    markets = get_markets(markets_count)
+    feed = PriceFeed(markets=markets)
+
+    file_path = tempfile.mkdtemp() + '/'
+    JsonAlertStore(file_path=file_path, file_name='alerts.json').save_snapshot(get_alerts(alerts_count, feed, hot_ratio))
+
+    handler = ShardedAlertHandler(
+        shards=shards,
+        alerts_file_path=file_path,
+        handler_options={
+            'alerts_file_name': 'alerts.json',
+            'new_alert_file_name': None,
+            'alerts_journal_file_name': None,
+            'alert_store': 'json',
+            'alert_engine': alert_engine,
+            'alerts_archive_path': None,
+            'price_history_path': None,
+            'gap_seconds': 0
+        }
+    )
+
+    try:
+        # alerts moved to the shards first
+        while handler._pending_alerts or not handler.wait(60):
+            handler.collect_results(1.0)
+
+        tick_seconds = []
+        shard_seconds = [[] for shard in range(shards)]
+
+        for idx in range(ticks):
+            factor = Decimal(1) + Decimal('0.001') * (idx + 1)
+
+            started = time.perf_counter()
+            handler.update_alerts({market: feed.get_price(market) * factor for market in markets})
+
+            seq = handler._seq
+            done = set()
+
+            while len(done) < shards:
+                handler.collect_results(1.0)
+
+                for shard in range(shards):
+                    if shard not in done and handler._done[shard] >= seq:
+                        done.add(shard)
+                        shard_seconds[shard].append(time.perf_counter() - started)
+
+            tick_seconds.append(time.perf_counter() - started)
+    finally:
+        handler.close()
+
+    hot_shard = ShardedAlertHandler.get_shard(markets[0], shards)
+
+    return {
+        'alerts': alerts_count,
+        'markets': markets_count,
+        'shards': shards,
+        'cpus': os.cpu_count(),
+        'ticks': ticks,
+        'alert_engine': alert_engine,
+        'hot_ratio': hot_ratio,
+        'alerts_per_second': alerts_count * ticks / sum(tick_seconds),
+        'tick_seconds_p50': statistics.median(tick_seconds),
+        'hot_shard_seconds_p50': statistics.median(shard_seconds[hot_shard]),
+        'other_shards_seconds_p50': statistics.median(
+            [seconds for shard in range(shards) if shard != hot_shard for seconds in shard_seconds[shard]]
+        ) if shards > 1 else None
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Throughput of alerts sharded by market over processes.')
+    parser.add_argument('--alerts', type=int, default=100000)
+    parser.add_argument('--markets', type=int, default=20)
+    parser.add_argument('--shards', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--ticks', type=int, default=10)
+    parser.add_argument('--hot-ratio', type=float, default=0.0, help='share of alerts in a single market')
+    parser.add_argument('--engine', default='scalar')
+    args = parser.parse_args()
+
+    results = [run(args.alerts, args.markets, shards, args.ticks, args.hot_ratio, args.engine) for shards in args.shards]
+
+    for result in results:
+        result['speedup'] = result['alerts_per_second'] / results[0]['alerts_per_second']
+
+    print(json.dumps(results, indent=4))
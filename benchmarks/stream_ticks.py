@@ -0,0 +1,105 @@
+import argparse
+import datetime
+import random
+import time
+import tempfile
+from decimal import Decimal
+
+from models.Alert import Alert
+from models.AlertHandler import AlertHandler
+from models.AlertStream import AlertStream
+from models.clients.Bitvavo import BitvavoClient
+from simulator.websocket_server import FakeWebsocketServer
+
+
+def get_ticks(markets: list, count: int, seed: int = 1):
+    """
+    Random walk of ticker events, round robin over markets
+    """
+    rnd = random.Random(seed)
+    prices = {market: 1000.0 for market in markets}
+    ticks = []
+
+    for idx in range(count):
+        market = markets[idx % len(markets)]
+        prices[market] *= 1 + rnd.uniform(-0.001, 0.001)
+        ticks.append({'market': market, 'lastPrice': '%.2f' % prices[market]})
+
+    return ticks
+
+
+def get_alerts(markets: list, alerts_per_market: int):
+    alerts = []
+
+    for market in markets:
+        for idx in range(alerts_per_market):
+            alerts.append(Alert(
+                amount=None,
+                actions=[],
+                dt=datetime.datetime.now(),
+                init_dt=datetime.datetime.now(),
+                init_price=Decimal('1000'),
+                market=market,
+                price=Decimal('1000'),
+                status=Alert.STATUS_ACTIVE,
+                trailing_percentage=Decimal('0.5'),
+                trailing_price=Decimal('500')
+            ))
+
+    return alerts
+
+
+def run(markets_count: int, alerts_per_market: int, ticks_count: int):
+    markets = ['M' + str(idx) + '-EUR' for idx in range(markets_count)]
+
+    server = FakeWebsocketServer(
+        ticks=get_ticks(markets, ticks_count),
+        expected_markets=set(markets)
+    ).start()
+
+    ah = AlertHandler(
+        alerts_file_path=tempfile.mkdtemp() + '/',
+        alerts_file_name='alerts.json',
+        alerts=get_alerts(markets, alerts_per_market),
+        gap_seconds=0
+    )
+
+    stream = AlertStream(
+        _alert_handler=ah,
+        _client=BitvavoClient(api_key='', api_secret='', wsUrl=server.get_url()),
+        interval=0,
+        save_interval=3600
+    )
+
+    try:
+        stream.connect()
+        started = time.perf_counter()
+        stream.tick()
+
+        server.wait_replayed()
+
+        while stream.ticks_processed < ticks_count:
+            time.sleep(0.001)
+
+        duration = time.perf_counter() - started
+    finally:
+        stream.close()
+        server.stop()
+
+    return {
+        'markets': markets_count,
+        'alerts': markets_count * alerts_per_market,
+        'ticks': ticks_count,
+        'seconds': duration,
+        'ticks_per_second': ticks_count / duration
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Ticks per second processed by AlertStream against a local fake websocket.')
+    parser.add_argument('--markets', type=int, default=10)
+    parser.add_argument('--alerts-per-market', type=int, default=10)
+    parser.add_argument('--ticks', type=int, default=20000)
+    args = parser.parse_args()
+
+    print(run(args.markets, args.alerts_per_market, args.ticks))
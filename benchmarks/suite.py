@@ -0,0 +1,139 @@
+import argparse
+import datetime
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import simplejson as json
+
+from benchmarks.alert_books import get_book, get_markets
+from models.AlertHandler import AlertHandler
+from simulator.fake_exchange import FakeBitvavoClient, FakeCryptowatchClient, PriceFeed
+
+
+def get_version():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def get_summary(seconds: list):
+    return {
+        'min': min(seconds),
+        'mean': statistics.mean(seconds),
+        'max': max(seconds)
+    }
+
+
+def get_alert_handler(file_path: str, feed: PriceFeed, store: str, engine: str, **kwargs):
+    return AlertHandler(
+        alerts_file_path=file_path,
+        alerts_file_name='alerts.json',
+        new_alert_file_name='new_alert.json',
+        alerts_db_file_name='alerts.sqlite',
+        alert_store=store,
+        alert_engine=engine,
+        # the synthetic books are not backfilled by candles
+        gap_seconds=0,
+        _client=FakeBitvavoClient(_feed=feed),
+        _backup_clients={market: FakeCryptowatchClient(_feed=feed, market=market) for market in feed.markets},
+        **kwargs
+    )
+
+
+def run(count: int, markets_count: int, ticks: int, hit_ratio: float, store: str, engine: str, seed: int = 1):
+    """
+    Time load, evaluate, save and end-to-end ticks of a synthetic alert book against a fake exchange
+    :return: list of results, one per phase
+    """
+    feed = PriceFeed(markets=get_markets(markets_count), seed=seed)
+    file_path = tempfile.mkdtemp() + '/'
+
+    # without actions, the hit path is measured up to the divergence check against the fake backup client
+    get_alert_handler(file_path, feed, store, engine, alerts=get_book(count, feed, hit_ratio, seed)).save_alerts()
+
+    started = time.perf_counter()
+    ah = get_alert_handler(file_path, feed, store, engine)
+    seconds = {'load': [time.perf_counter() - started], 'evaluate': [], 'save': [], 'tick': []}
+
+    for idx in range(ticks):
+        feed.step()
+
+        started = time.perf_counter()
+        ah.load_new_alerts()
+        ah._client.reset_responses()
+
+        evaluate_started = time.perf_counter()
+        ah.update_alerts()
+        save_started = time.perf_counter()
+        ah.save_alerts()
+        finished = time.perf_counter()
+
+        seconds['evaluate'].append(save_started - evaluate_started)
+        seconds['save'].append(finished - save_started)
+        seconds['tick'].append(finished - started)
+
+    results = []
+
+    for phase, phase_seconds in seconds.items():
+        summary = get_summary(phase_seconds)
+
+        results.append({
+            'alerts': count,
+            'markets': markets_count,
+            'hit_ratio': hit_ratio,
+            'store': store,
+            'engine': engine,
+            'phase': phase,
+            'runs': len(phase_seconds),
+            'seconds': summary,
+            'alerts_per_second': count / summary['mean'] if summary['mean'] else None
+        })
+
+    return results
+
+
+def get_key(result: dict):
+    return result['alerts'], result['markets'], result['hit_ratio'], result['store'], result['engine'], result['phase']
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Offline benchmark of synthetic alert books against a fake exchange.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--markets', type=int, default=20)
+    parser.add_argument('--ticks', type=int, default=5)
+    parser.add_argument('--hit-ratio', type=float, default=0.1, help='share of alerts already hit')
+    parser.add_argument('--stores', nargs='+', default=[AlertHandler.ALERT_STORE_JSON])
+    parser.add_argument('--engines', nargs='+', default=[AlertHandler.ALERT_ENGINE_SCALAR])
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', default=None, help='json results file, compare with python3 -m benchmarks.compare')
+    args = parser.parse_args()
+
+    report = {
+        'version': get_version(),
+        'python': platform.python_version(),
+        'dt': str(datetime.datetime.now()),
+        'results': []
+    }
+
+    for size in args.sizes:
+        for store in args.stores:
+            for engine in args.engines:
+                for result in run(size, args.markets, args.ticks, args.hit_ratio, store, engine, args.seed):
+                    report['results'].append(result)
+
+                    print(
+                        str(result['alerts']) + ' alerts ' + store + '/' + engine + ' ' + result['phase'] + ': ' +
+                        '%.4fs mean, %.4fs min' % (result['seconds']['mean'], result['seconds']['min']),
+                        file=sys.stderr
+                    )
+
+    if args.output is None:
+        print(json.dumps(report, indent=4))
+    else:
+        with open(args.output, 'w') as fp:
+            json.dump(report, fp, indent=4)
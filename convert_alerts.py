@@ -0,0 +1,21 @@
+import argparse
+import os
+
+from models.stores.BinaryAlertStore import BinaryAlertStore
+import main
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Convert alerts between the json alerts file and the binary snapshot.')
+    parser.add_argument('direction', choices=['import', 'export'], help='import json into binary snapshot or export binary snapshot as json')
+    args = parser.parse_args()
+
+    store = BinaryAlertStore(
+        file_path=os.environ.get('ALERTS_FILE_PATH'),
+        file_name=os.environ.get('ALERTS_FILE_NAME'),
+        journal_file_name=os.environ.get('ALERTS_JOURNAL_FILE_NAME') or None
+    )
+
+    if args.direction == 'import':
+        print('Imported ' + str(store.import_json()) + ' alerts.')
+    else:
+        print('Exported ' + str(store.export_json()) + ' alerts.')
@@ -1,6 +1,8 @@
+import sys
+
 from models.CreateAlert import CreateAlert
 from models.clients.Bitvavo import BitvavoClient
 
 if __name__ == '__main__':
-    ca = CreateAlert(_client=BitvavoClient())
+    ca = CreateAlert(_client=BitvavoClient(), **CreateAlert.get_options_by_argv(sys.argv[1:]))
     ca.add_by_console()
@@ -1,7 +1,33 @@
+import os
+import time
+
 from models.AlertHandler import AlertHandler
+from models.Messages import Messages
+from models.Metrics import Metrics
+from models.clients.HttpSession import HttpSession
 import main
 
 if __name__ == '__main__':
+    started = time.monotonic()
+
+    # a run of cron exits after one tick, http.client starts faster than requests
+    HttpSession.transport = HttpSession.TRANSPORT_STDLIB
+
+    Messages.start_outbox()
+
     ah = AlertHandler()
     ah.update_alerts()
     ah.save_alerts()
+    ah.close()
+
+    # emails due are delivered after the alerts are saved, emails in retry backoff and the rest by the next run
+    Messages.stop_outbox(float(os.environ.get('NOTIFICATION_DRAIN_SECONDS', 5)))
+    Messages.close()
+
+    seconds = time.monotonic() - started
+
+    # run by cron every minute, every run replaces the metrics file
+    Metrics.set('tick_budget_seconds', 60)
+    Metrics.set('last_tick_duration_seconds', seconds)
+    Metrics.observe('tick_duration_seconds', seconds)
+    Metrics.write_text_file()
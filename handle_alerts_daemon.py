@@ -0,0 +1,7 @@
+from models.AlertDaemon import AlertDaemon
+import main
+
+if __name__ == '__main__':
+    daemon = AlertDaemon()
+    daemon.register_signal_handlers()
+    daemon.run()
@@ -0,0 +1,7 @@
+from models.AlertStream import AlertStream
+import main
+
+if __name__ == '__main__':
+    stream = AlertStream()
+    stream.register_signal_handlers()
+    stream.run()
@@ -6,6 +6,6 @@ python3 -m venv bitvavo_trailing_stop
 
 source bitvavo_trailing_stop/bin/activate
 
-pip3 install Faker pytest simplejson python-dotenv python-bitvavo-api
+pip3 install Faker pytest simplejson python-dotenv python-bitvavo-api numpy
 
 deactivate
\ No newline at end of file
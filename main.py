@@ -1,9 +1,13 @@
 import logging
 import os
 from os.path import join, dirname
-from dotenv import load_dotenv
 
 dotenv_path = join(dirname(__file__), '.env')
-load_dotenv(dotenv_path)
 
-logging.basicConfig(level=os.environ.get("LOGGING_LEVEL"))
\ No newline at end of file
+# dotenv is only imported if there is a .env file to load
+if os.path.isfile(dotenv_path):
+    from dotenv import load_dotenv
+
+    load_dotenv(dotenv_path)
+
+logging.basicConfig(level=os.environ.get("LOGGING_LEVEL"))
@@ -0,0 +1,20 @@
+import os
+
+from models.stores.JsonAlertStore import JsonAlertStore
+from models.stores.SqliteAlertStore import SqliteAlertStore
+import main
+
+if __name__ == '__main__':
+    json_store = JsonAlertStore(
+        file_path=os.environ.get('ALERTS_FILE_PATH'),
+        file_name=os.environ.get('ALERTS_FILE_NAME'),
+        new_alert_file_name=os.environ.get('NEW_ALERTS_FILE_NAME'),
+        journal_file_name=os.environ.get('ALERTS_JOURNAL_FILE_NAME') or None
+    )
+    alerts = json_store.load()
+    alerts.extend(json_store.load_new(len(alerts)))
+
+    sqlite_store = SqliteAlertStore(file_path=os.environ.get('ALERTS_FILE_PATH') + os.environ.get('ALERTS_DB_FILE_NAME'))
+    sqlite_store.import_alerts(alerts)
+
+    print('Migrated ' + str(len(alerts)) + ' alerts.')
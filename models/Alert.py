@@ -1,11 +1,13 @@
 import datetime
 import logging
+import sys
 from decimal import Decimal
-from models.clients.Bitvavo import BitvavoClient
-from models.clients.Cryptowatch import CryptowatchClient
 
 
 class Alert(object):
+    """
+    Slots instead of a dict per alert, actions as bitmask and interned market names, to hold large alert books
+    """
     STATUS_HIT = 'hit'
     STATUS_ACTIVE = 'active'
     STATUS_NOT_INIT = None
@@ -13,51 +15,155 @@ class Alert(object):
     ACTION_SEND_EMAIL = 'send_email'
     ACTION_SELL_ASSET = 'sell_asset'
 
-    _client: BitvavoClient = None
-    _client_backup: CryptowatchClient = None
-    _price_diversion_threshold = None
+    # position is bit of action in actions bitmask
+    ACTIONS = [ACTION_SEND_EMAIL, ACTION_SELL_ASSET]
+
+    PRICE_DIVERSION_THRESHOLD = Decimal('0.01')
+
+    # shared by all alerts without changes, replaced by a new list on change
+    NO_CHANGES = ()
+
+    __slots__ = (
+        '_id',
+        '_client',
+        '_client_backup',
+        '_price_diversion_threshold',
+        '_actions',
+        '_actions_list',
+        'changedAttributes',
+        'dt',
+        'init_price',
+        'init_dt',
+        'market',
+        'price',
+        'backup_price',
+        'status',
+        'trailing_percentage',
+        'trailing_price',
+        'amount'
+    )
+
+    _id: int
+    _client: 'BitvavoClient'
+    _client_backup: 'CryptowatchClient'
+    _price_diversion_threshold: Decimal
+    _actions: int
+    # actions as set, only if the bitmask does not give them back, like unknown, repeated or reordered actions
+    _actions_list: list
+
+    changedAttributes: list
+
+    dt: datetime
+    init_price: Decimal
+    init_dt: datetime
+    market: str
+    price: Decimal
+    backup_price: Decimal
+    status: str
+    trailing_percentage: Decimal
+    trailing_price: Decimal
+    amount: Decimal
+
+    def __init__(self, actions: list = None, amount: Decimal = None, dt: datetime = None, init_dt: datetime = None,
+                 init_price: Decimal = None, market: str = None, price: Decimal = None, status: str = None,
+                 trailing_percentage: Decimal = None, trailing_price: Decimal = None, **kwargs):
+        self._id = None
+        self._client = None
+        self._client_backup = None
+        self._price_diversion_threshold = self.PRICE_DIVERSION_THRESHOLD
+        self.changedAttributes = self.NO_CHANGES
+        self.backup_price = None
+
+        self.actions = actions or []
+        self.amount = amount
+        self.dt = dt
+        self.init_dt = init_dt
+        self.init_price = init_price
+        self.market = sys.intern(market) if market is not None else None
+        self.price = price
+        self.status = status
+        self.trailing_percentage = trailing_percentage
+        self.trailing_price = trailing_price
+
+        for k, v in kwargs.items():
+            self.__setattr__(k, v)
+
+    @classmethod
+    def get_actions(cls, actions: int):
+        """
+        :param actions: bitmask
+        :return: list of actions in order of ACTIONS
+        """
+        return [action for idx, action in enumerate(cls.ACTIONS) if actions & (1 << idx)]
 
-    changedAttributes: list = None
+    @property
+    def actions(self):
+        if self._actions_list is not None:
+            return list(self._actions_list)
 
-    actions: list = None
-    dt: datetime = None
-    init_price: Decimal = None
-    init_dt: datetime = None
-    market: str = None
-    price: Decimal = None
-    backup_price: Decimal = None
-    status: str = None
-    trailing_percentage: Decimal = None
-    trailing_price: Decimal = None
-    amount: Decimal = None
+        return self.get_actions(self._actions)
 
-    def __init__(self, **kwargs):
-        self.changedAttributes = []
-        self.actions = []
+    @actions.setter
+    def actions(self, actions: list):
+        self._actions = 0
 
-        self._price_diversion_threshold = Decimal('0.01')
+        for action in actions:
+            if action not in self.ACTIONS:
+                logging.warning('ALERT:actions:UNKNOWN_ACTION:' + str(action))
 
-        for k, v in kwargs.items():
-            self.__setattr__(k, v)
+                continue
+
+            self._actions |= 1 << self.ACTIONS.index(action)
+
+        self._actions_list = None if list(actions) == self.get_actions(self._actions) else list(actions)
 
-    def is_ticker_price_diverted(self):
+    def has_action(self, action: str):
+        return bool(self._actions & (1 << self.ACTIONS.index(action)))
+
+    @classmethod
+    def get_by_dict(cls, alert: dict):
+        """
+        Create alert by stored attributes, dates as strings of str(datetime), without fraction if microsecond is 0
+        :param alert:
+        :return:
+        """
+        return cls(
+            actions=alert['actions'],
+            amount=alert['amount'],
+            dt=datetime.datetime.fromisoformat(alert['dt']),
+            init_dt=datetime.datetime.fromisoformat(alert['init_dt']),
+            init_price=alert['init_price'],
+            market=alert['market'],
+            price=alert['price'],
+            status=alert['status'],
+            trailing_percentage=alert['trailing_percentage'],
+            trailing_price=alert['trailing_price']
+        )
+
+    def is_ticker_price_diverted(self, backup_price: Decimal = None):
         """
         Check price against third party ticker price
+        :param backup_price: already fetched third party ticker price, fetched by the backup client if None
         :return:
         """
+        if backup_price is None:
+            market_str_spl = self.market.split('-')
+
+            currency = market_str_spl[1].lower()
+            coin = market_str_spl[0].lower()
 
-        market_str_spl = self.market.split('-')
+            if self._client_backup is None:
+                # the backup client is only needed to check a hit
+                from models.clients.Cryptowatch import CryptowatchClient
 
-        currency = market_str_spl[1].lower()
-        coin = market_str_spl[0].lower()
+                self._client_backup = CryptowatchClient(
+                    _currency=currency,
+                    _coin=coin
+                )
 
-        if self._client_backup is None:
-            self._client_backup = CryptowatchClient(
-                _currency=currency,
-                _coin=coin
-            )
+            backup_price = self._client_backup.get_ticker_price()
 
-        self.backup_price = self._client_backup.get_ticker_price()
+        self.backup_price = backup_price
 
         lower_th = self.backup_price * (1 - self._price_diversion_threshold)
         upper_th = self.backup_price * (1 + self._price_diversion_threshold)
@@ -73,6 +179,16 @@ class Alert(object):
 
         return self.market.split('-', 2)[0]
 
+    def get_uid(self):
+        """
+        Stable between processes and stores, by the attributes set on creation that no update changes.
+        Actions by their bitmask, the binary store keeps neither their order nor repeated or unknown actions
+        :return:
+        """
+        values = [self.market, self.init_dt, self.init_price, self.trailing_percentage, self.amount, self._actions]
+
+        return '|'.join(str(value.normalize() if isinstance(value, Decimal) else value) for value in values)
+
     def attributes(self):
         return {
             'amount': self.amount,
@@ -87,8 +203,13 @@ class Alert(object):
             'trailing_price': self.trailing_price
         }
 
-    def update_by_client(self):
-        self.changedAttributes = []
+    def update_by_client(self, ticker_price: Decimal = None):
+        """
+        Update alert by ticker price, fetched by client if no price of a shared snapshot is given
+        :param ticker_price:
+        :return:
+        """
+        self.changedAttributes = self.NO_CHANGES
 
         logging.debug('ALERT:UPDATE_BY_CLIENT:ATTRIBUTES_BEFORE_UPDATE:' + str(self.attributes()))
 
@@ -107,7 +228,8 @@ class Alert(object):
 
             return False
 
-        ticker_price = self._client.get_ticker_price()
+        if ticker_price is None and self._client is not None:
+            ticker_price = self._client.get_ticker_price()
 
         if ticker_price is None:
             logging.warning('ALERT:UPDATE_BY_CLIENT:PRICE_IS_NONE:' + str(self.attributes()))
@@ -152,6 +274,8 @@ class Alert(object):
 
             new_trailing_price = ticker_price * Decimal(self.trailing_percentage)
 
+            self.changedAttributes = []
+
             if new_trailing_price > self.trailing_price:
                 self.trailing_price = new_trailing_price
                 self.changedAttributes.append('trailing_price')
@@ -159,17 +283,61 @@ class Alert(object):
             self.price = ticker_price
             self.dt = datetime.datetime.now()
 
-            self.changedAttributes = [
+            self.changedAttributes.extend([
                 'price',
                 'dt'
-            ]
+            ])
 
             logging.debug('ALERT:UPDATE_BY_CLIENT:ATTRIBUTES_AFTER_UPDATE:' + str(self.attributes()))
 
             return True
 
+    def update_by_candles(self, candles: list, ticker_price: Decimal):
+        """
+        Replay candles of prices missed since the last update, oldest first. The trailing price follows the highs,
+        a low at or below the trailing price by the candles before hits the alert at the ticker price it is acted on
+        :param candles: list of epoch milliseconds, high and low
+        :param ticker_price: current price
+        :return: True if updated
+        """
+        self.changedAttributes = self.NO_CHANGES
+
+        if self.status != self.STATUS_ACTIVE:
+            return False
+
+        changed_attributes = []
+
+        for ts, high, low in candles:
+            if low <= self.trailing_price:
+                logging.info('ALERT:UPDATE_BY_CANDLES:TRAILING_PRICE_HIT:' + self.market + ':' + str(ts))
+
+                self.price = ticker_price
+                self.dt = datetime.datetime.now()
+                self.status = self.STATUS_HIT
+
+                self.changedAttributes = changed_attributes + [
+                    'price',
+                    'dt',
+                    'status'
+                ]
+
+                return True
+
+            new_trailing_price = high * Decimal(self.trailing_percentage)
+
+            if new_trailing_price > self.trailing_price:
+                self.trailing_price = new_trailing_price
+                changed_attributes = ['trailing_price']
+
+        if not changed_attributes:
+            return False
+
+        self.changedAttributes = changed_attributes
+
+        return True
+
     def init_attributes(self):
-        self.changedAttributes = []
+        self.changedAttributes = self.NO_CHANGES
 
         if self.status is not None:
             logging.debug('ALERT:init_attr:already_initiated')
@@ -193,13 +361,13 @@ class Alert(object):
         self.dt = dt
         self.status = self.STATUS_ACTIVE
 
-        self.changedAttributes.extend([
+        self.changedAttributes = [
             'init_price',
             'trailing_price',
             'price',
             'dt',
             'init_dt',
             'status'
-        ])
+        ]
 
         return True
@@ -0,0 +1,112 @@
+import datetime
+import gzip
+import logging
+import os
+from decimal import Decimal
+from pathlib import Path
+
+import simplejson as json
+
+from models.Alert import Alert
+
+
+class AlertArchive(object):
+    """
+    Hit alerts as gzipped json lines, one file per day the alerts were hit.
+    Each append is a gzip member of its own, so files are appended without rewriting them.
+    """
+    FILE_PREFIX = 'alerts_'
+    FILE_SUFFIX = '.jsonl.gz'
+    DATE_FORMAT = '%Y-%m-%d'
+
+    file_path: str = None
+
+    def __init__(self, **kwargs):
+        for k, v in kwargs.items():
+            self.__setattr__(k, v)
+
+        Path(self.file_path).mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def get_decimal(cls, s):
+        return Decimal(s)
+
+    def get_file_name(self, date: datetime.date):
+        return os.path.join(self.file_path, self.FILE_PREFIX + date.strftime(self.DATE_FORMAT) + self.FILE_SUFFIX)
+
+    def get_file_dates(self):
+        """
+        :return: sorted list of dates having an archive file
+        """
+        dates = []
+
+        for file_name in os.listdir(self.file_path):
+            if not file_name.startswith(self.FILE_PREFIX) or not file_name.endswith(self.FILE_SUFFIX):
+                continue
+
+            try:
+                dates.append(datetime.datetime.strptime(
+                    file_name[len(self.FILE_PREFIX):-len(self.FILE_SUFFIX)],
+                    self.DATE_FORMAT
+                ).date())
+            except ValueError:
+                continue
+
+        return sorted(dates)
+
+    def append(self, alerts: list):
+        """
+        Append alerts to the files of the days they were hit
+        :param alerts:
+        :return:
+        """
+        alerts_by_date = {}
+
+        for alert in alerts:
+            date = alert.dt.date() if alert.dt is not None else datetime.date.today()
+
+            alerts_by_date.setdefault(date, []).append(alert)
+
+        for date, date_alerts in sorted(alerts_by_date.items()):
+            lines = ''.join([json.dumps(alert.attributes(), sort_keys=True, default=str) + '\n' for alert in date_alerts])
+
+            # unbuffered, a member is a single append, so the processes of a sharded handler share the files
+            with open(self.get_file_name(date), 'ab', buffering=0) as fp:
+                fp.write(gzip.compress(lines.encode('utf-8')))
+                fp.flush()
+                os.fsync(fp.fileno())
+
+        logging.debug('ALERT_ARCHIVE:append:archived_alerts:' + str(len(alerts)))
+
+    def query(self, market: str = None, date_from: datetime.date = None, date_to: datetime.date = None):
+        """
+        Archived alerts, oldest day first
+        :param market: only alerts of market, all if None
+        :param date_from: first day, inclusive
+        :param date_to: last day, inclusive
+        :return: generator of alerts
+        """
+        for date in self.get_file_dates():
+            if date_from is not None and date < date_from:
+                continue
+
+            if date_to is not None and date > date_to:
+                break
+
+            try:
+                with gzip.open(self.get_file_name(date), 'rt') as fp:
+                    # read line by line, the alerts of the members before a torn one are still returned
+                    for line in fp:
+                        if not line.endswith('\n'):
+                            # end of a member torn by a crash
+                            break
+
+                        alert = json.loads(line, parse_float=self.get_decimal, parse_int=self.get_decimal)
+
+                        if market is not None and alert['market'] != market:
+                            continue
+
+                        yield Alert.get_by_dict(alert)
+            except (EOFError, gzip.BadGzipFile) as e:
+                # alerts of a member torn by a crash are still in the alert store
+                logging.warning('ALERT_ARCHIVE:query:TORN_FILE:' + str(date) + ':' + str(e))
@@ -0,0 +1,134 @@
+import logging
+import os
+import signal
+import threading
+import time
+from models.AlertHandler import AlertHandler
+from models.Messages import Messages
+from models.Metrics import Metrics
+
+
+class AlertDaemon(object):
+    """
+    Keeps alert handler, alerts and clients in memory and updates alerts in a fixed interval
+    """
+    # emails still queued on shutdown are delivered after the next start
+    OUTBOX_DRAIN_SECONDS = 5.0
+
+    # AlertHandler or ShardedAlertHandler
+    _alert_handler: AlertHandler = None
+    _stop_event: threading.Event = None
+    _last_save: float = None
+
+    interval: float = None
+    save_interval: float = None
+
+    def __init__(self, **kwargs):
+        self._stop_event = threading.Event()
+        self.interval = float(kwargs.get('interval') if 'interval' in kwargs else os.environ.get('DAEMON_INTERVAL', '10'))
+        self.save_interval = float(kwargs.get('save_interval') if 'save_interval' in kwargs else os.environ.get('DAEMON_SAVE_INTERVAL', '60'))
+
+        for k, v in kwargs.items():
+            self.__setattr__(k, v)
+
+        if self._alert_handler is None:
+            self._alert_handler = self.get_alert_handler()
+
+    def get_alert_handler(self):
+        """
+        :return: alert handler, sharded over ALERT_SHARDS processes if more than one
+        """
+        if int(os.environ.get('ALERT_SHARDS', '1')) > 1:
+            # multiprocessing is only needed by a sharded handler
+            from models.ShardedAlertHandler import ShardedAlertHandler
+
+            return ShardedAlertHandler()
+
+        return AlertHandler()
+
+    def register_signal_handlers(self):
+        signal.signal(signal.SIGTERM, self.handle_signal)
+        signal.signal(signal.SIGINT, self.handle_signal)
+
+    def handle_signal(self, signum, frame):
+        logging.info('ALERT_DAEMON:handle_signal:STOPPING:' + str(signum))
+
+        self.stop()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def is_stopped(self):
+        return self._stop_event.is_set()
+
+    def tick(self):
+        self._alert_handler.load_new_alerts()
+
+        if self._alert_handler._client is not None:
+            self._alert_handler._client.reset_responses()
+
+        self._alert_handler.update_alerts()
+
+        if self.is_save_due():
+            self.save()
+
+    def is_save_due(self):
+        return self._last_save is None or time.monotonic() - self._last_save >= self.save_interval
+
+    def save(self):
+        self._alert_handler.save_alerts()
+        self._last_save = time.monotonic()
+
+    @classmethod
+    def record_tick(cls, seconds: float):
+        Metrics.observe('tick_duration_seconds', seconds)
+        Metrics.set('last_tick_duration_seconds', seconds)
+        Metrics.inc('ticks_total')
+
+        try:
+            Metrics.write_text_file()
+        except OSError as e:
+            logging.error('ALERT_DAEMON:record_tick:METRICS_NOT_WRITTEN:' + str(e))
+
+    def run(self, max_ticks: int = None):
+        """
+        Update alerts until stopped, alerts are saved periodically and on shutdown
+        :param max_ticks: stop after number of ticks, runs until stopped if None
+        :return:
+        """
+        logging.info('ALERT_DAEMON:run:STARTED:interval=' + str(self.interval))
+
+        Metrics.set('tick_budget_seconds', self.interval)
+        Metrics.start_http_server()
+        Messages.start_outbox()
+
+        ticks = 0
+
+        while not self.is_stopped():
+            started = time.monotonic()
+
+            try:
+                self.tick()
+            except Exception as e:
+                Metrics.inc('errors_total', component='daemon')
+
+                logging.error('ALERT_DAEMON:run:TICK_FAILED:' + str(e))
+
+            self.record_tick(time.monotonic() - started)
+
+            ticks += 1
+
+            if max_ticks is not None and ticks >= max_ticks:
+                break
+
+            self._stop_event.wait(max(0.0, self.interval - (time.monotonic() - started)))
+
+        self.save()
+        self._alert_handler.close()
+
+        Messages.stop_outbox(self.OUTBOX_DRAIN_SECONDS)
+        Messages.close()
+        Metrics.write_text_file()
+        Metrics.stop_http_server()
+
+        logging.info('ALERT_DAEMON:run:STOPPED')
@@ -0,0 +1,343 @@
+import datetime
+import logging
+import time
+from decimal import Decimal
+
+from models.Alert import Alert
+
+
+class AlertBook(object):
+    """
+    Initiated alerts of one market as scaled integers, the values are held by the subclass.
+    Prices are scaled by 10 ** scale, trailing prices by 10 ** (scale + percentage_scale) and percentages by
+    10 ** percentage_scale, so comparisons and the trailing price ratchet give the same results as the Decimal path
+    of Alert while no value reaches max_value, beyond it the book is updated by Alert
+    """
+    LOG_NAME = 'ALERT_BOOK'
+
+    market: str = None
+    alerts: list = None
+    scalar: bool = False
+
+    # significant digits of prices of the market, None if unknown
+    precision: int = None
+
+    # counts of last update
+    evaluated: int = 0
+    changed: int = 0
+
+    scale: int = 0
+    percentage_scale: int = 0
+    max_value: int = None
+    max_percentage: int = 0
+
+    def __init__(self, **kwargs):
+        self.alerts = []
+        self.max_value = self.get_max_value()
+
+        for k, v in kwargs.items():
+            self.__setattr__(k, v)
+
+    @classmethod
+    def get_max_value(cls):
+        """
+        :return: scaled values and their products must stay below
+        """
+        raise NotImplementedError
+
+    @classmethod
+    def get_places(cls, value: Decimal):
+        return max(0, -value.as_tuple().exponent)
+
+    @classmethod
+    def get_precision_places(cls, precision: int, price: Decimal):
+        """
+        :param precision: significant digits
+        :param price:
+        :return: decimal places of price with precision significant digits
+        """
+        return max(0, precision - price.adjusted() - 1)
+
+    @classmethod
+    def get_scaled(cls, value: Decimal, scale: int):
+        return int(value.scaleb(scale))
+
+    @classmethod
+    def get_decimal(cls, value, scale: int):
+        return Decimal(int(value)).scaleb(-scale)
+
+    def add_alerts(self, alerts: list):
+        """
+        (Re)build values, alerts are handled by Alert if values are missing or reach max_value
+        :param alerts:
+        :return:
+        """
+        if self.scalar:
+            self.alerts.extend(alerts)
+
+            return
+
+        if self.is_built():
+            self.sync_alerts()
+
+        self.alerts.extend(alerts)
+
+        values = []
+
+        for alert in self.alerts:
+            if alert.price is None or alert.trailing_price is None or alert.trailing_percentage is None:
+                self.scalar = True
+
+                return
+
+            values.append((Decimal(alert.price), Decimal(alert.trailing_price), Decimal(alert.trailing_percentage)))
+
+        self.percentage_scale = max([self.get_places(percentage) for price, trailing_price, percentage in values])
+        self.scale = max([max(self.get_places(price), self.get_places(trailing_price)) for price, trailing_price, percentage in values])
+
+        if self.precision is not None:
+            # sized for the ticks of the lowest price, no rescale on the first ticks
+            self.scale = max(self.scale, self.get_precision_places(self.precision, min(price for price, trailing_price, percentage in values)))
+
+        if not self.build(values):
+            self.scalar = True
+
+    def build(self, values: list):
+        trailing_scale = self.scale + self.percentage_scale
+
+        prices = [self.get_scaled(price, self.scale) for price, trailing_price, percentage in values]
+        trailing_prices = [self.get_scaled(trailing_price, trailing_scale) for price, trailing_price, percentage in values]
+        percentages = [self.get_scaled(percentage, self.percentage_scale) for price, trailing_price, percentage in values]
+
+        if max([abs(v) for v in prices + trailing_prices + percentages]) >= self.max_value:
+            return False
+
+        self.max_percentage = max(percentages, default=0)
+        self.build_values(prices, trailing_prices, percentages, [alert.status != Alert.STATUS_HIT for alert in self.alerts])
+
+        return True
+
+    def rescale(self, scale: int):
+        """
+        Raise scale for a ticker price with more decimal places
+        :param scale:
+        :return: False if scaled values would reach max_value
+        """
+        factor = 10 ** (scale - self.scale)
+
+        if self.get_max_trailing_price() * factor >= self.max_value:
+            return False
+
+        self.scale_values(factor)
+        self.scale = scale
+
+        return True
+
+    def to_scalar(self):
+        self.sync_alerts()
+        self.scalar = True
+
+        logging.info(self.LOG_NAME + ':to_scalar:' + str(self.market))
+
+    def update(self, ticker_price: Decimal, dt: float):
+        """
+        Apply ticker price to all alerts of market
+        :param ticker_price:
+        :param dt: timestamp of update
+        :return: list of alerts hit by ticker price
+        """
+        if self.scalar:
+            self.evaluated = len([alert for alert in self.alerts if alert.status == Alert.STATUS_ACTIVE])
+            changed_alerts = [alert for alert in self.alerts if alert.update_by_client(ticker_price)]
+            self.changed = len(changed_alerts)
+
+            return [alert for alert in changed_alerts if alert.status == Alert.STATUS_HIT]
+
+        places = self.get_places(ticker_price)
+
+        if places > self.scale and not self.rescale(places):
+            self.to_scalar()
+
+            return self.update(ticker_price, dt)
+
+        tick = self.get_scaled(ticker_price, self.scale)
+        tick_trailing = tick * 10 ** self.percentage_scale
+
+        if abs(tick_trailing) >= self.max_value or abs(tick) * self.max_percentage >= self.max_value:
+            self.to_scalar()
+
+            return self.update(ticker_price, dt)
+
+        hit_alerts = []
+
+        for idx in self.evaluate(tick, tick_trailing, dt):
+            self.sync_alert(idx)
+
+            self.alerts[idx].status = Alert.STATUS_HIT
+            self.alerts[idx].changedAttributes = ['price', 'dt', 'status']
+
+            hit_alerts.append(self.alerts[idx])
+
+        return hit_alerts
+
+    def sync_alert(self, idx: int):
+        alert = self.alerts[idx]
+        alert.changedAttributes = []
+
+        if self.changed_trailing_price[idx]:
+            alert.trailing_price = self.get_decimal(self.trailing_price[idx], self.scale + self.percentage_scale)
+            alert.changedAttributes.append('trailing_price')
+
+        if self.changed_price[idx]:
+            alert.price = self.get_decimal(self.price[idx], self.scale)
+            alert.dt = datetime.datetime.fromtimestamp(self.dt[idx])
+            alert.changedAttributes.extend(['price', 'dt'])
+
+        self.changed_price[idx] = False
+        self.changed_trailing_price[idx] = False
+
+    def sync_alerts(self):
+        """
+        Write changed values back to alert objects
+        :return: list of changed alerts
+        """
+        if self.scalar or not self.is_built():
+            return []
+
+        alerts = []
+
+        for idx in self.get_changed_idx():
+            self.sync_alert(idx)
+
+            alerts.append(self.alerts[idx])
+
+        return alerts
+
+    def is_built(self):
+        raise NotImplementedError
+
+    def build_values(self, prices: list, trailing_prices: list, percentages: list, active: list):
+        """
+        Hold the scaled values, the changed flags and the update times of all alerts
+        :param prices:
+        :param trailing_prices:
+        :param percentages:
+        :param active: False for hit alerts
+        :return:
+        """
+        raise NotImplementedError
+
+    def get_max_trailing_price(self):
+        raise NotImplementedError
+
+    def scale_values(self, factor: int):
+        """
+        Multiply prices and trailing prices by factor
+        :param factor:
+        :return:
+        """
+        raise NotImplementedError
+
+    def evaluate(self, tick: int, tick_trailing: int, dt: float):
+        """
+        Apply the scaled ticker price to the values of all alerts, hit alerts are set inactive
+        :param tick: ticker price scaled like prices
+        :param tick_trailing: ticker price scaled like trailing prices
+        :param dt: timestamp of update
+        :return: indexes of the alerts hit
+        """
+        raise NotImplementedError
+
+    def get_changed_idx(self):
+        """
+        :return: indexes of the alerts changed since their last sync
+        """
+        raise NotImplementedError
+
+
+class AlertEngine(object):
+    """
+    Evaluates all alerts of a tick market by market by the books of book_class,
+    alert objects are only written on hits and on sync_alerts()
+    """
+    LOG_NAME = 'ALERT_ENGINE'
+
+    book_class = AlertBook
+
+    _books: dict = None
+    _alerts_count: int = 0
+
+    # market => significant digits of prices, from the markets endpoint
+    precisions: dict = None
+
+    # counts of last update
+    evaluated: int = 0
+    changed: int = 0
+
+    def __init__(self, **kwargs):
+        self._books = {}
+        self.precisions = {}
+
+        for k, v in kwargs.items():
+            self.__setattr__(k, v)
+
+    def load(self, alerts: list):
+        """
+        Add alerts not yet known to engine, alerts are only appended to the list of alert handler
+        :param alerts:
+        :return:
+        """
+        new_alerts = {}
+
+        for alert in alerts[self._alerts_count:]:
+            if alert.status == Alert.STATUS_NOT_INIT or alert.market is None:
+                continue
+
+            new_alerts.setdefault(alert.market, []).append(alert)
+
+        for market, market_alerts in new_alerts.items():
+            if market not in self._books:
+                self._books[market] = self.book_class(market=market, precision=self.precisions.get(market))
+
+            self._books[market].add_alerts(market_alerts)
+
+        self._alerts_count = len(alerts)
+
+    def update(self, ticker_prices: dict, dt: float = None):
+        """
+        :param ticker_prices: dict of market => price
+        :param dt: timestamp of update
+        :return: list of alerts hit by ticker prices
+        """
+        if dt is None:
+            dt = time.time()
+
+        hit_alerts = []
+        self.evaluated = 0
+        self.changed = 0
+
+        for market, book in self._books.items():
+            ticker_price = ticker_prices.get(market)
+
+            if ticker_price is None:
+                logging.warning(self.LOG_NAME + ':update:PRICE_IS_NONE:' + market)
+
+                continue
+
+            hit_alerts.extend(book.update(ticker_price, dt))
+
+            self.evaluated += book.evaluated
+            self.changed += book.changed
+
+        return hit_alerts
+
+    def sync_alerts(self):
+        """
+        :return: list of alerts changed since last sync
+        """
+        alerts = []
+
+        for book in self._books.values():
+            alerts.extend(book.sync_alerts())
+
+        return alerts
@@ -1,118 +1,742 @@
-import datetime
 import logging
-from pathlib import Path
-import simplejson
 import simplejson as json
 import os
+import time
 from decimal import Decimal
 from models.Alert import Alert
+from models.AlertArchive import AlertArchive
+from models.FixedPointAlertEngine import FixedPointAlertEngine
 from models.Messages import Messages
-from models.Trade import Trade
-from models.clients.Bitvavo import BitvavoClient
+from models.Metrics import Metrics
+from models.clients.BitvavoPublic import BitvavoPublicClient
+from models.stores.BinaryAlertStore import BinaryAlertStore
+from models.stores.JsonAlertStore import JsonAlertStore
 
 
 class AlertHandler(object):
+    ALERT_ENGINE_SCALAR = 'scalar'
+    ALERT_ENGINE_COLUMNAR = 'columnar'
+    ALERT_ENGINE_FIXED = 'fixed'
+
+    ALERT_STORE_JSON = 'json'
+    ALERT_STORE_SQLITE = 'sqlite'
+    ALERT_STORE_BINARY = 'binary'
+
+    BACKUP_PRICE_WORKERS = 8
+    BACKUP_PRICE_TIMEOUT = 2.0
+    ORDER_TIMEOUT = 5.0
+    GAP_SECONDS = 180.0
+    PRICE_TIMES_FILE_NAME = 'price_times.json'
+
     alerts_file_name: str = None
     new_alert_file_name: str = None
     alerts_file_path: str = None
+    alerts_journal_file_name: str = None
+    alerts_db_file_name: str = None
+    alerts_archive_path: str = None
+    price_history_path: str = None
+    price_times_file_name: str = None
     alerts: list = None
+    alert_engine: str = None
+    alert_store: str = None
+    backup_price_workers: int = None
+    backup_price_timeout: float = None
+    order_timeout: float = None
+    gap_seconds: float = None
+    _engine = None
+    _price_precisions: dict = None
+    _store = None
+    _archive: AlertArchive = None
+    _price_history = None
+    # public market data client, the order client and its dependencies are only loaded by a hit
+    _client: BitvavoPublicClient = None
+    _trade_clients: dict = None
+    _backup_clients: dict = None
+    _backup_executor: 'ThreadPoolExecutor' = None
+    _order_pipeline: 'OrderPipeline' = None
     _ticker_prices: dict = None
+    # market => epoch seconds of the last price seen
+    _price_times: dict = None
+    # market => id of alert => epoch seconds its replay starts at, kept while the candles of the gap fail
+    _gap_starts: dict = None
+    _changed_attributes: dict = None
 
     def __init__(self, **kwargs):
         self._ticker_prices = {}
+        self._price_times = {}
+        self._gap_starts = {}
+        self._trade_clients = {}
+        self._backup_clients = {}
+        self._changed_attributes = {}
         self.alerts = []
         self.alerts_file_name = kwargs.get('alerts_file_name') if 'alerts_file_name' in kwargs else os.environ.get('ALERTS_FILE_NAME')
         self.alerts_file_path = kwargs.get('alerts_file_path') if 'alerts_file_path' in kwargs else os.environ.get('ALERTS_FILE_PATH')
         self.new_alert_file_name = kwargs.get('new_alert_file_name') if 'new_alert_file_name' in kwargs else os.environ.get('NEW_ALERTS_FILE_NAME')
+        self.alert_engine = kwargs.get('alert_engine') if 'alert_engine' in kwargs else os.environ.get('ALERT_ENGINE', self.ALERT_ENGINE_SCALAR)
+        self.alerts_journal_file_name = kwargs.get('alerts_journal_file_name') if 'alerts_journal_file_name' in kwargs else os.environ.get('ALERTS_JOURNAL_FILE_NAME')
+        self.alerts_db_file_name = kwargs.get('alerts_db_file_name') if 'alerts_db_file_name' in kwargs else os.environ.get('ALERTS_DB_FILE_NAME')
+        self.alert_store = kwargs.get('alert_store') if 'alert_store' in kwargs else os.environ.get('ALERT_STORE', self.ALERT_STORE_JSON)
+        self.alerts_archive_path = kwargs.get('alerts_archive_path') if 'alerts_archive_path' in kwargs else os.environ.get('ALERTS_ARCHIVE_PATH')
+        self.price_history_path = kwargs.get('price_history_path') if 'price_history_path' in kwargs else os.environ.get('PRICE_HISTORY_PATH')
+        self.price_times_file_name = kwargs.get('price_times_file_name') if 'price_times_file_name' in kwargs else os.environ.get('PRICE_TIMES_FILE_NAME', self.PRICE_TIMES_FILE_NAME)
+        self.backup_price_workers = int(os.environ.get('BACKUP_PRICE_WORKERS', self.BACKUP_PRICE_WORKERS))
+        self.backup_price_timeout = float(os.environ.get('BACKUP_PRICE_TIMEOUT', self.BACKUP_PRICE_TIMEOUT))
+        self.order_timeout = float(os.environ.get('ORDER_TIMEOUT', self.ORDER_TIMEOUT))
+        self.gap_seconds = float(os.environ.get('GAP_BACKFILL_SECONDS', self.GAP_SECONDS))
 
         for k, v in kwargs.items():
             self.__setattr__(k, v)
 
+        if self._store is None:
+            self._store = self.get_store()
+
+        if self._archive is None and self.alerts_archive_path:
+            self._archive = AlertArchive(file_path=self.alerts_archive_path)
+
+        if self._price_history is None and self.price_history_path:
+            # numpy is only needed for the price history
+            from models.PriceHistory import PriceHistory
+
+            self._price_history = PriceHistory(file_path=self.price_history_path, _get_precisions=self.get_price_precisions)
+
         if not self.alerts:
             self.load_alerts()
 
+        self.load_price_times()
+
+    def get_store(self):
+        if self.alert_store == self.ALERT_STORE_SQLITE:
+            # sqlite3 is only needed for the SQLite store
+            from models.stores.SqliteAlertStore import SqliteAlertStore
+
+            return SqliteAlertStore(file_path=self.alerts_file_path + self.alerts_db_file_name)
+
+        if self.alert_store == self.ALERT_STORE_BINARY:
+            return BinaryAlertStore(
+                file_path=self.alerts_file_path,
+                file_name=self.alerts_file_name,
+                new_alert_file_name=self.new_alert_file_name,
+                journal_file_name=self.alerts_journal_file_name
+            )
+
+        return JsonAlertStore(
+            file_path=self.alerts_file_path,
+            file_name=self.alerts_file_name,
+            new_alert_file_name=self.new_alert_file_name,
+            journal_file_name=self.alerts_journal_file_name
+        )
+
     def load_alerts(self):
-        alerts = list()
+        if self._client is None:
+            self._client = BitvavoPublicClient()
+
+        with Metrics.time_phase('load'):
+            self.alerts.extend(self._store.load())
+
+        self.load_new_alerts()
+
+        if not self.alerts:
+            logging.warning("No alerts set.")
+
+        logging.debug('ALERT:load_alerts:loaded_alerts:' + str(self.alerts))
+
+    def load_new_alerts(self):
+        """
+        Load alerts added by CreateAlert since last load
+        :return: number of added alerts
+        """
+        with Metrics.time_phase('load'):
+            alerts = self._store.load_new(len(self.alerts))
+
+        self.alerts.extend(alerts)
+
+        return len(alerts)
+
+    def mark_changed(self, alert: Alert):
+        """
+        Remember changed attributes of alert until next save
+        :param alert:
+        :return:
+        """
+        if not alert.changedAttributes or alert._id is None:
+            return
+
+        self._changed_attributes.setdefault(alert._id, set()).update(alert.changedAttributes)
+
+    def save_alerts(self):
+        with Metrics.time_phase('save'):
+            self.sync_engine()
+            self.archive_alerts()
+
+            self._store.save(self.alerts, self._changed_attributes)
+            self.save_price_times()
+
+        self._changed_attributes = {}
+
+    def get_price_times_file(self):
+        if not self.price_times_file_name or self.alerts_file_path is None:
+            return None
+
+        return self.alerts_file_path + self.price_times_file_name
+
+    def load_price_times(self):
+        """
+        Last price times saved by the run before, a market priced since is no gap on a cold start
+        :return:
+        """
+        file = self.get_price_times_file()
+
+        if file is None or not os.path.isfile(file):
+            return
 
         try:
-            with open(self.alerts_file_path + self.alerts_file_name, 'r') as fp:
-                alerts = json.load(fp, parse_float=self.get_decimal, parse_int=self.get_decimal)
-        except FileNotFoundError:
-            logging.info('No alert file.')
-            Path(self.alerts_file_path + self.alerts_file_name).touch()
-            logging.info('Created alert file.')
+            with open(file, 'r') as fp:
+                price_times = json.load(fp)
+        except (OSError, ValueError) as e:
+            logging.error('ALERT_HANDLER:load_price_times:FAILED:' + str(e))
 
             return
-        except simplejson.errors.JSONDecodeError as e:
-            logging.warning(e)
 
-        # load new alert from dedicated file
-        if self.new_alert_file_name is not None:
+        for market, price_time in price_times.items():
+            self._price_times[market] = max(self._price_times.get(market, 0.0), price_time)
+
+    def save_price_times(self):
+        file = self.get_price_times_file()
+
+        if file is None or not self._price_times:
+            return
+
+        try:
+            with open(file + '.tmp', 'w') as fp:
+                json.dump(self._price_times, fp)
+
+            os.replace(file + '.tmp', file)
+        except OSError as e:
+            # the markets are backfilled from the last update of their alerts by the next cold start
+            logging.error('ALERT_HANDLER:save_price_times:FAILED:' + str(e))
+            Metrics.inc('errors_total', component='save')
+
+    def save_hits(self):
+        """
+        Save alerts right after the orders of hits, a crash before the next save can't load the hits as active and sell again.
+        Hit alerts are archived by the next save
+        :return: False if not saved
+        """
+        with Metrics.time_phase('save_hits'):
+            self.sync_engine()
+
             try:
-                with open(self.alerts_file_path + self.new_alert_file_name, 'r') as fp:
-                    alerts.append(json.load(fp, parse_float=self.get_decimal, parse_int=self.get_decimal))
+                self._store.save(self.alerts, self._changed_attributes)
+            except OSError as e:
+                # orders are placed, their emails are still sent, the changes are saved by the next save
+                logging.error('ALERT_HANDLER:save_hits:FAILED:' + str(e))
+                Metrics.inc('errors_total', component='save')
 
-                os.remove(self.alerts_file_path + self.new_alert_file_name)
-            except FileNotFoundError:
-                logging.debug('No new alert file.')
-            except simplejson.errors.JSONDecodeError as e:
-                logging.warning(e)
+                return False
 
-        if not alerts:
-            logging.warning("No alerts set.")
+        self._changed_attributes = {}
 
-        for idx, alert in enumerate(alerts):
-            alert = Alert(
-                actions=alert['actions'],
-                amount=alert['amount'],
-                dt=datetime.datetime.strptime(alert['dt'], "%Y-%m-%d %H:%M:%S.%f"),
-                init_dt=datetime.datetime.strptime(alert['init_dt'], "%Y-%m-%d %H:%M:%S.%f"),
-                init_price=alert['init_price'],
-                market=alert['market'],
-                price=alert['price'],
-                status=alert['status'],
-                trailing_percentage=alert['trailing_percentage'],
-                trailing_price=alert['trailing_price'],
-                _client=BitvavoClient(
-                    market=alert['market']
-                )
-            )
+        return True
 
-            self.alerts.append(alert)
+    def sync_engine(self):
+        """
+        Write the prices held by the engine back to their alerts
+        :return:
+        """
+        if self._engine is None:
+            return
 
-        logging.debug('ALERT:load_alerts:loaded_alerts:' + str(self.alerts))
+        for alert in self._engine.sync_alerts():
+            self.mark_changed(alert)
 
-    def save_alerts(self):
-        alerts = list()
+    def archive_alerts(self):
+        """
+        Move hit alerts, their actions already ran, from the loaded alerts and the store to the archive
+        :return: number of archived alerts
+        """
+        if self._archive is None:
+            return 0
+
+        hit_alerts = [alert for alert in self.alerts if alert.status == Alert.STATUS_HIT]
+
+        if not hit_alerts:
+            return 0
 
-        for idx, alert in enumerate(self.alerts):
-            alerts.append(alert.attributes())
+        # archived first, a crash before removing them from the store leaves duplicates instead of losing alerts
+        self._archive.append(hit_alerts)
+        self._store.remove(hit_alerts)
 
-        with open(self.alerts_file_path + self.alerts_file_name, 'w') as fp:
-            json.dump(alerts, fp, indent=4, sort_keys=True, default=str)
+        for alert in hit_alerts:
+            self._changed_attributes.pop(alert._id, None)
 
-        logging.debug('ALERT:save_alerts:saved_alerts:' + str(alerts))
+        self.alerts[:] = [alert for alert in self.alerts if alert.status != Alert.STATUS_HIT]
+
+        # engine only appends alerts, rebuilt by the remaining alerts on next update
+        self._engine = None
+
+        logging.info('ALERT_HANDLER:archive_alerts:ARCHIVED:' + str(len(hit_alerts)))
+
+        return len(hit_alerts)
 
     @classmethod
     def get_decimal(cls, s):
         return Decimal(s)
 
-    def update_alerts(self):
-        for idx, alert in enumerate(self.alerts):
-            updated = self.alerts[idx].update_by_client()
+    def update_ticker_prices(self, ticker_prices: dict = None):
+        """
+        Load one price snapshot of all markets, shared by all alerts of the same market
+        :param ticker_prices: snapshot fetched by another process, like the coordinator of a sharded handler
+        :return:
+        """
+        self._ticker_prices = {}
 
-            if updated is False:
-                continue
+        if ticker_prices is None and self._client is None:
+            return False
+
+        if ticker_prices is None:
+            with Metrics.time_phase('fetch'):
+                ticker_prices = self._client.get_ticker_prices()
+
+        if ticker_prices is None:
+            logging.warning('ALERT_HANDLER:update_ticker_prices:PRICES_ARE_NONE')
+
+            return False
+
+        self._ticker_prices = ticker_prices
+
+        self.record_prices(ticker_prices)
+
+        return True
+
+    def record_prices(self, ticker_prices: dict):
+        """
+        Append prices to the price history, if set
+        :param ticker_prices: market => price
+        :return:
+        """
+        if self._price_history is None:
+            return
+
+        with Metrics.time_phase('history'):
+            self._price_history.append_prices(ticker_prices)
+
+    def close(self):
+        """
+        Release the price history files, the lock of the writer included
+        :return:
+        """
+        if self._price_history is not None:
+            self._price_history.close()
+            self._price_history = None
+
+    def update_alerts(self, ticker_prices: dict = None):
+        """
+        :param ticker_prices: price snapshot of the tick, fetched by the client if None
+        :return:
+        """
+        if self.update_ticker_prices(ticker_prices):
+            self.backfill_gaps(self._ticker_prices)
+
+        with Metrics.time_phase('evaluate'):
+            if self.alert_engine in (self.ALERT_ENGINE_COLUMNAR, self.ALERT_ENGINE_FIXED):
+                evaluated, changed, hit = self.update_alerts_by_engine()
+            else:
+                evaluated, changed, hit = self.update_alerts_by_ticker_prices()
+
+        self.record_alerts(evaluated, changed, hit)
+
+        for name, value in [('alerts_evaluated', evaluated), ('alerts_changed', changed), ('alerts_hit', hit)]:
+            Metrics.set(name, value)
+
+    def update_alerts_by_ticker_prices(self):
+        """
+        Update alerts one by one by the price snapshot
+        :return: number of evaluated, changed and hit alerts
+        """
+        evaluated = changed = 0
+        hit_alerts = []
+
+        for alert in self.alerts:
+            if alert.status == Alert.STATUS_ACTIVE:
+                evaluated += 1
+
+            if self.update_alert(alert, self._ticker_prices.get(alert.market), hit_alerts):
+                changed += 1
+
+        self.handle_hits(hit_alerts)
+
+        return evaluated, changed, len(hit_alerts)
+
+    @classmethod
+    def record_alerts(cls, evaluated: int, changed: int, hit: int):
+        Metrics.inc('alerts_evaluated_total', evaluated)
+        Metrics.inc('alerts_changed_total', changed)
+        Metrics.inc('alerts_hit_total', hit)
+
+    def get_engine(self):
+        if self._engine is None and self.alert_engine == self.ALERT_ENGINE_FIXED:
+            self._engine = FixedPointAlertEngine(precisions=self.get_price_precisions())
+
+        if self._engine is None:
+            # numpy is only needed for the columnar engine
+            from models.ColumnarAlertEngine import ColumnarAlertEngine
+
+            self._engine = ColumnarAlertEngine()
+
+        return self._engine
+
+    def get_price_precisions(self):
+        """
+        Price precisions of all markets, fetched once per process
+        :return: dict of market => significant digits, empty if not fetched
+        """
+        if self._price_precisions is None and self._client is not None:
+            try:
+                self._price_precisions = self._client.get_price_precisions()
+            except Exception as e:
+                logging.warning('ALERT_HANDLER:get_price_precisions:FAILED:' + str(e))
+
+        return self._price_precisions or {}
+
+    def update_alerts_by_engine(self):
+        """
+        Update all alerts by the price snapshot with the columnar or fixed point engine, only hit alerts are handled one by one
+        :return: number of evaluated, changed and hit alerts
+        """
+        engine = self.get_engine()
+        engine.load(self.alerts)
+
+        hit_alerts = engine.update(self._ticker_prices)
+
+        for alert in hit_alerts:
+            self.mark_changed(alert)
+
+        self.handle_hits(hit_alerts)
+
+        return engine.evaluated, engine.changed, len(hit_alerts)
+
+    def update_alerts_by_ticker_price(self, market: str, ticker_price: Decimal, alerts: list = None):
+        """
+        Update alerts of a single market by a streamed ticker price
+        :param market:
+        :param ticker_price:
+        :param alerts: alerts of market, all alerts are filtered by market if None
+        :return:
+        """
+        self._ticker_prices[market] = ticker_price
 
-            if self.alerts[idx].status != self.alerts[idx].STATUS_HIT:
+        self.record_prices({market: ticker_price})
+        self.backfill_gaps({market: ticker_price}, alerts)
+
+        if alerts is None:
+            alerts = [alert for alert in self.alerts if alert.market == market]
+
+        evaluated = changed = 0
+        hit_alerts = []
+
+        for alert in alerts:
+            if alert.status == Alert.STATUS_ACTIVE:
+                evaluated += 1
+
+            if self.update_alert(alert, ticker_price, hit_alerts):
+                changed += 1
+
+        self.handle_hits(hit_alerts)
+
+        self.record_alerts(evaluated, changed, len(hit_alerts))
+
+    def get_gaps(self, markets: list, alerts: list, now: float):
+        """
+        Markets not priced for more than gap_seconds, by the process or by the runs before it saved in the price times file,
+        markets never priced since the oldest update of their active alerts
+        :param markets:
+        :param alerts:
+        :param now: epoch seconds
+        :return: dict of market => epoch seconds of the last price seen
+        """
+        unknown_markets = set(market for market in markets if market not in self._price_times)
+
+        if unknown_markets:
+            for alert in alerts:
+                if alert.status != Alert.STATUS_ACTIVE or alert.market not in unknown_markets or alert.dt is None:
+                    continue
+
+                self._price_times[alert.market] = min(self._price_times.get(alert.market, now), alert.dt.timestamp())
+
+        return {
+            market: self._price_times[market]
+            for market in markets
+            if market in self._price_times and now - self._price_times[market] > self.gap_seconds
+        }
+
+    def backfill_gaps(self, ticker_prices: dict, alerts: list = None):
+        """
+        Replay the highs and lows missed in gaps of the price updates through the active alerts of their markets,
+        the candles of a gap are fetched by one request per market
+        :param ticker_prices: current price by market
+        :param alerts: alerts of the markets, all alerts if None
+        :return: number of alerts hit in a gap
+        """
+        now = time.time()
+
+        if alerts is None:
+            alerts = self.alerts
+
+        gaps = self.get_gaps(list(ticker_prices.keys()), alerts, now) if self.gap_seconds > 0 and self._client is not None else {}
+
+        for market in ticker_prices:
+            # a gap stays open until its candles are fetched, retried by the next update
+            if market not in gaps:
+                self._price_times[market] = now
+
+        if not gaps:
+            return 0
+
+        with Metrics.time_phase('backfill'):
+            self.sync_engine()
+
+            candles_by_market = {}
+
+            for market, since in gaps.items():
+                logging.warning('ALERT_HANDLER:backfill_gaps:GAP:' + market + ':%.0fs' % (now - since))
+
+                try:
+                    candles = self._client.get_candles(market, since, now)
+                except Exception as e:
+                    logging.error('ALERT_HANDLER:backfill_gaps:FAILED:' + market + ':' + str(e))
+                    candles = None
+
+                if candles is None:
+                    Metrics.inc('errors_total', component='backfill')
+
+                    continue
+
+                candles_by_market[market] = candles
+                self._price_times[market] = now
+                Metrics.inc('gap_backfills_total')
+
+            changed = 0
+            hit_alerts = []
+
+            for alert in alerts:
+                if alert.market not in gaps or alert.status != Alert.STATUS_ACTIVE:
+                    continue
+
+                # only candles started after the last update of the alert, the candle of the update holds prices before it
+                gap_starts = self._gap_starts.setdefault(alert.market, {})
+                start = gap_starts.setdefault(id(alert), max(gaps[alert.market], alert.dt.timestamp()))
+
+                if alert.market not in candles_by_market:
+                    # updates until the retry move the alert past the gap, its replay keeps the start of the first try
+                    continue
+
+                since_ms = start * 1000
+                candles = [candle for candle in candles_by_market[alert.market] if candle[0] >= since_ms]
+
+                if not alert.update_by_candles(candles, ticker_prices[alert.market]):
+                    continue
+
+                changed += 1
+                self.mark_changed(alert)
+
+                if alert.status == Alert.STATUS_HIT:
+                    hit_alerts.append(alert)
+
+            for market in candles_by_market:
+                self._gap_starts.pop(market, None)
+
+            if changed and self._engine is not None:
+                # engine holds the trailing prices of its alerts, rebuilt by the replayed alerts on next update
+                self._engine = None
+
+        self.handle_hits(hit_alerts)
+
+        self.record_alerts(0, changed, len(hit_alerts))
+
+        return len(hit_alerts)
+
+    def get_active_alerts_by_market(self):
+        alerts_by_market = {}
+
+        for alert in self.alerts:
+            if alert.status != Alert.STATUS_ACTIVE or alert.market is None:
                 continue
 
-            if self.alerts[idx].is_ticker_price_diverted():
+            alerts_by_market.setdefault(alert.market, []).append(alert)
+
+        return alerts_by_market
+
+    def get_trade_client(self, market: str):
+        """
+        Client per market, reused for all trades of the process, the trades of a market are placed one after the other
+        :param market:
+        :return:
+        """
+        if market not in self._trade_clients:
+            from models.clients.Bitvavo import BitvavoClient
+
+            self._trade_clients[market] = BitvavoClient(market=market, timeout=self.order_timeout)
+
+        self._trade_clients[market].reset_responses()
+
+        return self._trade_clients[market]
+
+    def get_order_pipeline(self):
+        if self._order_pipeline is None:
+            from models.OrderPipeline import OrderPipeline
+
+            self._order_pipeline = OrderPipeline()
+
+        return self._order_pipeline
+
+    def get_backup_client(self, market: str):
+        if market not in self._backup_clients:
+            from models.clients.Cryptowatch import CryptowatchClient
+
+            market_str_spl = market.split('-')
+
+            self._backup_clients[market] = CryptowatchClient(
+                _currency=market_str_spl[1].lower(),
+                _coin=market_str_spl[0].lower(),
+                timeout=self.backup_price_timeout
+            )
+
+        return self._backup_clients[market]
+
+    def get_backup_executor(self):
+        if self._backup_executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+
+            self._backup_executor = ThreadPoolExecutor(
+                max_workers=self.backup_price_workers,
+                thread_name_prefix='backup_price'
+            )
+
+        return self._backup_executor
+
+    @classmethod
+    def get_backup_price(cls, client: 'CryptowatchClient'):
+        try:
+            return client.get_ticker_price()
+        except Exception as e:
+            logging.warning('ALERT_HANDLER:get_backup_price:FAILED:' + str(e))
+            Metrics.inc('errors_total', component='cryptowatch')
+
+            return None
+
+    def get_backup_prices(self, alerts: list):
+        """
+        Fetch the backup price of every distinct backup client of alerts once, concurrently.
+        Prices not fetched within the backup price timeout are None
+        :param alerts:
+        :return: dict of backup client => price
+        """
+        for alert in alerts:
+            if alert._client_backup is None:
+                alert._client_backup = self.get_backup_client(alert.market)
+
+        clients = list(dict.fromkeys(alert._client_backup for alert in alerts))
+
+        if len(clients) == 1:
+            return {clients[0]: self.get_backup_price(clients[0])}
+
+        from concurrent.futures import wait
+
+        executor = self.get_backup_executor()
+        futures = {client: executor.submit(self.get_backup_price, client) for client in clients}
+
+        wait(futures.values(), timeout=self.backup_price_timeout)
+
+        backup_prices = {}
+
+        for client, future in futures.items():
+            if future.done():
+                backup_prices[client] = future.result()
+            else:
+                future.cancel()
+                backup_prices[client] = None
+
+                logging.warning('ALERT_HANDLER:get_backup_prices:TIMEOUT')
+                Metrics.inc('errors_total', component='cryptowatch')
+
+        return backup_prices
+
+    def update_alert(self, alert: Alert, ticker_price: Decimal = None, hit_alerts: list = None):
+        """
+        :param alert:
+        :param ticker_price:
+        :param hit_alerts: hit alert is appended to be handled with all hits of the tick, handled right away if None
+        :return:
+        """
+        updated = alert.update_by_client(ticker_price)
+
+        if updated is False:
+            return False
+
+        self.mark_changed(alert)
+
+        if alert.status != alert.STATUS_HIT:
+            return updated
+
+        if hit_alerts is None:
+            self.handle_hits([alert])
+        else:
+            hit_alerts.append(alert)
+
+        return updated
+
+    def handle_hits(self, alerts: list):
+        """
+        Run actions of hit alerts: backup prices are fetched once per market for all of them, sell orders of confirmed
+        alerts are placed concurrently, then the hits are saved and emails are sent
+        :param alerts:
+        :return: trades of the sell orders
+        """
+        if not alerts:
+            return []
+
+        with Metrics.time_phase('divergence_check'):
+            backup_prices = self.get_backup_prices(alerts)
+
+        confirmed_alerts = []
+        diverted_alerts = []
+
+        for alert in alerts:
+            if self.is_hit_confirmed(alert, backup_prices[alert._client_backup]):
+                confirmed_alerts.append(alert)
+            else:
+                diverted_alerts.append(alert)
+
+        # order and mail code is only loaded by a confirmed hit
+        from models.Trade import Trade
+
+        trades = [
+            Trade(_client=self.get_trade_client(alert.market), _alert=alert)
+            for alert in confirmed_alerts if alert.has_action(Alert.ACTION_SELL_ASSET)
+        ]
+
+        if trades:
+            with Metrics.time_phase('trade'):
+                self.get_order_pipeline().execute(trades)
+
+            for trade in trades:
+                if trade.is_placed():
+                    logging.info('ALERT_HANDLER:handle_hits:ORDER_PLACED:' + trade._alert.market + ':%.3fs' % trade.seconds)
+                else:
+                    logging.error('ALERT_HANDLER:handle_hits:ORDER_FAILED:' + trade._alert.market + ':' + str(trade.error or trade.response))
+
+        self.save_hits()
+
+        with Metrics.time_phase('notify'), Messages.digest():
+            for trade in trades:
+                trade.notify()
+
+            for alert in diverted_alerts:
                 Messages.send_email(
                     json.dumps(
                         {
-                            "alert_price": self.alerts[idx].price,
-                            "backup_price": self.alerts[idx].backup_price
+                            "alert_price": alert.price,
+                            "backup_price": alert.backup_price
                         },
                         indent=4,
                         sort_keys=True,
@@ -121,14 +745,23 @@ class AlertHandler(object):
                     'Ticker price diversion'
                 )
 
-                continue
+            for alert in confirmed_alerts:
+                if alert.has_action(Alert.ACTION_SEND_EMAIL):
+                    Messages.send_email(json.dumps(alert.attributes(), indent=4, sort_keys=True, default=str))
 
-            if Alert.ACTION_SELL_ASSET in self.alerts[idx].actions:
-                trade = Trade(
-                    _client=BitvavoClient(market=self.alerts[idx].market),
-                    _alert=self.alerts[idx]
-                )
-                trade.sell()
+        return trades
+
+    @classmethod
+    def is_hit_confirmed(cls, alert: Alert, backup_price: Decimal):
+        """
+        Hit alert is confirmed if its price is not diverted from the backup price
+        :param alert:
+        :param backup_price: None if the backup price could not be fetched
+        :return:
+        """
+        if backup_price is None:
+            alert.backup_price = None
+
+            return False
 
-            if Alert.ACTION_SEND_EMAIL in self.alerts[idx].actions:
-                Messages.send_email(json.dumps(self.alerts[idx].attributes(), indent=4, sort_keys=True, default=str))
+        return not alert.is_ticker_price_diverted(backup_price)
@@ -0,0 +1,116 @@
+import hashlib
+import logging
+import os
+from decimal import Decimal
+
+import simplejson
+import simplejson as json
+
+
+class AlertJournal(object):
+    """
+    Append-only journal of new alerts and changed alert attributes, replayed onto the snapshot in the alerts file.
+    The first line references the snapshot by checksum, a journal of an older snapshot is ignored.
+    """
+    file_path: str = None
+    compaction_entries: int = None
+
+    entries: int = 0
+    torn: bool = False
+
+    def __init__(self, **kwargs):
+        self.compaction_entries = int(kwargs.get('compaction_entries') if 'compaction_entries' in kwargs else os.environ.get('ALERTS_JOURNAL_COMPACTION_ENTRIES', '1000'))
+
+        for k, v in kwargs.items():
+            self.__setattr__(k, v)
+
+    @classmethod
+    def get_checksum(cls, snapshot: bytes):
+        return hashlib.sha1(snapshot).hexdigest()
+
+    @classmethod
+    def get_decimal(cls, s):
+        return Decimal(s)
+
+    def replay(self, alerts: list, snapshot: bytes):
+        """
+        Apply journal entries of snapshot onto alerts
+        :param alerts: list of alert dicts of snapshot
+        :param snapshot: content of alerts file
+        :return: list of alert dicts
+        """
+        self.entries = 0
+        self.torn = False
+
+        try:
+            with open(self.file_path, 'r') as fp:
+                lines = fp.readlines()
+        except FileNotFoundError:
+            logging.debug('ALERT_JOURNAL:replay:NO_JOURNAL')
+
+            return alerts
+
+        if not lines:
+            return alerts
+
+        try:
+            header = json.loads(lines[0])
+        except simplejson.errors.JSONDecodeError:
+            header = {}
+
+        if header.get('snapshot') != self.get_checksum(snapshot):
+            logging.warning('ALERT_JOURNAL:replay:JOURNAL_OF_OTHER_SNAPSHOT')
+
+            return alerts
+
+        for line in lines[1:]:
+            try:
+                entry = json.loads(line, parse_float=self.get_decimal, parse_int=self.get_decimal)
+            except simplejson.errors.JSONDecodeError:
+                # torn write of last entry
+                logging.warning('ALERT_JOURNAL:replay:INVALID_ENTRY:' + line)
+
+                self.torn = True
+
+                break
+
+            alert_id = int(entry['id'])
+
+            if 'alert' in entry:
+                if alert_id < len(alerts):
+                    alerts[alert_id] = entry['alert']
+                else:
+                    alerts.append(entry['alert'])
+            else:
+                alerts[alert_id].update(entry['changes'])
+
+            self.entries += 1
+
+        return alerts
+
+    def append(self, entries: list):
+        if not entries:
+            return
+
+        with open(self.file_path, 'a') as fp:
+            fp.write(''.join([json.dumps(entry, sort_keys=True, default=str) + '\n' for entry in entries]))
+            fp.flush()
+            os.fsync(fp.fileno())
+
+        self.entries += len(entries)
+
+    def reset(self, snapshot: bytes):
+        """
+        Start empty journal for new snapshot
+        :param snapshot: content of alerts file
+        :return:
+        """
+        with open(self.file_path, 'w') as fp:
+            fp.write(json.dumps({'snapshot': self.get_checksum(snapshot)}) + '\n')
+            fp.flush()
+            os.fsync(fp.fileno())
+
+        self.entries = 0
+
+    def is_compaction_due(self):
+        return self.entries >= self.compaction_entries
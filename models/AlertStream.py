@@ -0,0 +1,136 @@
+import logging
+import socket
+import threading
+from decimal import Decimal
+from models.AlertDaemon import AlertDaemon
+from models.AlertHandler import AlertHandler
+from models.clients.Bitvavo import BitvavoClient
+
+import simplejson as json
+
+
+class AlertStream(AlertDaemon):
+    """
+    Updates alerts by every tick of the Bitvavo ticker websocket channel, instead of polling.
+    Subscriptions follow the markets of active alerts on every daemon tick.
+    """
+    _client: BitvavoClient = None
+    _websocket = None
+    _lock: threading.Lock = None
+    _alerts_by_market: dict = None
+
+    close_timeout: float = 2.0
+    ticks_processed: int = 0
+
+    def __init__(self, **kwargs):
+        self._lock = threading.Lock()
+        self._alerts_by_market = {}
+
+        super().__init__(**kwargs)
+
+        if self._client is None:
+            # ticker channel is public, no authentication
+            self._client = BitvavoClient(api_key='', api_secret='')
+
+    def get_alert_handler(self):
+        # streamed prices are applied market by market to the alerts in this process
+        return AlertHandler()
+
+    def connect(self):
+        self._websocket = self._client.newWebsocket()
+        self._websocket.setErrorCallback(self.handle_error)
+
+    def close(self):
+        if self._websocket is None:
+            return
+
+        # closeSocket() stops the reconnect loop only after closing, which races a reconnect
+        self._websocket.keepAlive = False
+
+        # let the receiving thread see the closed connection before the socket is released,
+        # otherwise it may wait for its full select timeout
+        if self._websocket.ws.sock is not None and self._websocket.ws.sock.sock is not None:
+            try:
+                self._websocket.ws.sock.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+            self._websocket.receiveThread.join(self.close_timeout)
+
+        self._websocket.closeSocket()
+        self._websocket = None
+
+    def get_subscribed_markets(self):
+        return set(self._websocket.callbacks.get('subscriptionTicker', {}).keys())
+
+    def sync_subscriptions(self):
+        """
+        Subscribe markets of active alerts, unsubscribe markets without active alerts
+        :return:
+        """
+        with self._lock:
+            self._alerts_by_market = self._alert_handler.get_active_alerts_by_market()
+
+            markets = set(self._alerts_by_market.keys())
+
+        subscribed_markets = self.get_subscribed_markets()
+
+        for market in sorted(markets - subscribed_markets):
+            logging.info('ALERT_STREAM:sync_subscriptions:SUBSCRIBE:' + market)
+
+            self._websocket.subscriptionTicker(market, self.handle_ticker)
+
+        for market in sorted(subscribed_markets - markets):
+            logging.info('ALERT_STREAM:sync_subscriptions:UNSUBSCRIBE:' + market)
+
+            self.unsubscribe_ticker(market)
+
+    def unsubscribe_ticker(self, market: str):
+        del self._websocket.callbacks['subscriptionTicker'][market]
+
+        self._websocket.doSend(
+            self._websocket.ws,
+            json.dumps({'action': 'unsubscribe', 'channels': [{'name': 'ticker', 'markets': [market]}]})
+        )
+
+    def handle_ticker(self, message: dict):
+        if 'market' not in message or message.get('lastPrice') is None:
+            return
+
+        with self._lock:
+            alerts = self._alerts_by_market.get(message['market'])
+
+            if not alerts:
+                return
+
+            self._alert_handler.update_alerts_by_ticker_price(
+                message['market'],
+                Decimal(message['lastPrice']),
+                alerts
+            )
+
+            self.ticks_processed += 1
+
+    def handle_error(self, error):
+        logging.error('ALERT_STREAM:handle_error:' + str(error))
+
+    def tick(self):
+        with self._lock:
+            self._alert_handler.load_new_alerts()
+
+        self.sync_subscriptions()
+
+        if self.is_save_due():
+            self.save()
+
+    def save(self):
+        with self._lock:
+            super().save()
+
+    def run(self, max_ticks: int = None):
+        self.connect()
+
+        try:
+            super().run(max_ticks)
+        finally:
+            self.close()
@@ -0,0 +1,219 @@
+import csv
+import datetime
+from decimal import Decimal
+
+import numpy as np
+import simplejson as json
+
+
+class PriceSeries(object):
+    """
+    Ticker prices of one market over time, as int64 scaled by 10 ** scale like the columnar engine,
+    object arrays of python ints if scaled prices exceed int64
+    """
+    MAX_VALUE = 2 ** 62
+
+    market: str = None
+    scale: int = 0
+    dt: np.ndarray = None
+    price: np.ndarray = None
+
+    def __init__(self, **kwargs):
+        for k, v in kwargs.items():
+            self.__setattr__(k, v)
+
+    @classmethod
+    def get_by_prices(cls, market: str, dts: list, prices: list):
+        """
+        :param market:
+        :param dts: datetimes or epoch milliseconds
+        :param prices: decimals or strings
+        :return:
+        """
+        prices = [price if isinstance(price, Decimal) else Decimal(str(price)) for price in prices]
+        scale = max([max(0, -price.as_tuple().exponent) for price in prices], default=0)
+        scaled_prices = [int(price.scaleb(scale)) for price in prices]
+
+        if max(scaled_prices, default=0) < cls.MAX_VALUE:
+            price = np.array(scaled_prices, dtype=np.int64)
+        else:
+            price = np.array(scaled_prices, dtype=object)
+
+        if dts and not isinstance(dts[0], datetime.datetime):
+            dt = np.array(dts, dtype=np.int64).astype('datetime64[ms]')
+        else:
+            dt = np.array(dts, dtype='datetime64[ms]')
+
+        return cls(market=market, scale=scale, dt=dt, price=price)
+
+    @classmethod
+    def load(cls, file_path: str, market: str = None):
+        if file_path.endswith('.json'):
+            return cls.load_candles(file_path, market)
+
+        return cls.load_csv(file_path, market)
+
+    @classmethod
+    def load_csv(cls, file_path: str, market: str = None):
+        """
+        CSV with a header of dt (ISO datetime) or timestamp (epoch milliseconds), price or close
+        and optionally market, rows of other markets are skipped
+        :param file_path:
+        :param market:
+        :return:
+        """
+        dts = []
+        prices = []
+
+        with open(file_path, 'r', newline='') as fp:
+            for row in csv.DictReader(fp):
+                if market is not None and row.get('market', market) != market:
+                    continue
+
+                if 'timestamp' in row:
+                    dts.append(int(row['timestamp']))
+                else:
+                    dts.append(datetime.datetime.fromisoformat(row['dt']))
+
+                prices.append(row['price'] if 'price' in row else row['close'])
+
+        return cls.get_by_prices(market, dts, prices)
+
+    @classmethod
+    def load_candles(cls, file_path: str, market: str = None):
+        """
+        Candles as returned by the Bitvavo candles endpoint, [timestamp, open, high, low, close, volume], newest first.
+        Replayed by the close price
+        :param file_path:
+        :param market:
+        :return:
+        """
+        with open(file_path, 'r') as fp:
+            candles = sorted(json.load(fp), key=lambda candle: candle[0])
+
+        return cls.get_by_prices(market, [candle[0] for candle in candles], [candle[4] for candle in candles])
+
+    def __len__(self):
+        return len(self.price)
+
+    def get_decimal(self, value):
+        return Decimal(int(value)).scaleb(-self.scale)
+
+    def get_dt(self, idx: int):
+        return self.dt[idx].astype(datetime.datetime)
+
+
+class BacktestResult(object):
+    market: str = None
+    trailing_percentage: Decimal = None
+    entry_dt: datetime.datetime = None
+    entry_price: Decimal = None
+    hit: bool = False
+    hit_dt: datetime.datetime = None
+    exit_price: Decimal = None
+    trailing_price: Decimal = None
+    peak_price: Decimal = None
+    drawdown: Decimal = None
+    max_drawdown: Decimal = None
+    profit: Decimal = None
+    ticks: int = 0
+
+    def __init__(self, **kwargs):
+        for k, v in kwargs.items():
+            self.__setattr__(k, v)
+
+    def attributes(self):
+        return {
+            'market': self.market,
+            'trailing_percentage': self.trailing_percentage,
+            'entry_dt': self.entry_dt,
+            'entry_price': self.entry_price,
+            'hit': self.hit,
+            'hit_dt': self.hit_dt,
+            'exit_price': self.exit_price,
+            'trailing_price': self.trailing_price,
+            'peak_price': self.peak_price,
+            'drawdown': self.drawdown,
+            'max_drawdown': self.max_drawdown,
+            'profit': self.profit,
+            'ticks': self.ticks
+        }
+
+
+class Backtest(object):
+    """
+    Replays a price series through the rules of Alert.init_attributes and Alert.update_by_client, vectorized.
+    The alert is set at the first price, its price follows every tick, so its trailing price is
+    trailing_percentage times the running maximum of the prices. It is hit by the first price at or below
+    the trailing price set by the ticks before. Comparisons are made on scaled integers, exact like the Decimal path
+    """
+    series: PriceSeries = None
+    _peaks: dict = None
+
+    def __init__(self, **kwargs):
+        self._peaks = {}
+
+        for k, v in kwargs.items():
+            self.__setattr__(k, v)
+
+    def get_peak(self, start: int, end: int):
+        if (start, end) not in self._peaks:
+            self._peaks[(start, end)] = np.maximum.accumulate(self.series.price[start:end])
+
+        return self._peaks[(start, end)]
+
+    def run(self, trailing_percentage: Decimal, start: int = 0, end: int = None):
+        """
+        :param trailing_percentage:
+        :param start: index of the entry price
+        :param end: index after the last price replayed, all prices if None
+        :return: BacktestResult
+        """
+        trailing_percentage = Decimal(trailing_percentage)
+        series = self.series
+        price = series.price[start:end]
+        peak = self.get_peak(start, end)
+
+        percentage_scale = max(0, -trailing_percentage.as_tuple().exponent)
+        percentage = int(trailing_percentage.scaleb(percentage_scale))
+
+        if len(price) and int(peak[-1]) * max(percentage, 10 ** percentage_scale) >= PriceSeries.MAX_VALUE:
+            price = price.astype(object)
+            peak = peak.astype(object)
+
+        # price of tick t against the trailing price by ticks up to t - 1
+        hits = price[1:] * 10 ** percentage_scale <= peak[:-1] * percentage
+        hit = bool(hits.any())
+
+        last = int(np.argmax(hits)) + 1 if hit else len(price) - 1
+
+        peaks = peak[:last + 1].astype(np.float64)
+        drawdowns = (peaks - price[:last + 1].astype(np.float64)) / peaks
+        max_drawdown_idx = int(np.argmax(drawdowns))
+
+        entry_price = series.get_decimal(price[0])
+        last_price = series.get_decimal(price[last])
+        peak_price = series.get_decimal(peak[last - 1] if hit else peak[last])
+        max_drawdown_peak_price = series.get_decimal(peak[max_drawdown_idx])
+
+        return BacktestResult(
+            market=series.market,
+            trailing_percentage=trailing_percentage,
+            entry_dt=series.get_dt(start),
+            entry_price=entry_price,
+            hit=hit,
+            hit_dt=series.get_dt(start + last) if hit else None,
+            exit_price=last_price if hit else None,
+            trailing_price=peak_price * trailing_percentage,
+            peak_price=peak_price,
+            drawdown=(peak_price - last_price) / peak_price,
+            max_drawdown=(max_drawdown_peak_price - series.get_decimal(price[max_drawdown_idx])) / max_drawdown_peak_price,
+            profit=(last_price - entry_price) / entry_price,
+            ticks=last + 1
+        )
+
+    def run_many(self, trailing_percentages: list, start: int = 0, end: int = None):
+        """
+        :return: list of BacktestResult, one per trailing percentage, the running maximum is shared
+        """
+        return [self.run(trailing_percentage, start, end) for trailing_percentage in trailing_percentages]
@@ -0,0 +1,84 @@
+import numpy as np
+
+from models.AlertEngine import AlertBook, AlertEngine
+
+
+class MarketBook(AlertBook):
+    """
+    Arrays of all initiated alerts of one market, int64 scaled values of AlertBook.
+    """
+    LOG_NAME = 'COLUMNAR_ALERT_ENGINE'
+
+    STATUS_ACTIVE = 1
+    STATUS_HIT = 2
+
+    # headroom below int64 max for products of price and percentage
+    MAX_VALUE = 2 ** 62
+
+    price: np.ndarray = None
+    trailing_price: np.ndarray = None
+    trailing_percentage: np.ndarray = None
+    status: np.ndarray = None
+    dt: np.ndarray = None
+    changed_price: np.ndarray = None
+    changed_trailing_price: np.ndarray = None
+
+    @classmethod
+    def get_max_value(cls):
+        return cls.MAX_VALUE
+
+    def is_built(self):
+        return self.price is not None
+
+    def build_values(self, prices: list, trailing_prices: list, percentages: list, active: list):
+        self.price = np.array(prices, dtype=np.int64)
+        self.trailing_price = np.array(trailing_prices, dtype=np.int64)
+        self.trailing_percentage = np.array(percentages, dtype=np.int64)
+        self.status = np.array([self.STATUS_ACTIVE if is_active else self.STATUS_HIT for is_active in active], dtype=np.int8)
+        self.dt = np.zeros(len(self.alerts), dtype=np.float64)
+        self.changed_price = np.zeros(len(self.alerts), dtype=bool)
+        self.changed_trailing_price = np.zeros(len(self.alerts), dtype=bool)
+
+    def get_max_trailing_price(self):
+        return int(np.abs(self.trailing_price).max(initial=0))
+
+    def scale_values(self, factor: int):
+        self.price = self.price * factor
+        self.trailing_price = self.trailing_price * factor
+
+    def evaluate(self, tick: int, tick_trailing: int, dt: float):
+        active = self.status == self.STATUS_ACTIVE
+        hit = active & (tick_trailing <= self.trailing_price)
+        moved = active & ~hit & (self.price != tick)
+        increased = moved & (tick > self.price)
+
+        new_trailing_price = tick * self.trailing_percentage
+        raised = increased & (new_trailing_price > self.trailing_price)
+
+        self.trailing_price = np.where(raised, new_trailing_price, self.trailing_price)
+        self.changed_trailing_price |= raised
+
+        changed = hit | moved
+        self.evaluated = int(np.count_nonzero(active))
+        self.changed = int(np.count_nonzero(changed))
+        self.price[changed] = tick
+        self.dt[changed] = dt
+        self.changed_price |= changed
+
+        hit_idx = np.flatnonzero(hit)
+        self.status[hit_idx] = self.STATUS_HIT
+
+        return hit_idx
+
+    def get_changed_idx(self):
+        return np.flatnonzero(self.changed_price | self.changed_trailing_price)
+
+
+class ColumnarAlertEngine(AlertEngine):
+    """
+    Evaluates all alerts of a tick market by market in a few vectorized operations,
+    alert objects are only written on hits and on sync_alerts().
+    """
+    LOG_NAME = 'COLUMNAR_ALERT_ENGINE'
+
+    book_class = MarketBook
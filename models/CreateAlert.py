@@ -1,4 +1,3 @@
-import sys
 import simplejson as json
 import os
 from decimal import Decimal
@@ -9,8 +8,10 @@ import main
 
 class CreateAlert(object):
     _client: BitvavoClient = None
+    _store = None
     file_name: str = os.environ.get('ALERTS_FILE_NAME')
     alerts_file_path: str = None
+    sweep_results_file: str = None
 
     alert = None
 
@@ -26,32 +27,52 @@ class CreateAlert(object):
     def __init__(self, **kwargs):
         self.actions = []
         self.alerts_file_path = os.environ.get('ALERTS_FILE_PATH')
+        self.sweep_results_file = os.environ.get('SWEEP_RESULTS_FILE')
 
-        if len(sys.argv) > 1 and 'test_create_alert_logic' not in sys.argv[1]:
-            if len(sys.argv) > 1:
-                self.alert_trailing_percentage = Decimal(sys.argv[1])
+        for k, v in kwargs.items():
+            self.__setattr__(k, v)
 
-            if len(sys.argv) > 2:
-                self.market_selection_type = sys.argv[2]
+        if self._store is None and os.environ.get('ALERT_STORE') == 'sqlite':
+            from models.stores.SqliteAlertStore import SqliteAlertStore
 
-            if len(sys.argv) > 3:
-                self.market = sys.argv[3]
+            self._store = SqliteAlertStore(file_path=self.alerts_file_path + os.environ.get('ALERTS_DB_FILE_NAME'))
 
-            if len(sys.argv) > 4:
-                self.actions_selection = sys.argv[4]
+    @classmethod
+    def get_options_by_argv(cls, argv: list):
+        """
+        :param argv: trailing percentage, market selection type, market, actions selection, init price type and init price,
+        all optional, without the script name
+        :return: options of the constructor
+        """
+        options = {}
 
-            if len(sys.argv) > 5:
-                self.init_price_type = Decimal(sys.argv[5])
+        if len(argv) > 0:
+            options['alert_trailing_percentage'] = Decimal(argv[0])
 
-            if len(sys.argv) > 6:
-                self.alert_init_price = Decimal(sys.argv[6])
+        if len(argv) > 1:
+            options['market_selection_type'] = argv[1]
 
-        self.alerts_file_path = os.environ.get('ALERTS_FILE_PATH')
+        if len(argv) > 2:
+            options['market'] = argv[2]
 
-        for k, v in kwargs.items():
-            self.__setattr__(k, v)
+        if len(argv) > 3:
+            options['actions_selection'] = argv[3]
+
+        if len(argv) > 4:
+            options['init_price_type'] = argv[4]
+
+        if len(argv) > 5:
+            options['alert_init_price'] = Decimal(argv[5])
+
+        return options
 
     def save_alert(self):
+        if self._store is not None:
+            # inserted directly, the updating process picks it up by its next load of new alerts
+            self._store.add(self.alert)
+
+            return
+
         with open(self.alerts_file_path + self.file_name, 'w') as fp:
             json.dump(self.alert.attributes(), fp, indent=4, sort_keys=True, default=str)
 
@@ -79,8 +100,19 @@ class CreateAlert(object):
             self.alert_init_price = Decimal(input())
 
         if self.alert_trailing_percentage is None:
-            print('Insert trail in percentage like ["0.9", "0.45"]')
-            self.alert_trailing_percentage = Decimal(input())
+            suggestion = self.get_suggested_trailing_percentage()
+
+            if suggestion is None:
+                print('Insert trail in percentage like ["0.9", "0.45"]')
+            else:
+                print('Insert trail in percentage like ["0.9", "0.45"], empty for ' + str(suggestion) + ' ranked first by backtest')
+
+            trailing_percentage = input()
+
+            if trailing_percentage == '' and suggestion is not None:
+                self.alert_trailing_percentage = suggestion
+            else:
+                self.alert_trailing_percentage = Decimal(trailing_percentage)
 
         if self.actions_selection is None:
             print('Which actions should be activated?')
@@ -119,6 +151,18 @@ class CreateAlert(object):
         print('New alert created.')
         print(self.alert.attributes())
 
+    def get_suggested_trailing_percentage(self):
+        """
+        :return: trailing percentage ranked first for market by sweep_trailing_percentages.py, None if not swept
+        """
+        if not self.sweep_results_file:
+            return None
+
+        # numpy is only needed with sweep results
+        from models.ParameterSweep import ParameterSweep
+
+        return ParameterSweep.get_suggestion(self.sweep_results_file, self.market)
+
     def choose_market(self):
         print('Choose market, like "ETH-EUR"')
         print(' [1] Type in your market string')
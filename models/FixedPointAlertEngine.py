@@ -0,0 +1,92 @@
+from decimal import getcontext
+
+from models.AlertEngine import AlertBook, AlertEngine
+
+
+class FixedPointBook(AlertBook):
+    """
+    Initiated alerts of one market as lists of the scaled integers of AlertBook, evaluated one by one without numpy.
+    Values stay below the Decimal context precision
+    """
+    LOG_NAME = 'FIXED_POINT_ALERT_ENGINE'
+
+    price: list = None
+    trailing_price: list = None
+    trailing_percentage: list = None
+    active: list = None
+    dt: list = None
+    changed_price: list = None
+    changed_trailing_price: list = None
+
+    @classmethod
+    def get_max_value(cls):
+        return 10 ** getcontext().prec
+
+    def is_built(self):
+        return self.price is not None
+
+    def build_values(self, prices: list, trailing_prices: list, percentages: list, active: list):
+        self.price = prices
+        self.trailing_price = trailing_prices
+        self.trailing_percentage = percentages
+        self.active = active
+        self.dt = [None] * len(self.alerts)
+        self.changed_price = [False] * len(self.alerts)
+        self.changed_trailing_price = [False] * len(self.alerts)
+
+    def get_max_trailing_price(self):
+        return max(self.trailing_price, default=0)
+
+    def scale_values(self, factor: int):
+        self.price = [price * factor for price in self.price]
+        self.trailing_price = [trailing_price * factor for trailing_price in self.trailing_price]
+
+    def evaluate(self, tick: int, tick_trailing: int, dt: float):
+        price = self.price
+        trailing_price = self.trailing_price
+        trailing_percentage = self.trailing_percentage
+        active = self.active
+
+        evaluated = changed = 0
+        hit_idx = []
+
+        for idx in range(len(price)):
+            if not active[idx]:
+                continue
+
+            evaluated += 1
+
+            if tick_trailing <= trailing_price[idx]:
+                hit_idx.append(idx)
+                active[idx] = False
+            elif tick == price[idx]:
+                continue
+            elif tick > price[idx]:
+                new_trailing_price = tick * trailing_percentage[idx]
+
+                if new_trailing_price > trailing_price[idx]:
+                    trailing_price[idx] = new_trailing_price
+                    self.changed_trailing_price[idx] = True
+
+            changed += 1
+            price[idx] = tick
+            self.dt[idx] = dt
+            self.changed_price[idx] = True
+
+        self.evaluated = evaluated
+        self.changed = changed
+
+        return hit_idx
+
+    def get_changed_idx(self):
+        return [idx for idx in range(len(self.alerts)) if self.changed_price[idx] or self.changed_trailing_price[idx]]
+
+
+class FixedPointAlertEngine(AlertEngine):
+    """
+    Evaluates all alerts of a tick market by market on scaled integers instead of Decimal, without numpy.
+    Alert objects are only written on hits and on sync_alerts()
+    """
+    LOG_NAME = 'FIXED_POINT_ALERT_ENGINE'
+
+    book_class = FixedPointBook
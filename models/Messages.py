@@ -1,37 +1,253 @@
-import smtplib
 import logging
-from email.mime.text import MIMEText
+import threading
+import time
+from contextlib import contextmanager
 import os
+from models.Metrics import Metrics
+from models.NotificationOutbox import NotificationOutbox
 
 
 class Messages(object):
+    """
+    Emails over one authenticated SMTP connection, reused until it is older than SMTP_CONNECTION_MAX_AGE seconds
+    and reconnected once if it broke in between. Emails of a digest() block can be merged into one email per subject.
+    With the outbox started, emails are queued on disk and delivered by its worker instead of sent by the caller
+    """
     E_MAIL_SUBJECT: str = 'Trailing stop hit.'
     FROM: str = 'Bitvavo Trailing Alert'
+    DIGEST_SEPARATOR: str = '\n\n' + '-' * 40 + '\n\n'
+
+    CONNECTION_MAX_AGE = 60.0
+    TIMEOUT = 10.0
+
+    # connection lock is held during SMTP I/O, the digest lock never is
+    _lock = threading.RLock()
+    _digest_lock = threading.Lock()
+    _connection: 'smtplib.SMTP' = None
+    _connected_at: float = None
+    _digest: list = None
+    _outbox: NotificationOutbox = None
 
     @classmethod
     def send_email(cls, message: str, subject: str = None):
-        smtp_server = os.environ.get('SMTP_SERVER_URI')
-        port = os.environ.get('SMTP_SERVER_PORT')
-        email_user = os.environ.get('EMAIL_USER')
-        email_user_pw = os.environ.get('EMAIL_USER_PW')
+        subject = subject or cls.E_MAIL_SUBJECT
+
+        with cls._digest_lock:
+            if cls._digest is not None:
+                cls._digest.append((subject, message))
+
+                return True
+
+        return cls.dispatch(message, subject)
+
+    @classmethod
+    def dispatch(cls, message: str, subject: str):
+        """
+        Queue email in the outbox if started, send it right away otherwise
+        :return: True if queued or sent
+        """
+        outbox = cls._outbox
+
+        if outbox is not None:
+            outbox.put(message, subject)
+
+            return True
+
+        return cls.deliver(message, subject)
+
+    @classmethod
+    def deliver(cls, message: str, subject: str):
+        return cls.send(cls.get_message(message, subject))
+
+    @classmethod
+    def start_outbox(cls, file_path: str = None, deliver: bool = True):
+        """
+        :param file_path: outbox directory, NOTIFICATION_OUTBOX_PATH if None, emails are sent by the caller if not set
+        :param deliver: False to only queue emails, delivered by the outbox of another process
+        :return: started outbox, None if no outbox is set
+        """
+        file_path = file_path or os.environ.get('NOTIFICATION_OUTBOX_PATH')
+
+        if not file_path or cls._outbox is not None:
+            return cls._outbox
+
+        cls._outbox = NotificationOutbox(file_path=file_path, _send=cls.deliver)
+
+        if deliver:
+            cls._outbox.start()
+
+        logging.info('MESSAGES:start_outbox:STARTED:' + file_path)
+
+        return cls._outbox
+
+    @classmethod
+    def wakeup_outbox(cls):
+        """
+        Deliver emails queued by other processes now
+        :return:
+        """
+        outbox = cls._outbox
+
+        if outbox is not None:
+            outbox.wakeup()
+
+    @classmethod
+    def stop_outbox(cls, timeout: float = 0.0):
+        """
+        :param timeout: seconds to wait for the emails due now to be delivered
+        :return: True if no email is left queued
+        """
+        outbox = cls._outbox
+
+        if outbox is None:
+            return True
+
+        cls._outbox = None
+
+        return outbox.stop(timeout)
+
+    @classmethod
+    def get_message(cls, message: str, subject: str):
+        # email and smtplib are only loaded when an email is sent
+        from email.mime.text import MIMEText
 
         msg = MIMEText(message, 'text')
-        msg['Subject'] = subject or cls.E_MAIL_SUBJECT
+        msg['Subject'] = subject
         msg['From'] = cls.FROM
         msg['To'] = os.environ.get('RECEIVER_EMAIL')
 
+        return msg
+
+    @classmethod
+    def connect(cls):
+        import smtplib
+
+        smtp_server = os.environ.get('SMTP_SERVER_URI')
+        port = os.environ.get('SMTP_SERVER_PORT')
+
+        timeout = float(os.environ.get('SMTP_TIMEOUT', cls.TIMEOUT))
+
+        # plain SMTP for local relays and the simulator
+        if os.environ.get('SMTP_SSL', '1') == '0':
+            server = smtplib.SMTP(smtp_server, port, timeout=timeout)
+        else:
+            server = smtplib.SMTP_SSL(smtp_server, port, timeout=timeout)
+
+        logging.info('Created smtp socket.')
+        server.ehlo()
+        server.login(os.environ.get('EMAIL_USER'), os.environ.get('EMAIL_USER_PW'))
+        logging.info('Logged into smtp server.')
+
+        Metrics.inc('smtp_connections_total')
+
+        return server
+
+    @classmethod
+    def get_connection(cls):
+        max_age = float(os.environ.get('SMTP_CONNECTION_MAX_AGE', cls.CONNECTION_MAX_AGE))
+
+        if cls._connection is not None and time.monotonic() - cls._connected_at >= max_age:
+            cls.close()
+
+        if cls._connection is None:
+            cls._connection = cls.connect()
+            cls._connected_at = time.monotonic()
+
+        return cls._connection
+
+    @classmethod
+    def send(cls, msg: 'MIMEText'):
+        """
+        Send on the open connection, a reused connection broken in between is replaced once
+        :param msg:
+        :return: True if sent
+        """
+        with cls._lock:
+            for attempt in range(2):
+                reused = cls._connection is not None
+
+                try:
+                    cls.get_connection().send_message(
+                        msg,
+                        from_addr=os.environ.get('SENDER_EMAIL'),
+                        to_addrs=os.environ.get('RECEIVER_EMAIL'),
+                    )
+                    logging.info('E-mail sent.')
+
+                    return True
+                except Exception as e:
+                    cls.close()
+
+                    if reused and attempt == 0:
+                        logging.warning('MESSAGES:send:RECONNECTING:' + str(e))
+
+                        continue
+
+                    Metrics.inc('errors_total', component='smtp')
+
+                    logging.error(e)
+
+                    return False
+
+    @classmethod
+    def close(cls):
+        with cls._lock:
+            if cls._connection is None:
+                return
+
+            try:
+                cls._connection.quit()
+            except Exception:
+                # already closed by the server
+                pass
+
+            cls._connection = None
+            cls._connected_at = None
+
+    @classmethod
+    def is_digest_enabled(cls):
+        return os.environ.get('EMAIL_DIGEST', '0') == '1'
+
+    @classmethod
+    @contextmanager
+    def digest(cls):
+        """
+        Collect emails sent within the block, sent on exit as one digest email per subject if EMAIL_DIGEST is set
+        :return:
+        """
+        with cls._digest_lock:
+            collecting = cls.is_digest_enabled() and cls._digest is None
+
+            if collecting:
+                cls._digest = []
+
         try:
-            server = smtplib.SMTP_SSL(smtp_server, port)
-            logging.info('Created smtp socket.')
-            server.ehlo()
-            server.login(email_user, email_user_pw)
-            logging.info('Logged into smtp server.')
-            server.send_message(
-                msg,
-                from_addr=os.environ.get('SENDER_EMAIL'),
-                to_addrs=os.environ.get('RECEIVER_EMAIL'),
-            )
-            logging.info('E-mail sent.')
-            server.quit()
-        except Exception as e:
-            logging.error(e)
+            yield
+        finally:
+            if collecting:
+                with cls._digest_lock:
+                    messages = cls._digest
+                    cls._digest = None
+
+                cls.send_digest(messages)
+
+    @classmethod
+    def send_digest(cls, messages: list):
+        """
+        :param messages: list of subject and message
+        :return: number of emails queued or sent
+        """
+        messages_by_subject = {}
+
+        for subject, message in messages:
+            messages_by_subject.setdefault(subject, []).append(message)
+
+        sent = 0
+
+        for subject, subject_messages in messages_by_subject.items():
+            if len(subject_messages) > 1:
+                subject = subject + ' (' + str(len(subject_messages)) + ')'
+
+            sent += cls.dispatch(cls.DIGEST_SEPARATOR.join(subject_messages), subject)
+
+        return sent
@@ -0,0 +1,243 @@
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+class Metrics(object):
+    """
+    Process wide counters, gauges and duration histograms, exported in Prometheus text format
+    as text file for the node exporter textfile collector or by a local scrape endpoint
+    """
+    PREFIX = 'trailing_alert_'
+    CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+    # seconds, up to the one minute budget of a tick
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+    HELP = {
+        'phase_duration_seconds': 'Duration of phases of updating alerts.',
+        'tick_duration_seconds': 'Duration of a tick, loading new alerts up to saving them.',
+        'last_tick_duration_seconds': 'Duration of the last tick.',
+        'tick_budget_seconds': 'Time available for a tick.',
+        'ticks_total': 'Ticks run.',
+        'api_request_duration_seconds': 'Latency of API requests by endpoint.',
+        'api_requests_total': 'API requests by endpoint and status code.',
+        'alerts_evaluated_total': 'Alerts evaluated against a ticker price.',
+        'alerts_changed_total': 'Alerts changed by a ticker price.',
+        'alerts_hit_total': 'Alerts hit by a ticker price.',
+        'alerts_evaluated': 'Alerts evaluated in the last tick.',
+        'alerts_changed': 'Alerts changed in the last tick.',
+        'alerts_hit': 'Alerts hit in the last tick.',
+        'errors_total': 'Errors by component.',
+        'order_duration_seconds': 'Duration of placing a sell order, balance request included.',
+        'orders_total': 'Sell orders by placed or failed.',
+        'rate_limit_remaining': 'Remaining weight of the Bitvavo rate limit budget.',
+        'rate_limit_blocked_seconds': 'Seconds left of the backoff after a rate limit or ban response.',
+        'rate_limit_weight_total': 'Weight of Bitvavo requests sent by priority.',
+        'rate_limit_throttled_total': 'Bitvavo requests not sent for lack of budget by priority.',
+        'rate_limit_responses_total': 'Rate limit and ban responses by status code.',
+        'smtp_connections_total': 'Authenticated SMTP connections opened.',
+        'notifications_queued_total': 'Emails queued in the outbox.',
+        'notifications_sent_total': 'Emails delivered from the outbox.',
+        'notifications_retried_total': 'Failed deliveries of emails from the outbox, retried later.',
+        'notifications_failed_total': 'Emails given up after the max attempts.',
+        'notifications_pending': 'Emails left in the outbox after the last delivery run.',
+    }
+
+    _lock = threading.Lock()
+    _counters = {}
+    _gauges = {}
+    _histograms = {}
+    _server: 'ThreadingHTTPServer' = None
+
+    @classmethod
+    def get_key(cls, name: str, labels: dict):
+        return name, tuple(sorted(labels.items()))
+
+    @classmethod
+    def inc(cls, name: str, value: float = 1, **labels):
+        key = cls.get_key(name, labels)
+
+        with cls._lock:
+            cls._counters[key] = cls._counters.get(key, 0) + value
+
+    @classmethod
+    def set(cls, name: str, value: float, **labels):
+        with cls._lock:
+            cls._gauges[cls.get_key(name, labels)] = value
+
+    @classmethod
+    def observe(cls, name: str, seconds: float, **labels):
+        key = cls.get_key(name, labels)
+
+        with cls._lock:
+            histogram = cls._histograms.get(key)
+
+            if histogram is None:
+                # count per bucket, count, sum
+                histogram = cls._histograms[key] = [[0] * len(cls.BUCKETS), 0, 0.0]
+
+            for idx, bucket in enumerate(cls.BUCKETS):
+                if seconds <= bucket:
+                    histogram[0][idx] += 1
+
+            histogram[1] += 1
+            histogram[2] += seconds
+
+    @classmethod
+    @contextmanager
+    def time(cls, name: str, **labels):
+        """
+        Observe duration of with block in seconds
+        """
+        started = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            cls.observe(name, time.perf_counter() - started, **labels)
+
+    @classmethod
+    def time_phase(cls, phase: str):
+        return cls.time('phase_duration_seconds', phase=phase)
+
+    @classmethod
+    def get_value(cls, name: str, **labels):
+        """
+        :return: value of counter or gauge, count of histogram, None if not recorded
+        """
+        key = cls.get_key(name, labels)
+
+        with cls._lock:
+            if key in cls._counters:
+                return cls._counters[key]
+
+            if key in cls._gauges:
+                return cls._gauges[key]
+
+            if key in cls._histograms:
+                return cls._histograms[key][1]
+
+        return None
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls._counters.clear()
+            cls._gauges.clear()
+            cls._histograms.clear()
+
+    @classmethod
+    def format_labels(cls, labels: tuple, extra: tuple = ()):
+        labels = labels + extra
+
+        if not labels:
+            return ''
+
+        return '{' + ','.join([
+            k + '="' + str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"' for k, v in labels
+        ]) + '}'
+
+    @classmethod
+    def format_value(cls, value: float):
+        if value == float('inf'):
+            return '+Inf'
+
+        return repr(float(value)) if isinstance(value, float) else str(value)
+
+    @classmethod
+    def get_text(cls):
+        """
+        :return: all metrics in Prometheus text exposition format
+        """
+        with cls._lock:
+            counters = dict(cls._counters)
+            gauges = dict(cls._gauges)
+            histograms = {key: [list(h[0]), h[1], h[2]] for key, h in cls._histograms.items()}
+
+        lines = []
+
+        for metrics, metric_type in [(counters, 'counter'), (gauges, 'gauge'), (histograms, 'histogram')]:
+            names = sorted(set([name for name, labels in metrics.keys()]))
+
+            for name in names:
+                lines.append('# HELP ' + cls.PREFIX + name + ' ' + cls.HELP.get(name, name))
+                lines.append('# TYPE ' + cls.PREFIX + name + ' ' + metric_type)
+
+                for (metric_name, labels), value in sorted(metrics.items()):
+                    if metric_name != name:
+                        continue
+
+                    if metric_type != 'histogram':
+                        lines.append(cls.PREFIX + name + cls.format_labels(labels) + ' ' + cls.format_value(value))
+
+                        continue
+
+                    buckets, count, total = value
+
+                    for bucket, bucket_count in zip(cls.BUCKETS, buckets):
+                        lines.append(cls.PREFIX + name + '_bucket' + cls.format_labels(labels, (('le', cls.format_value(bucket)),)) + ' ' + str(bucket_count))
+
+                    lines.append(cls.PREFIX + name + '_bucket' + cls.format_labels(labels, (('le', '+Inf'),)) + ' ' + str(count))
+                    lines.append(cls.PREFIX + name + '_sum' + cls.format_labels(labels) + ' ' + cls.format_value(total))
+                    lines.append(cls.PREFIX + name + '_count' + cls.format_labels(labels) + ' ' + str(count))
+
+        return '\n'.join(lines) + '\n'
+
+    @classmethod
+    def write_text_file(cls, file_path: str = None):
+        """
+        Write metrics to file, replaced atomically so the collector never reads a partial file
+        :param file_path: METRICS_FILE if None, nothing is written if not set
+        :return:
+        """
+        file_path = file_path or os.environ.get('METRICS_FILE')
+
+        if not file_path:
+            return False
+
+        with open(file_path + '.tmp', 'w') as fp:
+            fp.write(cls.get_text())
+
+        os.replace(file_path + '.tmp', file_path)
+
+        return True
+
+    @classmethod
+    def start_http_server(cls, port: int = None, address: str = None):
+        """
+        Serve metrics on /metrics in a daemon thread
+        :param port: METRICS_PORT if None, no server is started if not set
+        :param address: METRICS_ADDRESS if None, localhost by default
+        :return: server, None if not started
+        """
+        port = port if port is not None else os.environ.get('METRICS_PORT')
+
+        if port is None or port == '':
+            return None
+
+        address = address if address is not None else os.environ.get('METRICS_ADDRESS', '127.0.0.1')
+
+        # http.server is only needed by long running processes serving metrics
+        from http.server import ThreadingHTTPServer
+        from models.MetricsRequestHandler import MetricsRequestHandler
+
+        cls._server = ThreadingHTTPServer((address, int(port)), MetricsRequestHandler)
+        cls._server.daemon_threads = True
+
+        threading.Thread(target=cls._server.serve_forever, daemon=True).start()
+
+        logging.info('METRICS:start_http_server:STARTED:' + address + ':' + str(cls._server.server_address[1]))
+
+        return cls._server
+
+    @classmethod
+    def stop_http_server(cls):
+        if cls._server is None:
+            return
+
+        cls._server.shutdown()
+        cls._server.server_close()
+        cls._server = None
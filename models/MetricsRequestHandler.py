@@ -0,0 +1,23 @@
+import logging
+from http.server import BaseHTTPRequestHandler
+
+from models.Metrics import Metrics
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+
+            return
+
+        body = Metrics.get_text().encode('utf-8')
+
+        self.send_response(200)
+        self.send_header('Content-Type', Metrics.CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logging.debug('METRICS:request:' + (format % args))
@@ -0,0 +1,211 @@
+import logging
+import os
+import threading
+import time
+
+import simplejson as json
+
+from models.Metrics import Metrics
+
+
+class NotificationOutbox(object):
+    """
+    Durable queue of emails, one json file per email in file_path, delivered by a background worker.
+    Failed deliveries are retried with exponential backoff, emails failed max_attempts times are moved to failed/.
+    Emails still queued on shutdown are delivered after the next start
+    """
+    MAX_ATTEMPTS = 10
+    RETRY_SECONDS = 5.0
+    RETRY_MAX_SECONDS = 600.0
+    FAILED_DIR = 'failed'
+
+    file_path: str = None
+    max_attempts: int = None
+    retry_seconds: float = None
+
+    # callable of message and subject, True if delivered
+    _send = None
+    _thread: threading.Thread = None
+    _stop_event: threading.Event = None
+    _wakeup: threading.Event = None
+    _lock: threading.Lock = None
+    _sequence: int = 0
+
+    def __init__(self, **kwargs):
+        self._stop_event = threading.Event()
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self.max_attempts = int(os.environ.get('NOTIFICATION_MAX_ATTEMPTS', self.MAX_ATTEMPTS))
+        self.retry_seconds = float(os.environ.get('NOTIFICATION_RETRY_SECONDS', self.RETRY_SECONDS))
+
+        for k, v in kwargs.items():
+            self.__setattr__(k, v)
+
+        os.makedirs(os.path.join(self.file_path, self.FAILED_DIR), exist_ok=True)
+
+    def put(self, message: str, subject: str):
+        """
+        Queue email, it is on disk when returned
+        :param message:
+        :param subject:
+        :return: file name of the queued email
+        """
+        with self._lock:
+            self._sequence += 1
+            # unique between the processes of a sharded handler queueing to the same outbox
+            file_name = '%020d-%d-%06d.json' % (time.time_ns(), os.getpid(), self._sequence)
+
+        self.write(file_name, {'subject': subject, 'message': message, 'attempts': 0, 'next_attempt_at': 0})
+
+        Metrics.inc('notifications_queued_total')
+        self._wakeup.set()
+
+        return file_name
+
+    def write(self, file_name: str, notification: dict):
+        tmp_file = os.path.join(self.file_path, file_name + '.tmp')
+
+        with open(tmp_file, 'w') as fp:
+            json.dump(notification, fp)
+            fp.flush()
+            os.fsync(fp.fileno())
+
+        os.replace(tmp_file, os.path.join(self.file_path, file_name))
+
+    def read(self, file_name: str):
+        with open(os.path.join(self.file_path, file_name), 'r') as fp:
+            return json.load(fp)
+
+    def get_pending(self):
+        """
+        :return: file names of queued emails, oldest first
+        """
+        return sorted(file_name for file_name in os.listdir(self.file_path) if file_name.endswith('.json'))
+
+    def get_due(self):
+        """
+        :return: file names of queued emails due now, not waiting for the backoff of a failed delivery
+        """
+        now = time.time()
+        due = []
+
+        for file_name in self.get_pending():
+            try:
+                if self.read(file_name)['next_attempt_at'] <= now:
+                    due.append(file_name)
+            except FileNotFoundError:
+                # delivered by the worker in between
+                continue
+            except (OSError, ValueError, KeyError):
+                due.append(file_name)
+
+        return due
+
+    def get_failed(self):
+        return sorted(os.listdir(os.path.join(self.file_path, self.FAILED_DIR)))
+
+    def get_retry_seconds(self, attempts: int):
+        return min(self.RETRY_MAX_SECONDS, self.retry_seconds * 2 ** (attempts - 1))
+
+    def deliver_due(self):
+        """
+        Try to deliver every queued email due
+        :return: epoch seconds the next queued email is due at, None if none is queued
+        """
+        next_attempt_at = None
+
+        for file_name in self.get_pending():
+            if self._stop_event.is_set():
+                break
+
+            try:
+                notification = self.read(file_name)
+            except (OSError, ValueError) as e:
+                logging.error('NOTIFICATION_OUTBOX:deliver_due:UNREADABLE:' + file_name + ':' + str(e))
+                os.replace(os.path.join(self.file_path, file_name), os.path.join(self.file_path, self.FAILED_DIR, file_name))
+
+                continue
+
+            if notification['next_attempt_at'] > time.time():
+                next_attempt_at = min(next_attempt_at or notification['next_attempt_at'], notification['next_attempt_at'])
+
+                continue
+
+            if self._send(notification['message'], notification['subject']):
+                os.remove(os.path.join(self.file_path, file_name))
+                Metrics.inc('notifications_sent_total')
+
+                continue
+
+            notification['attempts'] += 1
+
+            if notification['attempts'] >= self.max_attempts:
+                os.replace(os.path.join(self.file_path, file_name), os.path.join(self.file_path, self.FAILED_DIR, file_name))
+                Metrics.inc('notifications_failed_total')
+
+                logging.error('NOTIFICATION_OUTBOX:deliver_due:GIVEN_UP:' + file_name)
+
+                continue
+
+            notification['next_attempt_at'] = time.time() + self.get_retry_seconds(notification['attempts'])
+            self.write(file_name, notification)
+            Metrics.inc('notifications_retried_total')
+
+            next_attempt_at = min(next_attempt_at or notification['next_attempt_at'], notification['next_attempt_at'])
+
+        Metrics.set('notifications_pending', len(self.get_pending()))
+
+        return next_attempt_at
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self._wakeup.clear()
+
+            try:
+                next_attempt_at = self.deliver_due()
+            except OSError as e:
+                logging.error('NOTIFICATION_OUTBOX:run:FAILED:' + str(e))
+                next_attempt_at = time.time() + self.retry_seconds
+
+            timeout = None if next_attempt_at is None else max(0.0, next_attempt_at - time.time())
+
+            self._wakeup.wait(timeout)
+
+    def wakeup(self):
+        """
+        Deliver due emails now, like emails queued by another process
+        :return:
+        """
+        self._wakeup.set()
+
+    def start(self):
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self.run, name='notification_outbox', daemon=True)
+        self._thread.start()
+
+        return self
+
+    def is_empty(self):
+        return not self.get_pending()
+
+    def stop(self, timeout: float = 0.0):
+        """
+        Stop the worker, waiting up to timeout seconds for the emails due now to be delivered first.
+        Emails waiting for the backoff of a failed delivery are left queued for the next start
+        :param timeout:
+        :return: True if no email is left queued
+        """
+        deadline = time.monotonic() + timeout
+
+        while self.get_due() and time.monotonic() < deadline:
+            self._wakeup.set()
+            time.sleep(0.01)
+
+        self._stop_event.set()
+        self._wakeup.set()
+
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+        return self.is_empty()
@@ -0,0 +1,87 @@
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from models.Metrics import Metrics
+from models.Trade import Trade
+
+
+class OrderPipeline(object):
+    """
+    Places the sell orders of all alerts hit in a tick concurrently by a bounded number of workers,
+    results are set per trade. Every request of an order is bounded by the timeout of its client.
+    Trades of the same market are placed one after the other, trades of a fixed amount first, so a trade
+    without amount sells the balance left by them. A second trade without amount finds no balance left
+    and places no order
+    """
+    WORKERS = 8
+
+    workers: int = None
+    _executor: ThreadPoolExecutor = None
+
+    def __init__(self, **kwargs):
+        self.workers = int(os.environ.get('ORDER_WORKERS', self.WORKERS))
+
+        for k, v in kwargs.items():
+            self.__setattr__(k, v)
+
+    def get_executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='order')
+
+        return self._executor
+
+    def execute(self, trades: list):
+        """
+        :param trades:
+        :return: trades, with response or error and duration set
+        """
+        trades_by_market = {}
+
+        for trade in trades:
+            trades_by_market.setdefault(trade._alert.market, []).append(trade)
+
+        if len(trades_by_market) == 1:
+            self.execute_market(trades)
+
+            return trades
+
+        executor = self.get_executor()
+
+        wait([executor.submit(self.execute_market, market_trades) for market_trades in trades_by_market.values()])
+
+        return trades
+
+    @classmethod
+    def execute_market(cls, trades: list):
+        """
+        :param trades: trades of one market
+        :return:
+        """
+        for trade in sorted(trades, key=lambda trade: trade._alert.amount is None):
+            cls.execute_trade(trade)
+
+    @classmethod
+    def execute_trade(cls, trade: Trade):
+        started = time.perf_counter()
+
+        try:
+            trade.sell(notify=False)
+        except Exception as e:
+            trade.error = str(e)
+
+            logging.error('ORDER_PIPELINE:execute_trade:FAILED:' + trade._alert.market + ':' + str(e))
+            Metrics.inc('errors_total', component='trade')
+
+        trade.seconds = time.perf_counter() - started
+
+        Metrics.observe('order_duration_seconds', trade.seconds)
+        Metrics.inc('orders_total', status='placed' if trade.is_placed() else 'failed')
+
+        return trade
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+
+        self._executor = None
@@ -0,0 +1,207 @@
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from models.Backtest import Backtest, PriceSeries
+
+# price series of a worker process, views on the shared memory of the sweeping process
+_worker_series = []
+_worker_shared_memory = []
+
+
+def init_worker(descriptors: list):
+    for market, scale, shared_arrays in descriptors:
+        arrays = []
+
+        for name, dtype, length, array in shared_arrays:
+            if name is None:
+                # object array of prices exceeding int64, copied to the worker
+                arrays.append(array)
+
+                continue
+
+            shm = shared_memory.SharedMemory(name=name)
+            _worker_shared_memory.append(shm)
+            arrays.append(np.ndarray((length,), dtype=dtype, buffer=shm.buf))
+
+        _worker_series.append(PriceSeries(market=market, scale=scale, dt=arrays[0], price=arrays[1]))
+
+
+def run_task(series_idx: int, start: int, trailing_percentages: list):
+    return Backtest(series=_worker_series[series_idx]).run_many(trailing_percentages, start)
+
+
+class ParameterSweep(object):
+    """
+    Backtests of every trailing percentage for every price series from every start date, spread over a process pool.
+    Price arrays are put into shared memory once, workers read them without a copy
+    """
+    MARKET_ALL = 'ALL'
+
+    series: list = None
+    trailing_percentages: list = None
+    starts: list = None
+    workers: int = None
+
+    _shared_memory: list = None
+
+    def __init__(self, **kwargs):
+        self.starts = [None]
+        self.workers = os.cpu_count() or 1
+        self._shared_memory = []
+
+        for k, v in kwargs.items():
+            self.__setattr__(k, v)
+
+    @classmethod
+    def get_trailing_percentages(cls, low: Decimal, high: Decimal, step: Decimal):
+        """
+        :return: low up to high including, by step
+        """
+        trailing_percentages = []
+        trailing_percentage = Decimal(low)
+
+        while trailing_percentage <= high:
+            trailing_percentages.append(trailing_percentage)
+            trailing_percentage += step
+
+        return trailing_percentages
+
+    def get_tasks(self):
+        """
+        :return: list of series index and start index, starts after the last price of a series are skipped
+        """
+        tasks = []
+
+        for series_idx, series in enumerate(self.series):
+            for start in self.starts:
+                start_idx = 0 if start is None else int(np.searchsorted(series.dt, np.datetime64(start, 'ms')))
+
+                if start_idx < len(series) - 1:
+                    tasks.append((series_idx, start_idx))
+
+        return tasks
+
+    def run(self):
+        """
+        :return: list of BacktestResult
+        """
+        tasks = self.get_tasks()
+
+        if self.workers <= 1 or len(tasks) <= 1:
+            return [
+                result
+                for series_idx, start in tasks
+                for result in Backtest(series=self.series[series_idx]).run_many(self.trailing_percentages, start)
+            ]
+
+        try:
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=init_worker, initargs=(self.share(),)) as executor:
+                futures = [executor.submit(run_task, series_idx, start, self.trailing_percentages) for series_idx, start in tasks]
+
+                return [result for future in futures for result in future.result()]
+        finally:
+            self.unshare()
+
+    def share(self):
+        """
+        Copy price arrays into shared memory
+        :return: descriptors of the arrays per series for the workers
+        """
+        descriptors = []
+
+        for series in self.series:
+            shared_arrays = []
+
+            for array in [series.dt, series.price]:
+                if array.dtype == object:
+                    shared_arrays.append((None, None, len(array), array))
+
+                    continue
+
+                shm = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+                self._shared_memory.append(shm)
+                np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[:] = array
+
+                shared_arrays.append((shm.name, array.dtype.str, len(array), None))
+
+            descriptors.append((series.market, series.scale, shared_arrays))
+
+        return descriptors
+
+    def unshare(self):
+        for shm in self._shared_memory:
+            shm.close()
+            shm.unlink()
+
+        self._shared_memory = []
+
+    @classmethod
+    def rank(cls, results: list):
+        """
+        Mean results per market and trailing percentage, over all markets as market ALL,
+        ranked per market by mean profit, smaller mean max drawdown first on equal profit.
+        Profit of an alert not hit is by the last price
+        :param results:
+        :return: list of rows
+        """
+        groups = {}
+
+        for result in results:
+            for market in [result.market, cls.MARKET_ALL]:
+                groups.setdefault((market, result.trailing_percentage), []).append(result)
+
+        rows = []
+
+        for (market, trailing_percentage), group in groups.items():
+            rows.append({
+                'market': market,
+                'trailing_percentage': trailing_percentage,
+                'runs': len(group),
+                'hit_ratio': Decimal(sum(result.hit for result in group)) / len(group),
+                'mean_profit': sum(result.profit for result in group) / len(group),
+                'mean_max_drawdown': sum(result.max_drawdown for result in group) / len(group),
+                'mean_ticks': Decimal(sum(result.ticks for result in group)) / len(group)
+            })
+
+        rows.sort(key=lambda row: (row['market'] != cls.MARKET_ALL, row['market'], -row['mean_profit'], row['mean_max_drawdown']))
+
+        rank = 0
+
+        for idx, row in enumerate(rows):
+            rank = 1 if idx == 0 or rows[idx - 1]['market'] != row['market'] else rank + 1
+            row['rank'] = rank
+
+        return rows
+
+    @classmethod
+    def write_csv(cls, rows: list, file_path: str):
+        with open(file_path, 'w', newline='') as fp:
+            writer = csv.DictWriter(fp, fieldnames=['rank', 'market', 'trailing_percentage', 'runs', 'hit_ratio', 'mean_profit', 'mean_max_drawdown', 'mean_ticks'])
+            writer.writeheader()
+
+            for row in rows:
+                writer.writerow(row)
+
+    @classmethod
+    def get_suggestion(cls, file_path: str, market: str):
+        """
+        :param file_path: ranked results written by write_csv
+        :param market:
+        :return: trailing percentage ranked first for market, for all markets if market was not swept, None if no file
+        """
+        if not file_path or not os.path.isfile(file_path):
+            return None
+
+        suggestions = {}
+
+        with open(file_path, 'r', newline='') as fp:
+            for row in csv.DictReader(fp):
+                if row['rank'] == '1':
+                    suggestions[row['market']] = Decimal(row['trailing_percentage'])
+
+        return suggestions.get(market, suggestions.get(cls.MARKET_ALL))
@@ -0,0 +1,282 @@
+import datetime
+import fcntl
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from decimal import Decimal
+
+import numpy as np
+
+from models.AlertEngine import AlertBook
+from models.Backtest import PriceSeries
+from models.Metrics import Metrics
+
+
+class PriceRingBuffer(object):
+    """
+    Fixed size ring buffer of (epoch milliseconds, price scaled by 10 ** scale) of one market in a memory mapped file.
+    One process appends, holding an exclusive lock of the file; any number of processes read.
+    The count of appended records is written after each record, readers check it before and after reading
+    and drop records overwritten in between and the one being overwritten next
+    """
+    MAGIC = b'BTPH'
+    VERSION = 1
+    # magic, version, scale, capacity, count
+    HEADER = struct.Struct('<4sBxxxiQQ')
+    HEADER_SIZE = 64
+    COUNT_OFFSET = 20
+
+    RECORD = np.dtype([('ts', '<i8'), ('price', '<i8')])
+    MAX_PRICE = 2 ** 63
+
+    file_path: str = None
+    capacity: int = None
+    scale: int = None
+    writable: bool = True
+
+    _fp = None
+    _mmap: mmap.mmap = None
+    _records: np.ndarray = None
+    _lock: threading.Lock = None
+
+    def __init__(self, **kwargs):
+        self._lock = threading.Lock()
+
+        for k, v in kwargs.items():
+            self.__setattr__(k, v)
+
+    def open(self):
+        if self.writable and not os.path.isfile(self.file_path):
+            self.create()
+
+        self._fp = open(self.file_path, 'r+b' if self.writable else 'rb')
+
+        if self.writable:
+            # single writer, fails fast if another process appends already
+            fcntl.flock(self._fp.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+        self._mmap = mmap.mmap(self._fp.fileno(), 0, access=mmap.ACCESS_WRITE if self.writable else mmap.ACCESS_READ)
+
+        magic, version, self.scale, self.capacity, count = self.HEADER.unpack_from(self._mmap, 0)
+
+        if magic != self.MAGIC or version != self.VERSION:
+            raise ValueError('Not a price history file: ' + self.file_path)
+
+        self._records = np.ndarray((self.capacity,), dtype=self.RECORD, buffer=self._mmap, offset=self.HEADER_SIZE)
+
+        return self
+
+    def create(self):
+        tmp_file = self.file_path + '.tmp'
+
+        with open(tmp_file, 'wb') as fp:
+            header = self.HEADER.pack(self.MAGIC, self.VERSION, self.scale, self.capacity, 0)
+            fp.write(header + b'\0' * (self.HEADER_SIZE - len(header)))
+            fp.truncate(self.HEADER_SIZE + self.capacity * self.RECORD.itemsize)
+            fp.flush()
+            os.fsync(fp.fileno())
+
+        os.replace(tmp_file, self.file_path)
+
+    def close(self):
+        self._records = None
+
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+        if self._fp is not None:
+            self._fp.close()
+            self._fp = None
+
+    def get_count(self):
+        """
+        :return: number of records appended since the file was created
+        """
+        return struct.unpack_from('<Q', self._mmap, self.COUNT_OFFSET)[0]
+
+    def __len__(self):
+        return min(self.get_count(), self.capacity)
+
+    def get_scaled(self, price: Decimal):
+        """
+        :param price:
+        :return: price scaled by 10 ** scale
+        :raises ValueError: price has more decimal places than the scale or exceeds int64, it is never rounded
+        """
+        scaled = Decimal(price).scaleb(self.scale)
+
+        if scaled != scaled.to_integral_value() or abs(scaled) >= self.MAX_PRICE:
+            raise ValueError('Price ' + str(price) + ' does not fit scale ' + str(self.scale) + ' of ' + self.file_path)
+
+        return int(scaled)
+
+    def append(self, ts: int, price: Decimal):
+        """
+        :param ts: epoch milliseconds
+        :param price:
+        :return:
+        """
+        with self._lock:
+            count = self.get_count()
+
+            self._records[count % self.capacity] = (ts, self.get_scaled(price))
+
+            struct.pack_into('<Q', self._mmap, self.COUNT_OFFSET, count + 1)
+
+    def get_views(self):
+        """
+        Zero copy views of the records, oldest first, two if the ring wrapped around.
+        Records of a reading process may be overwritten while the views are used, read() is consistent
+        :return: list of structured arrays with fields ts and price
+        """
+        count = self.get_count()
+        position = count % self.capacity
+
+        if count <= self.capacity:
+            return [self._records[:count]]
+
+        return [self._records[position:], self._records[:position]]
+
+    def read(self, last: int = None):
+        """
+        Consistent copy of the last records
+        :param last: number of records, all records if None
+        :return: structured array with fields ts and price, oldest first
+        """
+        count = self.get_count()
+        length = min(count, self.capacity) if last is None else min(last, count, self.capacity)
+        first = count - length
+
+        idx = np.arange(first, count) % self.capacity
+        records = self._records[idx]
+
+        # records overwritten in between are dropped, the next one included, which may be half written
+        overwritten = self.get_count() + 1 - self.capacity
+
+        if overwritten > first:
+            records = records[overwritten - first:]
+
+        return records
+
+    def get_series(self, market: str = None, last: int = None):
+        records = self.read(last)
+
+        return PriceSeries(market=market, scale=self.scale, dt=records['ts'].astype('datetime64[ms]'), price=records['price'])
+
+
+class PriceHistory(object):
+    """
+    Price history of every market, one ring buffer file per market in file_path, filled by every price snapshot
+    and streamed price of the alert handler. The scale of a file is set on its creation, at least scale and enough for
+    the price precision of its market down to a hundredth of its first price. Prices not fitting it are not appended
+    """
+    CAPACITY = 100000
+    SCALE = 8
+    # decimal places beyond the price precision at the first price, for prices falling to a hundredth of it
+    PRECISION_PLACES = 2
+
+    file_path: str = None
+    capacity: int = None
+    scale: int = None
+    writable: bool = True
+
+    _buffers: dict = None
+    # callable of market => significant digits of its prices, like AlertHandler.get_price_precisions
+    _get_precisions = None
+
+    def __init__(self, **kwargs):
+        self._buffers = {}
+        self.capacity = int(os.environ.get('PRICE_HISTORY_CAPACITY', self.CAPACITY))
+        self.scale = int(os.environ.get('PRICE_HISTORY_SCALE', self.SCALE))
+
+        for k, v in kwargs.items():
+            self.__setattr__(k, v)
+
+        if self.writable:
+            os.makedirs(self.file_path, exist_ok=True)
+
+    def get_file_name(self, market: str):
+        return os.path.join(self.file_path, market + '.ring')
+
+    def get_scale(self, market: str, price: Decimal = None):
+        """
+        :param market:
+        :param price: first price of market
+        :return: scale of a new file of market
+        """
+        if price is None or self._get_precisions is None:
+            return self.scale
+
+        precision = (self._get_precisions() or {}).get(market)
+
+        if precision is None:
+            return self.scale
+
+        return max(self.scale, AlertBook.get_precision_places(precision, Decimal(price)) + self.PRECISION_PLACES)
+
+    def get_buffer(self, market: str, price: Decimal = None):
+        """
+        :param market:
+        :param price: first price of market, sets the scale of its file if created
+        :return: ring buffer of market, None if not writable and no history of market exists
+        """
+        if market not in self._buffers:
+            file_name = self.get_file_name(market)
+
+            if not self.writable and not os.path.isfile(file_name):
+                return None
+
+            self._buffers[market] = PriceRingBuffer(
+                file_path=file_name,
+                capacity=self.capacity,
+                scale=self.get_scale(market, price),
+                writable=self.writable
+            ).open()
+
+        return self._buffers[market]
+
+    @classmethod
+    def get_ts(cls, dt: datetime.datetime = None):
+        return int((dt.timestamp() if dt is not None else time.time()) * 1000)
+
+    def append(self, market: str, price: Decimal, dt: datetime.datetime = None):
+        self.get_buffer(market, price).append(self.get_ts(dt), price)
+
+    def append_prices(self, ticker_prices: dict, dt: datetime.datetime = None):
+        """
+        Append a price snapshot of all markets, all with the same timestamp
+        :param ticker_prices: market => price
+        :param dt: now if None
+        :return:
+        """
+        ts = self.get_ts(dt)
+
+        for market, price in ticker_prices.items():
+            try:
+                self.get_buffer(market, price).append(ts, price)
+            except (OSError, ValueError) as e:
+                logging.error('PRICE_HISTORY:append_prices:FAILED:' + market + ':' + str(e))
+                Metrics.inc('errors_total', component='history')
+
+    def get_series(self, market: str, last: int = None):
+        """
+        :param market:
+        :param last: number of latest prices, all kept prices if None
+        :return: PriceSeries, None if no history of market exists
+        """
+        buffer = self.get_buffer(market)
+
+        if buffer is None:
+            return None
+
+        return buffer.get_series(market, last)
+
+    def close(self):
+        for buffer in self._buffers.values():
+            buffer.close()
+
+        self._buffers = {}
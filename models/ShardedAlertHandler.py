@@ -0,0 +1,535 @@
+import logging
+import multiprocessing
+import multiprocessing.connection
+import os
+import queue
+import re
+import time
+import zlib
+from collections import Counter
+
+from models.AlertHandler import AlertHandler
+from models.Messages import Messages
+from models.Metrics import Metrics
+
+
+def run_shard(shard: int, options: dict, messages, results):
+    AlertShard(shard=shard, options=options, _messages=messages, _results=results).run()
+
+
+class AlertShard(object):
+    """
+    Shard process of a sharded alert handler, owns the alert handler of the alerts of its markets and their store.
+    Handles the messages of the coordinator in order, a shard still busy when more snapshots arrive skips to the latest
+    """
+    MESSAGE_ALERTS = 'alerts'
+    MESSAGE_PRICES = 'prices'
+    MESSAGE_SAVE = 'save'
+    MESSAGE_STOP = 'stop'
+
+    RESULT_READY = 'ready'
+    RESULT_ADDED = 'added'
+    RESULT_TICK = 'tick'
+    RESULT_STOPPED = 'stopped'
+
+    shard: int = None
+    # keyword arguments of the alert handler of the shard
+    options: dict = None
+
+    _alert_handler: AlertHandler = None
+    _messages = None
+    _results = None
+
+    def __init__(self, **kwargs):
+        for k, v in kwargs.items():
+            self.__setattr__(k, v)
+
+    def get_messages(self):
+        """
+        Wait for the next message, then take all queued messages
+        :return: messages in order with the latest price snapshot only, number of snapshots skipped
+        """
+        messages = [self._messages.get()]
+
+        while True:
+            try:
+                messages.append(self._messages.get_nowait())
+            except queue.Empty:
+                break
+
+        prices_idx = [idx for idx, message in enumerate(messages) if message[0] == self.MESSAGE_PRICES]
+
+        if len(prices_idx) <= 1:
+            return messages, 0
+
+        skipped = set(prices_idx[:-1])
+
+        return [message for idx, message in enumerate(messages) if idx not in skipped], len(skipped)
+
+    @classmethod
+    def get_new_alerts(cls, alerts: list, held_alerts: list):
+        """
+        :param alerts:
+        :param held_alerts:
+        :return: alerts without the ones of the same uid held already, each held alert skips one
+        """
+        held = Counter(alert.get_uid() for alert in held_alerts)
+        new_alerts = []
+
+        for alert in alerts:
+            uid = alert.get_uid()
+
+            if held[uid] > 0:
+                held[uid] -= 1
+
+                continue
+
+            new_alerts.append(alert)
+
+        return new_alerts
+
+    def add_alerts(self, alerts: list):
+        """
+        Take over alerts routed to the shard, saved right away as the coordinator removes them from its store on reply.
+        Alerts routed again, like by a coordinator restarted before it removed them, are skipped by their uid
+        :param alerts:
+        :return:
+        """
+        new_alerts = self.get_new_alerts(alerts, self._alert_handler.alerts)
+
+        if len(new_alerts) < len(alerts):
+            logging.warning('ALERT_SHARD:add_alerts:SKIPPED:' + str(self.shard) + ':' + str(len(alerts) - len(new_alerts)))
+
+        alerts = new_alerts
+
+        for alert in alerts:
+            # id of the store of the shard, assigned on save
+            alert._id = None
+
+        self._alert_handler.alerts.extend(alerts)
+        self._alert_handler.save_alerts()
+
+    def tick(self, seq: int, ticker_prices: dict, skipped: int):
+        started = time.perf_counter()
+        error = None
+
+        try:
+            self._alert_handler.update_alerts(ticker_prices)
+        except Exception as e:
+            error = str(e)
+
+            logging.error('ALERT_SHARD:tick:FAILED:' + str(self.shard) + ':' + error)
+
+        self._results.send((self.shard, self.RESULT_TICK, {
+            'seq': seq,
+            'seconds': time.perf_counter() - started,
+            'skipped': skipped,
+            'evaluated': Metrics.get_value('alerts_evaluated') or 0,
+            'changed': Metrics.get_value('alerts_changed') or 0,
+            'hit': Metrics.get_value('alerts_hit') or 0,
+            'error': error
+        }))
+
+    def run(self):
+        # emails are queued to the outbox of the coordinator, sent by the shard without an outbox
+        Messages.start_outbox(deliver=False)
+
+        self._alert_handler = AlertHandler(**self.options)
+
+        self._results.send((self.shard, self.RESULT_READY, len(self._alert_handler.alerts)))
+
+        logging.info('ALERT_SHARD:run:STARTED:' + str(self.shard) + ':' + str(len(self._alert_handler.alerts)))
+
+        while True:
+            messages, skipped = self.get_messages()
+
+            for message in messages:
+                if message[0] == self.MESSAGE_ALERTS:
+                    self.add_alerts(message[2])
+                    self._results.send((self.shard, self.RESULT_ADDED, message[1]))
+                elif message[0] == self.MESSAGE_PRICES:
+                    self.tick(message[1], message[2], skipped)
+                elif message[0] == self.MESSAGE_SAVE:
+                    self._alert_handler.save_alerts()
+                elif message[0] == self.MESSAGE_STOP:
+                    self._alert_handler.save_alerts()
+                    self._alert_handler.close()
+
+                    Messages.stop_outbox()
+                    Messages.close()
+
+                    self._results.send((self.shard, self.RESULT_STOPPED, None))
+
+                    return
+
+
+class ShardedAlertHandler(object):
+    """
+    Alerts partitioned by a hash of their market over shard processes, each with the alert handler, store and clients
+    of its markets in a directory of its own. The price snapshot of a tick is fetched once, every shard gets the prices
+    of its markets. Shards evaluate independently, one busy with a hot market holds up none of the others.
+    The store in ALERTS_FILE_PATH is an inbox: its alerts, new alerts included, are moved to the shards of their markets.
+    The alerts of the stores of another shard count, like before ALERT_SHARDS or the CPU count changed, are moved
+    to the inbox on start
+    """
+    SHARD_PATH = 'shard-%d-of-%d/'
+    SHARD_PATH_PATTERN = re.compile(r'^shard-(\d+)-of-(\d+)$')
+    # stores of shards of another shard count, kept after their alerts are moved
+    REBALANCED_PATH = 'rebalanced/'
+    STOP_TIMEOUT = 30.0
+
+    shards: int = None
+    alerts_file_path: str = None
+    # keyword arguments of the alert handlers of coordinator and shards, like alert_engine
+    handler_options: dict = None
+
+    _client = None
+    _inbox: AlertHandler = None
+    _context = None
+    _processes: list = None
+    # messages to shard, results of shard: one channel per shard, a shard dying while writing breaks only its own
+    _queues: list = None
+    _results: list = None
+    _seq: int = 0
+    # seq of the last tick done by shard, -1 until loaded
+    _done: list = None
+    # last price snapshot sent to shard
+    _prices: list = None
+    # message id => shard and alerts sent to it, until the shard saved them
+    _pending_alerts: dict = None
+    _message_id: int = 0
+    _stopped: set = None
+
+    def __init__(self, **kwargs):
+        self.shards = int(kwargs.get('shards') if 'shards' in kwargs else os.environ.get('ALERT_SHARDS', os.cpu_count() or 1))
+        self.alerts_file_path = kwargs.get('alerts_file_path') if 'alerts_file_path' in kwargs else os.environ.get('ALERTS_FILE_PATH')
+        self.handler_options = {}
+        self._pending_alerts = {}
+        self._stopped = set()
+
+        for k, v in kwargs.items():
+            self.__setattr__(k, v)
+
+        # shards are started fresh, not forked from a process holding threads and connections
+        self._context = multiprocessing.get_context('spawn')
+
+        self._inbox = AlertHandler(**dict(self.handler_options, alerts_file_path=self.alerts_file_path))
+
+        if self._client is None:
+            self._client = self._inbox._client
+
+        self.rebalance_shards()
+
+        self._processes = [None] * self.shards
+        self._queues = [None] * self.shards
+        self._results = [None] * self.shards
+        self._done = [-1] * self.shards
+        self._prices = [None] * self.shards
+
+        for shard in range(self.shards):
+            self.start_shard(shard)
+
+        self.route_alerts(self._inbox.alerts)
+
+    @classmethod
+    def get_shard(cls, market: str, shards: int):
+        """
+        Stable between processes and runs, unlike hash()
+        :param market:
+        :param shards:
+        :return: shard of market
+        """
+        if market is None:
+            return 0
+
+        return zlib.crc32(market.encode('utf-8')) % shards
+
+    def get_shard_path(self, shard: int):
+        return self.alerts_file_path + self.SHARD_PATH % (shard, self.shards)
+
+    def get_stale_shard_paths(self):
+        """
+        :return: store directories of shards of another shard count
+        """
+        if not os.path.isdir(self.alerts_file_path):
+            return []
+
+        shard_paths = []
+
+        for name in sorted(os.listdir(self.alerts_file_path)):
+            match = self.SHARD_PATH_PATTERN.match(name)
+
+            if match and int(match.group(2)) != self.shards and os.path.isdir(self.alerts_file_path + name):
+                shard_paths.append(self.alerts_file_path + name + '/')
+
+        return shard_paths
+
+    def rebalance_shards(self):
+        """
+        Move the alerts of the stores of another shard count to the inbox, routed to the shards of their markets by the
+        current count. A store is moved to the rebalanced directory once its alerts are saved in the inbox,
+        alerts held by the inbox already, like of a start that died in between, are skipped
+        :return: number of alerts moved
+        """
+        moved = 0
+
+        for shard_path in self.get_stale_shard_paths():
+            handler = AlertHandler(**dict(
+                self.handler_options,
+                alerts_file_path=shard_path,
+                new_alert_file_name=None,
+                price_history_path=None,
+                _client=self._client
+            ))
+            handler.close()
+
+            alerts = AlertShard.get_new_alerts(handler.alerts, self._inbox.alerts)
+
+            for alert in alerts:
+                # id of the store of the inbox, assigned on save
+                alert._id = None
+
+            self._inbox.alerts.extend(alerts)
+            self._inbox.save_alerts()
+
+            rebalanced_path = self.alerts_file_path + self.REBALANCED_PATH
+            os.makedirs(rebalanced_path, exist_ok=True)
+            os.replace(shard_path[:-1], rebalanced_path + os.path.basename(shard_path[:-1]) + '-%d' % time.time_ns())
+
+            logging.warning('SHARDED_ALERT_HANDLER:rebalance_shards:MOVED:' + shard_path + ':' + str(len(alerts)))
+
+            moved += len(alerts)
+
+        return moved
+
+    def start_shard(self, shard: int):
+        shard_path = self.get_shard_path(shard)
+        os.makedirs(shard_path, exist_ok=True)
+
+        options = dict(self.handler_options, alerts_file_path=shard_path, new_alert_file_name=None)
+
+        if self._results[shard] is not None:
+            self._results[shard].close()
+
+        self._queues[shard] = self._context.Queue()
+        self._results[shard], results = self._context.Pipe(duplex=False)
+        self._processes[shard] = self._context.Process(
+            target=run_shard,
+            args=(shard, options, self._queues[shard], results),
+            name='alert_shard_' + str(shard),
+            daemon=True
+        )
+        self._processes[shard].start()
+
+        # only held by the shard, so its exit is seen as end of file
+        results.close()
+
+        # alerts sent to a shard that died before saving them
+        for message_id, (alerts_shard, alerts) in sorted(self._pending_alerts.items()):
+            if alerts_shard == shard:
+                self._queues[shard].put((AlertShard.MESSAGE_ALERTS, message_id, alerts))
+
+        if self._prices[shard] is not None:
+            self._queues[shard].put((AlertShard.MESSAGE_PRICES, self._seq, self._prices[shard]))
+
+    def check_shards(self):
+        """
+        Restart shards that died, they continue from their store
+        :return: number of restarted shards
+        """
+        restarted = 0
+
+        for shard, process in enumerate(self._processes):
+            if process.is_alive() or shard in self._stopped:
+                continue
+
+            logging.error('SHARDED_ALERT_HANDLER:check_shards:RESTARTING:' + str(shard) + ':' + str(process.exitcode))
+            Metrics.inc('errors_total', component='shard')
+
+            self._done[shard] = -1
+            self.start_shard(shard)
+
+            restarted += 1
+
+        return restarted
+
+    def route_alerts(self, alerts: list):
+        """
+        Send alerts to the shards of their markets, removed from the inbox once saved by their shard
+        :param alerts:
+        :return:
+        """
+        alerts_by_shard = {}
+
+        for alert in alerts:
+            alerts_by_shard.setdefault(self.get_shard(alert.market, self.shards), []).append(alert)
+
+        for shard, shard_alerts in sorted(alerts_by_shard.items()):
+            self._message_id += 1
+            self._pending_alerts[self._message_id] = (shard, shard_alerts)
+
+            self._queues[shard].put((AlertShard.MESSAGE_ALERTS, self._message_id, shard_alerts))
+
+        if alerts:
+            logging.info('SHARDED_ALERT_HANDLER:route_alerts:ROUTED:' + str(len(alerts)))
+
+    def load_new_alerts(self):
+        """
+        Route alerts added by CreateAlert since last load
+        :return: number of added alerts
+        """
+        count = self._inbox.load_new_alerts()
+
+        if count:
+            self.route_alerts(self._inbox.alerts[-count:])
+
+        return count
+
+    def remove_alerts(self, alerts: list):
+        """
+        Remove alerts saved by their shard from the inbox
+        :param alerts:
+        :return:
+        """
+        self._inbox._store.remove(alerts)
+
+        alert_ids = set(id(alert) for alert in alerts)
+        self._inbox.alerts[:] = [alert for alert in self._inbox.alerts if id(alert) not in alert_ids]
+
+        self._inbox._store.save(self._inbox.alerts, {})
+
+    def handle_result(self, shard: int, result: str, data):
+        if result == AlertShard.RESULT_READY:
+            self._done[shard] = max(self._done[shard], 0)
+        elif result == AlertShard.RESULT_ADDED:
+            alerts_shard, alerts = self._pending_alerts.pop(data, (None, []))
+
+            if alerts:
+                self.remove_alerts(alerts)
+        elif result == AlertShard.RESULT_TICK:
+            self._done[shard] = data['seq']
+
+            AlertHandler.record_alerts(data['evaluated'], data['changed'], data['hit'])
+
+            Metrics.observe('shard_tick_duration_seconds', data['seconds'], shard=str(shard))
+            Metrics.inc('shard_ticks_skipped_total', data['skipped'], shard=str(shard))
+
+            if data['error'] is not None:
+                Metrics.inc('errors_total', component='shard')
+
+            if data['hit']:
+                Messages.wakeup_outbox()
+        elif result == AlertShard.RESULT_STOPPED:
+            self._stopped.add(shard)
+
+    def collect_results(self, timeout: float = 0.0):
+        """
+        Handle the results of the shards, waiting up to timeout seconds for the first
+        :param timeout:
+        :return: number of results
+        """
+        count = 0
+
+        for results in multiprocessing.connection.wait(self._results, timeout):
+            try:
+                while results.poll():
+                    shard, result, data = results.recv()
+
+                    self.handle_result(shard, result, data)
+
+                    count += 1
+            except (EOFError, OSError):
+                # shard exited, restarted by check_shards
+                continue
+
+        return count
+
+    def wait(self, timeout: float = None):
+        """
+        Wait until every shard handled the last price snapshot
+        :param timeout: seconds, waits until done if None
+        :return: True if all shards are done
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while min(self._done) < self._seq:
+            remaining = 1.0 if deadline is None else deadline - time.monotonic()
+
+            if remaining <= 0:
+                return False
+
+            self.collect_results(min(remaining, 1.0))
+            self.check_shards()
+
+        return True
+
+    def update_alerts(self, ticker_prices: dict = None):
+        """
+        Send the price snapshot of the tick to the shards, without waiting for them
+        :param ticker_prices: fetched by the client if None
+        :return: True if sent
+        """
+        self.collect_results()
+        self.check_shards()
+
+        if ticker_prices is None:
+            with Metrics.time_phase('fetch'):
+                ticker_prices = self._client.get_ticker_prices()
+
+        if ticker_prices is None:
+            logging.warning('SHARDED_ALERT_HANDLER:update_alerts:PRICES_ARE_NONE')
+
+            return False
+
+        self._seq += 1
+
+        prices_by_shard = [{} for shard in range(self.shards)]
+
+        for market, price in ticker_prices.items():
+            prices_by_shard[self.get_shard(market, self.shards)][market] = price
+
+        for shard, prices in enumerate(prices_by_shard):
+            self._prices[shard] = prices
+            self._queues[shard].put((AlertShard.MESSAGE_PRICES, self._seq, prices))
+
+            Metrics.set('shard_ticks_behind', self._seq - 1 - max(self._done[shard], 0), shard=str(shard))
+
+        return True
+
+    def save_alerts(self):
+        for shard_queue in self._queues:
+            shard_queue.put((AlertShard.MESSAGE_SAVE,))
+
+    def close(self):
+        """
+        Stop the shards, each saves its alerts first
+        :return:
+        """
+        for shard, shard_queue in enumerate(self._queues):
+            if self._processes[shard].is_alive():
+                shard_queue.put((AlertShard.MESSAGE_STOP,))
+            else:
+                self._stopped.add(shard)
+
+        deadline = time.monotonic() + self.STOP_TIMEOUT
+
+        # results are read until all stopped, a shard blocks on a full pipe otherwise
+        while len(self._stopped) < self.shards and time.monotonic() < deadline:
+            self.collect_results(0.1)
+
+            for shard, process in enumerate(self._processes):
+                if not process.is_alive():
+                    self._stopped.add(shard)
+
+        for process in self._processes:
+            process.join(max(0.0, deadline - time.monotonic()))
+
+            if process.is_alive():
+                logging.error('SHARDED_ALERT_HANDLER:close:TERMINATING:' + process.name)
+
+                process.terminate()
+
+        # replies sent right before a shard exited, alerts it saved are removed from the inbox
+        self.collect_results()
+
+        self._inbox.close()
@@ -5,14 +5,27 @@ from models.clients.Bitvavo import BitvavoClient
 
 
 class Trade(object):
+    """
+    Sell order of a hit alert, of its amount or of the available balance if it has no amount
+    """
+    ERROR_NO_BALANCE = 'No balance to sell.'
+
     _client: BitvavoClient = None
     _alert: Alert = None
 
+    response: dict = None
+    error: str = None
+    seconds: float = None
+
     def __init__(self, **kwargs):
         for k, v in kwargs.items():
             self.__setattr__(k, v)
 
-    def sell(self):
+    def sell(self, notify: bool = True):
+        """
+        :param notify: send the order response by email right away, sent later by notify() if False
+        :return: True if the order is placed
+        """
         symbol = self._alert.get_symbol()
 
         if symbol is None:
@@ -20,18 +33,31 @@ class Trade(object):
 
         if self._alert.amount is None:
             amount = self._client.get_balance(symbol)
+
+            # sold by an earlier trade of the market, or no balance at all
+            if amount is None or amount <= 0:
+                self.error = self.ERROR_NO_BALANCE
+
+                return False
         else:
             amount = self._alert.amount
 
-        response = self._client.place_order(
+        self.response = self._client.place_order(
             BitvavoClient.SIDE_SELL,
             BitvavoClient.ORDER_TYPE,
             str(amount)
         )
 
-        Messages.send_email(json.dumps(response, indent=4, sort_keys=True), "Sell request result.")
+        if notify:
+            self.notify()
+
+        return self.is_placed()
+
+    def is_placed(self):
+        return self.response is not None and 'orderId' in self.response
 
-        if 'orderId' in response:
-            return True
+    def notify(self):
+        if self.response is None:
+            return
 
-        return False
+        Messages.send_email(json.dumps(self.response, indent=4, sort_keys=True), "Sell request result.")
@@ -2,9 +2,13 @@ import logging
 import os
 from decimal import Decimal
 from python_bitvavo_api.bitvavo import Bitvavo
+from models.clients.BitvavoPublic import BitvavoPublicClient
 
 
-class BitvavoClient(Bitvavo):
+class BitvavoClient(Bitvavo, BitvavoPublicClient):
+    """
+    Bitvavo API with balances, orders and the websocket client, market data and requests of BitvavoPublicClient
+    """
     SIDE_BUY = 'buy'
     SIDE_SELL = 'sell'
     ORDER_TYPE = 'market'
@@ -12,31 +16,85 @@ class BitvavoClient(Bitvavo):
     _response_order = None
     _response_balance = None
     _response_ticker_price = None
-    _response_markets = None
 
     market: str = None
 
     def __init__(self, **kwargs):
-        super().__init__({
+        options = {
             'APIKEY': kwargs.get('api_key') if 'api_key' in kwargs else os.environ.get('APIKEY'),
             'APISECRET': kwargs.get('api_secret') if 'api_secret' in kwargs else os.environ.get('APISECRET')
-        })
+        }
+
+        # base url override, like a local exchange simulator
+        rest_url = kwargs.get('rest_url') if 'rest_url' in kwargs else os.environ.get('BITVAVO_REST_URL')
+
+        if rest_url:
+            options['RESTURL'] = rest_url
+
+        super().__init__(options)
 
         for k, v in kwargs.items():
             self.__setattr__(k, v)
 
+    def publicRequest(self, url):
+        """
+        Same as Bitvavo.publicRequest, but on the shared keep-alive session and within the rate limit budget
+        """
+        return self.get_public(url.replace(self.base, ''))
+
+    def privateRequest(self, endpoint, postfix, body=None, method='GET'):
+        """
+        Same as Bitvavo.privateRequest, but on the shared keep-alive session and within the rate limit budget
+        """
+        return self.request(
+            method,
+            endpoint + postfix,
+            headers=self.get_auth_headers(method, endpoint + postfix, body),
+            json=body
+        )
+
+    def handle_response(self, r):
+        response = super().handle_response(r)
+
+        if 'error' in response:
+            self.updateRateLimit(response)
+        else:
+            self.updateRateLimit(r.headers)
+
+        return response
+
+    def reset_responses(self):
+        """
+        Drop cached responses, so a long living client fetches fresh data
+        :return:
+        """
+        self._response_order = None
+        self._response_balance = None
+        self._response_ticker_price = None
+        self._response_ticker_prices = None
+        self._response_markets = None
+
     def get_balance(self, symbol):
-        if self._response_balance is None:
-            self._response_balance = self.balance({'symbol': symbol})[0]
+        """
+        Requested on every call, a balance is never reused after an order may have changed it
+        :param symbol:
+        :return: available balance, None if not in the response
+        """
+        response = self.balance({'symbol': symbol})
 
-            if 'symbol' not in self._response_balance or 'available' not in self._response_balance:
-                logging.error('bitvavo:get_balance: No symbol set.')
+        if not isinstance(response, list) or not response:
+            logging.error('bitvavo:get_balance: No balance in response.')
 
-                return None
+            return None
+
+        self._response_balance = response[0]
 
-            return Decimal(self._response_balance['available'])
+        if 'symbol' not in self._response_balance or 'available' not in self._response_balance:
+            logging.error('bitvavo:get_balance: No symbol set.')
 
-        return None
+            return None
+
+        return Decimal(self._response_balance['available'])
 
     def get_ticker_price(self):
         if self.market is None:
@@ -62,7 +120,8 @@ class BitvavoClient(Bitvavo):
         return Decimal(self._response_ticker_price['price'])
 
     def place_order(self, side: str, order_type: str, amount: str):
-        self._response_order = self.placeOrder(
+        # the response of this order is returned, orders of the same market may be placed concurrently
+        response = self.placeOrder(
             self.market,
             side,
             order_type,
@@ -71,12 +130,6 @@ class BitvavoClient(Bitvavo):
             }
         )
 
-        return self._response_order
-
-    def get_markets(self, market: str = None):
-        if market is not None:
-            self._response_markets = self.markets({'market': market})
-        else:
-            self._response_markets = self.markets({})
+        self._response_order = response
 
-        return self._response_markets
+        return response
@@ -0,0 +1,231 @@
+import hashlib
+import hmac
+import json
+import logging
+import os
+import time
+from decimal import Decimal
+from models.Metrics import Metrics
+from models.clients.HttpSession import HttpSession
+from models.clients.RateLimiter import RateLimiter
+
+
+def create_signature(timestamp: int, method: str, url: str, body, api_secret: str):
+    """
+    Same as python_bitvavo_api.bitvavo.createSignature
+    """
+    string = str(timestamp) + method + '/v2' + url
+
+    if body is not None and len(body.keys()) > 0:
+        string += json.dumps(body, separators=(',', ':'))
+
+    return hmac.new(api_secret.encode('utf-8'), string.encode('utf-8'), hashlib.sha256).hexdigest()
+
+
+class BitvavoPublicClient(object):
+    """
+    Market data endpoints of Bitvavo on the shared session within the rate limit budget, all a tick without hits needs.
+    Without python_bitvavo_api, which imports requests and the websocket client on every cold start
+    """
+    BASE_URL = 'https://api.bitvavo.com/v2'
+    ACCESS_WINDOW = 10000
+
+    RATE_LIMIT_RETRIES = 2
+    ERROR_RATE_LIMIT_BUDGET = 'Rate limit budget exhausted, request not sent.'
+
+    # candle intervals by seconds, a request returns up to CANDLES_LIMIT candles
+    CANDLE_INTERVALS = [
+        ('1m', 60),
+        ('5m', 300),
+        ('15m', 900),
+        ('30m', 1800),
+        ('1h', 3600),
+        ('2h', 7200),
+        ('4h', 14400),
+        ('6h', 21600),
+        ('8h', 28800),
+        ('12h', 43200),
+        ('1d', 86400)
+    ]
+    CANDLES_LIMIT = 1440
+
+    _response_ticker_prices = None
+    _response_markets = None
+
+    base: str = None
+    APIKEY: str = None
+    APISECRET: str = None
+    ACCESSWINDOW: int = ACCESS_WINDOW
+    timeout: float = None
+
+    def __init__(self, **kwargs):
+        self.APIKEY = kwargs.get('api_key') if 'api_key' in kwargs else os.environ.get('APIKEY')
+        self.APISECRET = kwargs.get('api_secret') if 'api_secret' in kwargs else os.environ.get('APISECRET')
+
+        # base url override, like a local exchange simulator
+        self.base = (kwargs.get('rest_url') if 'rest_url' in kwargs else os.environ.get('BITVAVO_REST_URL')) or self.BASE_URL
+
+        for k, v in kwargs.items():
+            self.__setattr__(k, v)
+
+    @classmethod
+    def get_postfix(cls, options: dict = None):
+        if not options:
+            return ''
+
+        return '?' + '&'.join(key + '=' + str(value) for key, value in options.items())
+
+    def get_public(self, endpoint: str):
+        headers = {}
+
+        if self.APIKEY:
+            headers = self.get_auth_headers('GET', endpoint, None)
+
+        return self.request('GET', endpoint, headers=headers)
+
+    def tickerPrice(self, options=None):
+        return self.get_public('/ticker/price' + self.get_postfix(options))
+
+    def markets(self, options=None):
+        return self.get_public('/markets' + self.get_postfix(options))
+
+    def candles(self, symbol, interval, options=None):
+        return self.get_public('/' + symbol + '/candles' + self.get_postfix(dict(options or {}, interval=interval)))
+
+    def request(self, method: str, endpoint: str, **kwargs):
+        """
+        Request weighted against the rate limit budget, orders are retried after the backoff of a 429 response
+        :param method:
+        :param endpoint: path and query after the base url
+        :return: json response, error response if the budget is exhausted
+        """
+        weight = RateLimiter.get_weight(endpoint)
+        priority = RateLimiter.get_priority(endpoint)
+        retries = self.RATE_LIMIT_RETRIES if priority == RateLimiter.PRIORITY_ORDER else 0
+
+        while True:
+            if not RateLimiter.acquire(weight, priority):
+                Metrics.inc('errors_total', component='bitvavo')
+
+                return {'error': self.ERROR_RATE_LIMIT_BUDGET}
+
+            r = HttpSession.request(method, self.base + endpoint, timeout=self.timeout, **kwargs)
+
+            if r.status_code != 429 or retries == 0:
+                return self.handle_response(r)
+
+            RateLimiter.update(r.status_code, r.headers, r.json())
+            retries -= 1
+
+            # signed again, the timestamp of the signature is only valid for the access window
+            if 'headers' in kwargs and self.APIKEY:
+                kwargs['headers'] = self.get_auth_headers(method, endpoint, kwargs.get('json'))
+
+    def get_auth_headers(self, method: str, url: str, body):
+        now = int(time.time() * 1000)
+
+        return {
+            'bitvavo-access-key': self.APIKEY,
+            'bitvavo-access-signature': create_signature(now, method, url, body, self.APISECRET),
+            'bitvavo-access-timestamp': str(now),
+            'bitvavo-access-window': str(self.ACCESSWINDOW)
+        }
+
+    def handle_response(self, r):
+        response = r.json()
+
+        RateLimiter.update(r.status_code, r.headers, response)
+
+        if 'error' in response:
+            Metrics.inc('errors_total', component='bitvavo')
+
+        return response
+
+    def reset_responses(self):
+        """
+        Drop cached responses, so a long living client fetches fresh data
+        :return:
+        """
+        self._response_ticker_prices = None
+        self._response_markets = None
+
+    def get_ticker_prices(self):
+        """
+        Fetch ticker prices of all markets with a single request
+        :return: dict of market => price
+        """
+        if self._response_ticker_prices is None:
+            self._response_ticker_prices = self.tickerPrice({})
+
+            if not isinstance(self._response_ticker_prices, list):
+                logging.error('bitvavo:get_ticker_prices: Response is not a list of prices.')
+
+                self._response_ticker_prices = None
+
+                return None
+
+        ticker_prices = {}
+
+        for ticker_price in self._response_ticker_prices:
+            if 'price' not in ticker_price or 'market' not in ticker_price:
+                continue
+
+            ticker_prices[ticker_price['market']] = Decimal(ticker_price['price'])
+
+        return ticker_prices
+
+    @classmethod
+    def get_candle_interval(cls, seconds: float):
+        """
+        :param seconds: length of the period
+        :return: finest candle interval covering the period by a single request
+        """
+        for interval, interval_seconds in cls.CANDLE_INTERVALS:
+            if seconds <= interval_seconds * cls.CANDLES_LIMIT:
+                return interval
+
+        return cls.CANDLE_INTERVALS[-1][0]
+
+    def get_candles(self, market: str, start: float, end: float):
+        """
+        Fetch the candles of a period with a single request
+        :param market:
+        :param start: epoch seconds
+        :param end: epoch seconds
+        :return: list of epoch milliseconds, high and low of every candle, oldest first, None on an error response
+        """
+        response = self.candles(
+            market,
+            self.get_candle_interval(end - start),
+            {'limit': self.CANDLES_LIMIT, 'start': int(start * 1000), 'end': int(end * 1000)}
+        )
+
+        if not isinstance(response, list):
+            logging.error('bitvavo:get_candles: Response is not a list of candles.')
+
+            return None
+
+        # [timestamp, open, high, low, close, volume], newest first
+        return sorted((int(candle[0]), Decimal(candle[2]), Decimal(candle[3])) for candle in response)
+
+    def get_markets(self, market: str = None):
+        if market is not None:
+            self._response_markets = self.markets({'market': market})
+        else:
+            self._response_markets = self.markets({})
+
+        return self._response_markets
+
+    def get_price_precisions(self):
+        """
+        Fetch the price precision of all markets with a single request
+        :return: dict of market => significant digits of its prices, None on an error response
+        """
+        markets = self.get_markets()
+
+        if not isinstance(markets, list):
+            logging.error('bitvavo:get_price_precisions: Response is not a list of markets.')
+
+            return None
+
+        return {market['market']: int(market['pricePrecision']) for market in markets if 'pricePrecision' in market}
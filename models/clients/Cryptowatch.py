@@ -1,6 +1,6 @@
+import os
 from decimal import Decimal
-
-import requests
+from models.clients.HttpSession import HttpSession
 
 
 class CryptowatchClient(object):
@@ -10,21 +10,28 @@ class CryptowatchClient(object):
     _market = 'kraken'
     _coin = 'eth'
 
+    base_url: str = None
+    timeout: float = None
+
     def __init__(self, **kwargs):
         super().__init__()
 
+        self.base_url = os.environ.get('CRYPTOWATCH_URL', 'https://api.cryptowat.ch')
+
         for k, v in kwargs.items():
             self.__setattr__(k, v)
 
     def get_ticker_price(self):
         if self._response_ticker_price is None:
-            r = requests.get(
-                'https://api.cryptowat.ch/markets/' +
+            r = HttpSession.request(
+                'GET',
+                self.base_url + '/markets/' +
                 self._market +
                 '/' +
                 self._coin +
                 self._currency +
-                '/price'
+                '/price',
+                timeout=self.timeout
             )
 
             ticker_price_response = r.json()
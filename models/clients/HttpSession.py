@@ -0,0 +1,243 @@
+import http.client
+import os
+import select
+import threading
+import time
+from urllib.parse import urlparse
+
+import simplejson
+
+from models.Metrics import Metrics
+
+
+class StdlibResponse(object):
+    status_code: int = None
+    headers = None
+    content: bytes = None
+
+    def __init__(self, **kwargs):
+        for k, v in kwargs.items():
+            self.__setattr__(k, v)
+
+    def json(self):
+        return simplejson.loads(self.content)
+
+
+class StdlibSession(object):
+    """
+    Keep-alive connections of http.client, pooled per host, with the parts of requests.Session the clients use.
+    Starts without importing requests, for short lived processes like a cron run
+    """
+    # sent again on a new connection if a reused connection fails after the request is sent
+    IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+    pool_maxsize: int = None
+
+    _idle: dict = None
+    _lock: threading.Lock = None
+
+    def __init__(self, **kwargs):
+        self._idle = {}
+        self._lock = threading.Lock()
+
+        for k, v in kwargs.items():
+            self.__setattr__(k, v)
+
+    def get_connection(self, scheme: str, netloc: str, timeout: float):
+        """
+        :return: idle connection to host and True, a new one and False if none is idle
+        """
+        with self._lock:
+            idle = self._idle.get((scheme, netloc))
+
+            while idle:
+                connection = idle.pop()
+
+                if not self.is_closed(connection):
+                    return connection, True
+
+                connection.close()
+
+        if scheme == 'https':
+            return http.client.HTTPSConnection(netloc, timeout=timeout), False
+
+        return http.client.HTTPConnection(netloc, timeout=timeout), False
+
+    @classmethod
+    def is_closed(cls, connection: http.client.HTTPConnection):
+        """
+        :return: True if an idle connection is readable, closed by the server after its keep-alive timeout
+        """
+        if connection.sock is None:
+            return False
+
+        try:
+            return bool(select.select([connection.sock], [], [], 0)[0])
+        except (OSError, ValueError):
+            return True
+
+    def release(self, scheme: str, netloc: str, connection: http.client.HTTPConnection):
+        with self._lock:
+            idle = self._idle.setdefault((scheme, netloc), [])
+
+            if len(idle) < self.pool_maxsize:
+                idle.append(connection)
+
+                return
+
+        connection.close()
+
+    def request(self, method: str, url: str, headers: dict = None, json: dict = None, timeout=None):
+        """
+        :param method:
+        :param url:
+        :param headers:
+        :param json: body, sent as json
+        :param timeout: seconds, tuple of connect and read timeout like requests
+        :return: StdlibResponse
+        """
+        parsed_url = urlparse(url)
+        connect_timeout, read_timeout = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+        headers = dict(headers or {})
+        body = None
+
+        if json is not None:
+            # serialized like requests does
+            body = simplejson.dumps(json).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+
+        path = parsed_url.path + ('?' + parsed_url.query if parsed_url.query else '')
+
+        while True:
+            connection, reused = self.get_connection(parsed_url.scheme, parsed_url.netloc, connect_timeout)
+            sent = False
+
+            try:
+                if connection.sock is None:
+                    connection.connect()
+
+                connection.sock.settimeout(read_timeout)
+                connection.request(method, path, body=body, headers=headers)
+                sent = True
+
+                r = connection.getresponse()
+                content = r.read()
+
+                break
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                connection.close()
+
+                # closed by the server while idle, sent again on a new connection. An order read by the server
+                # before it closed the connection may be placed, it is not sent twice
+                if not reused or (sent and method not in self.IDEMPOTENT_METHODS):
+                    raise
+            except Exception:
+                connection.close()
+
+                raise
+
+        if r.will_close:
+            connection.close()
+        else:
+            self.release(parsed_url.scheme, parsed_url.netloc, connection)
+
+        return StdlibResponse(status_code=r.status, headers=r.headers, content=content)
+
+    def close(self):
+        with self._lock:
+            for idle in self._idle.values():
+                for connection in idle:
+                    connection.close()
+
+            self._idle = {}
+
+
+class HttpSession(object):
+    """
+    Process wide keep-alive session with a bounded connection pool, shared by all clients.
+    Sessions of requests by default, of http.client with HTTP_TRANSPORT=stdlib
+    """
+    POOL_CONNECTIONS = 4
+    POOL_MAXSIZE = 10
+
+    TRANSPORT_REQUESTS = 'requests'
+    TRANSPORT_STDLIB = 'stdlib'
+
+    # default of HTTP_TRANSPORT, set by short lived processes
+    transport: str = TRANSPORT_REQUESTS
+
+    _session = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_session(cls):
+        if cls._session is None:
+            with cls._lock:
+                if cls._session is None:
+                    cls._session = cls.create_session()
+
+        return cls._session
+
+    @classmethod
+    def create_session(cls):
+        pool_maxsize = int(os.environ.get('HTTP_POOL_MAXSIZE', cls.POOL_MAXSIZE))
+
+        if (os.environ.get('HTTP_TRANSPORT') or cls.transport) == cls.TRANSPORT_STDLIB:
+            return StdlibSession(pool_maxsize=pool_maxsize)
+
+        # requests is only imported by long running processes
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        adapter = HTTPAdapter(
+            pool_connections=int(os.environ.get('HTTP_POOL_CONNECTIONS', cls.POOL_CONNECTIONS)),
+            pool_maxsize=pool_maxsize,
+            pool_block=True
+        )
+
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+
+        return session
+
+    @classmethod
+    def get_timeout(cls):
+        """
+        :return: tuple of connect and read timeout in seconds
+        """
+        return (
+            float(os.environ.get('HTTP_CONNECT_TIMEOUT', '3.05')),
+            float(os.environ.get('HTTP_READ_TIMEOUT', '10'))
+        )
+
+    @classmethod
+    def request(cls, method: str, url: str, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = cls.get_timeout()
+
+        parsed_url = urlparse(url)
+        endpoint = parsed_url.netloc + parsed_url.path
+        started = time.perf_counter()
+
+        try:
+            response = cls.get_session().request(method, url, **kwargs)
+        except Exception:
+            Metrics.inc('api_requests_total', endpoint=endpoint, method=method, status='error')
+            Metrics.inc('errors_total', component='http')
+
+            raise
+        finally:
+            Metrics.observe('api_request_duration_seconds', time.perf_counter() - started, endpoint=endpoint, method=method)
+
+        Metrics.inc('api_requests_total', endpoint=endpoint, method=method, status=str(response.status_code))
+
+        return response
+
+    @classmethod
+    def close(cls):
+        with cls._lock:
+            if cls._session is not None:
+                cls._session.close()
+
+            cls._session = None
@@ -0,0 +1,200 @@
+import logging
+import os
+import random
+import threading
+import time
+
+from models.Metrics import Metrics
+
+
+class RateLimiter(object):
+    """
+    Process wide budget of the weighted Bitvavo rate limit per minute, shared by all clients of the API key.
+    Requests take their weight from the remaining budget, corrected by the rate limit headers of every response.
+    Market data requests leave a reserve for orders, 429 and ban responses block all requests for a jittered backoff
+    """
+    PRIORITY_ORDER = 'order'
+    PRIORITY_MARKET_DATA = 'market_data'
+
+    LIMIT = 1000
+    WINDOW_SECONDS = 60.0
+    ORDER_RESERVE = 100
+    ORDER_MAX_WAIT_SECONDS = 5.0
+    BACKOFF_SECONDS = 1.0
+    BACKOFF_MAX_SECONDS = 60.0
+
+    ERROR_CODE_BANNED = 105
+
+    # endpoints weighted more than 1
+    WEIGHTS = {
+        '/balance': 5,
+        '/ticker/24h': 25,
+        '/trades': 5,
+        '/orders': 5,
+    }
+
+    ORDER_ENDPOINTS = ('/order', '/balance')
+
+    _lock = threading.Lock()
+    _random = random.Random()
+    _remaining: int = None
+    _reset_at: float = None
+    _blocked_until: float = 0.0
+    _failures: int = 0
+
+    @classmethod
+    def get_weight(cls, endpoint: str):
+        return cls.WEIGHTS.get(endpoint.split('?')[0], 1)
+
+    @classmethod
+    def get_priority(cls, endpoint: str):
+        if endpoint.split('?')[0] in cls.ORDER_ENDPOINTS:
+            return cls.PRIORITY_ORDER
+
+        return cls.PRIORITY_MARKET_DATA
+
+    @classmethod
+    def get_limit(cls):
+        return int(os.environ.get('RATE_LIMIT', cls.LIMIT))
+
+    @classmethod
+    def get_order_reserve(cls):
+        return int(os.environ.get('RATE_LIMIT_ORDER_RESERVE', cls.ORDER_RESERVE))
+
+    @classmethod
+    def get_max_wait(cls, priority: str):
+        """
+        :return: seconds a request waits for budget before it is given up, market data does not wait
+        """
+        if priority == cls.PRIORITY_ORDER:
+            return float(os.environ.get('RATE_LIMIT_ORDER_MAX_WAIT', cls.ORDER_MAX_WAIT_SECONDS))
+
+        return 0.0
+
+    @classmethod
+    def get_backoff(cls):
+        """
+        Exponential backoff by the number of rate limited responses in a row, jittered by +-50%
+        :return: seconds
+        """
+        backoff = float(os.environ.get('RATE_LIMIT_BACKOFF_SECONDS', cls.BACKOFF_SECONDS)) * 2 ** (cls._failures - 1)
+
+        return min(cls.BACKOFF_MAX_SECONDS, backoff) * cls._random.uniform(0.5, 1.5)
+
+    @classmethod
+    def acquire(cls, weight: int, priority: str):
+        """
+        Take weight from the budget, waiting for the budget to reset up to the max wait of priority
+        :param weight:
+        :param priority:
+        :return: False if no budget is available in time, the request must not be sent
+        """
+        deadline = time.time() + cls.get_max_wait(priority)
+
+        while True:
+            with cls._lock:
+                now = time.time()
+                wait_until = cls.get_wait_until(weight, priority, now)
+
+                if wait_until <= now:
+                    cls._remaining -= weight
+
+                    Metrics.inc('rate_limit_weight_total', weight, priority=priority)
+                    Metrics.set('rate_limit_remaining', cls._remaining)
+
+                    return True
+
+            if wait_until > deadline:
+                Metrics.inc('rate_limit_throttled_total', priority=priority)
+
+                logging.warning('RATE_LIMITER:acquire:THROTTLED:' + priority)
+
+                return False
+
+            time.sleep(max(0.0, wait_until - time.time()))
+
+    @classmethod
+    def get_wait_until(cls, weight: int, priority: str, now: float):
+        """
+        :return: epoch seconds the request may be sent at, now or earlier if right away
+        """
+        if cls._blocked_until > now:
+            return cls._blocked_until
+
+        if cls._remaining is None or (cls._reset_at is not None and now >= cls._reset_at):
+            cls._remaining = cls.get_limit()
+            cls._reset_at = now + cls.WINDOW_SECONDS
+
+        reserve = 0 if priority == cls.PRIORITY_ORDER else cls.get_order_reserve()
+
+        if cls._remaining - weight >= reserve:
+            return now
+
+        return cls._reset_at
+
+    @classmethod
+    def update(cls, status_code: int, headers, response):
+        """
+        Correct the budget by the rate limit headers of a response, back off on rate limit and ban responses
+        :param status_code:
+        :param headers:
+        :param response: decoded json response
+        :return:
+        """
+        error_code = response.get('errorCode') if isinstance(response, dict) else None
+
+        with cls._lock:
+            now = time.time()
+
+            if 'bitvavo-ratelimit-remaining' in headers:
+                cls._remaining = int(headers['bitvavo-ratelimit-remaining'])
+
+            if 'bitvavo-ratelimit-resetat' in headers:
+                cls._reset_at = int(headers['bitvavo-ratelimit-resetat']) / 1000
+
+            if status_code == 429 or error_code == cls.ERROR_CODE_BANNED:
+                cls._failures += 1
+                blocked_until = now + cls.get_backoff()
+
+                if error_code == cls.ERROR_CODE_BANNED:
+                    blocked_until = max(blocked_until, cls.get_banned_until(response))
+
+                cls._blocked_until = max(cls._blocked_until, blocked_until)
+
+                Metrics.inc('rate_limit_responses_total', status=str(status_code))
+
+                logging.warning('RATE_LIMITER:update:BACKOFF:%.3fs' % (cls._blocked_until - now))
+            else:
+                cls._failures = 0
+
+            if cls._remaining is not None:
+                Metrics.set('rate_limit_remaining', cls._remaining)
+
+            Metrics.set('rate_limit_blocked_seconds', max(0.0, cls._blocked_until - now))
+
+    @classmethod
+    def get_banned_until(cls, response: dict):
+        """
+        :param response: ban response, its error ends by "at <epoch milliseconds>."
+        :return: epoch seconds, 0 if not in the error
+        """
+        try:
+            return int(response['error'].split(' at ')[1].split('.')[0]) / 1000
+        except (KeyError, IndexError, ValueError):
+            return 0.0
+
+    @classmethod
+    def get_budget(cls):
+        """
+        :return: remaining weight, epoch seconds of the budget reset and of the end of the backoff
+        """
+        with cls._lock:
+            return cls._remaining, cls._reset_at, cls._blocked_until
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls._remaining = None
+            cls._reset_at = None
+            cls._blocked_until = 0.0
+            cls._failures = 0
@@ -0,0 +1,363 @@
+import datetime
+import hashlib
+import logging
+import os
+import struct
+from decimal import Decimal
+
+from models.Alert import Alert
+from models.stores.JsonAlertStore import JsonAlertStore
+
+
+class BinaryAlertStore(JsonAlertStore):
+    """
+    Alerts as fixed size records of a binary snapshot, dates as epoch microseconds and decimals as scaled integers.
+    Decimals not fitting an int64 mantissa and a byte exponent are kept exactly in a table of decimal strings.
+    Only active alerts are materialized as Alert, other records are written back as they are.
+    Json stays the format to import, export and hand over new alerts.
+    """
+    MAGIC = b'BTSA'
+    VERSION = 2
+    VERSIONS = [1, 2]
+
+    HEADER = struct.Struct('<4sB20sI')
+    MARKET_LENGTH = struct.Struct('<B')
+    EXACT_DECIMALS_COUNT = struct.Struct('<I')
+    EXACT_DECIMAL_LENGTH = struct.Struct('<H')
+    # market, status, actions, null mask, dt, init_dt, (mantissa, exponent) of amount, init_price, price,
+    # trailing_percentage and trailing_price
+    RECORD = struct.Struct('<HBBHqq' + 'qb' * 5)
+
+    STATUSES = [Alert.STATUS_NOT_INIT, Alert.STATUS_ACTIVE, Alert.STATUS_HIT]
+    STATUS_ACTIVE = STATUSES.index(Alert.STATUS_ACTIVE)
+    DECIMAL_ATTRIBUTES = ['amount', 'init_price', 'price', 'trailing_percentage', 'trailing_price']
+    DATETIME_ATTRIBUTES = ['dt', 'init_dt']
+
+    EPOCH = datetime.datetime(1970, 1, 1)
+    MAX_MANTISSA = 2 ** 63 - 1
+    MIN_EXPONENT = -127
+    MAX_EXPONENT = 127
+    # exponent of a decimal kept in the table of exact decimals, its mantissa is the index in the table
+    EXPONENT_EXACT = -128
+
+    binary_file_name: str = None
+
+    _markets: list = None
+    _exact_decimals: list = None
+    _records: list = None
+    _removed_ids: set = None
+
+    def __init__(self, **kwargs):
+        self._markets = []
+        self._exact_decimals = []
+        self._records = []
+        self._removed_ids = set()
+        self.binary_file_name = kwargs.get('binary_file_name') if 'binary_file_name' in kwargs else os.environ.get('ALERTS_BINARY_FILE_NAME', 'alerts.bin')
+
+        for k, v in kwargs.items():
+            self.__setattr__(k, v)
+
+    def get_binary_file_path(self):
+        return self.file_path + self.binary_file_name
+
+    def get_json_store(self):
+        return JsonAlertStore(
+            file_path=self.file_path,
+            file_name=self.file_name,
+            journal_file_name=self.journal_file_name
+        )
+
+    @classmethod
+    def get_decimal_parts(cls, value: Decimal):
+        """
+        :param value:
+        :return: mantissa and exponent, None if the mantissa exceeds int64 or the exponent a byte
+        """
+        sign, digits, exponent = value.as_tuple()
+
+        if not isinstance(exponent, int) or not cls.MIN_EXPONENT <= exponent <= cls.MAX_EXPONENT:
+            return None
+
+        mantissa = int(''.join(map(str, digits)))
+
+        if mantissa > cls.MAX_MANTISSA:
+            return None
+
+        return -mantissa if sign else mantissa, exponent
+
+    def get_exact_decimal_parts(self, value: Decimal):
+        """
+        :param value: decimal not fitting mantissa and exponent
+        :return: index in the table of exact decimals and the exact exponent
+        """
+        self._exact_decimals.append(str(value))
+
+        return len(self._exact_decimals) - 1, self.EXPONENT_EXACT
+
+    def get_decimal(self, mantissa: int, exponent: int):
+        if exponent == self.EXPONENT_EXACT:
+            return Decimal(self._exact_decimals[mantissa])
+
+        return Decimal(mantissa).scaleb(exponent)
+
+    def get_market_index(self, market: str):
+        if market not in self._markets:
+            self._markets.append(market)
+
+        return self._markets.index(market)
+
+    def get_record(self, alert: Alert):
+        null_mask = 0
+        values = []
+
+        for idx, attribute in enumerate(self.DATETIME_ATTRIBUTES):
+            value = getattr(alert, attribute)
+
+            if value is None:
+                null_mask |= 1 << idx
+                values.append(0)
+            else:
+                values.append((value - self.EPOCH) // datetime.timedelta(microseconds=1))
+
+        for idx, attribute in enumerate(self.DECIMAL_ATTRIBUTES):
+            value = getattr(alert, attribute)
+
+            if value is None:
+                null_mask |= 1 << (len(self.DATETIME_ATTRIBUTES) + idx)
+                values.extend([0, 0])
+            else:
+                value = Decimal(value)
+
+                values.extend(self.get_decimal_parts(value) or self.get_exact_decimal_parts(value))
+
+        # known actions only, the bitmask of the alert
+        actions = alert._actions
+
+        if alert.market is None:
+            null_mask |= 1 << (len(self.DATETIME_ATTRIBUTES) + len(self.DECIMAL_ATTRIBUTES))
+            market = 0
+        else:
+            market = self.get_market_index(alert.market)
+
+        return (market, self.STATUSES.index(alert.status), actions, null_mask) + tuple(values)
+
+    def get_alert(self, record: tuple, record_id: int):
+        market, status, actions, null_mask, dt, init_dt = record[:6]
+        decimals = record[6:]
+        epoch = self.EPOCH
+        microsecond = datetime.timedelta(microseconds=1)
+
+        alert = Alert(
+            actions=Alert.get_actions(actions),
+            status=self.STATUSES[status],
+            dt=None if null_mask & 1 else epoch + dt * microsecond,
+            init_dt=None if null_mask & 2 else epoch + init_dt * microsecond,
+            amount=None if null_mask & 4 else self.get_decimal(decimals[0], decimals[1]),
+            init_price=None if null_mask & 8 else self.get_decimal(decimals[2], decimals[3]),
+            price=None if null_mask & 16 else self.get_decimal(decimals[4], decimals[5]),
+            trailing_percentage=None if null_mask & 32 else self.get_decimal(decimals[6], decimals[7]),
+            trailing_price=None if null_mask & 64 else self.get_decimal(decimals[8], decimals[9]),
+            market=None if null_mask & 128 else self._markets[market]
+        )
+        alert._id = record_id
+
+        return alert
+
+    def read(self):
+        """
+        Read snapshot into markets, exact decimals and records
+        :return: False if there is no snapshot
+        """
+        file_path = self.get_binary_file_path()
+
+        try:
+            with open(file_path, 'rb') as fp:
+                data = fp.read()
+        except FileNotFoundError:
+            return False
+
+        magic, version, checksum, markets_count = self.HEADER.unpack_from(data)
+
+        if magic != self.MAGIC or version not in self.VERSIONS:
+            raise ValueError('Unknown alerts snapshot format: ' + file_path)
+
+        if hashlib.sha1(data[self.HEADER.size:]).digest() != checksum:
+            raise ValueError('Alerts snapshot checksum mismatch: ' + file_path)
+
+        offset = self.HEADER.size
+        markets = []
+        exact_decimals = []
+
+        for idx in range(markets_count):
+            length = self.MARKET_LENGTH.unpack_from(data, offset)[0]
+            offset += self.MARKET_LENGTH.size
+            markets.append(data[offset:offset + length].decode('utf-8'))
+            offset += length
+
+        if version > 1:
+            exact_decimals_count = self.EXACT_DECIMALS_COUNT.unpack_from(data, offset)[0]
+            offset += self.EXACT_DECIMALS_COUNT.size
+
+            for idx in range(exact_decimals_count):
+                length = self.EXACT_DECIMAL_LENGTH.unpack_from(data, offset)[0]
+                offset += self.EXACT_DECIMAL_LENGTH.size
+                exact_decimals.append(data[offset:offset + length].decode('ascii'))
+                offset += length
+
+        self._markets = markets
+        self._exact_decimals = exact_decimals
+        self._records = list(self.RECORD.iter_unpack(data[offset:]))
+
+        return True
+
+    def compact_exact_decimals(self):
+        """
+        Drop exact decimals no longer referenced by a record, left behind by re-encoded or removed records
+        :return:
+        """
+        if not self._exact_decimals:
+            return
+
+        exact_decimals = []
+        records = []
+
+        for record in self._records:
+            decimals = list(record[6:])
+
+            for idx in range(1, len(decimals), 2):
+                if decimals[idx] == self.EXPONENT_EXACT:
+                    exact_decimals.append(self._exact_decimals[decimals[idx - 1]])
+                    decimals[idx - 1] = len(exact_decimals) - 1
+
+            records.append(record[:6] + tuple(decimals))
+
+        self._exact_decimals = exact_decimals
+        self._records = records
+
+    def write(self):
+        """
+        Write markets, exact decimals and records as snapshot, replaced atomically
+        :return:
+        """
+        self.compact_exact_decimals()
+
+        body = b''.join(
+            [self.MARKET_LENGTH.pack(len(market.encode('utf-8'))) + market.encode('utf-8') for market in self._markets] +
+            [self.EXACT_DECIMALS_COUNT.pack(len(self._exact_decimals))] +
+            [self.EXACT_DECIMAL_LENGTH.pack(len(value)) + value.encode('ascii') for value in self._exact_decimals] +
+            [self.RECORD.pack(*record) for record in self._records]
+        )
+        checksum = hashlib.sha1(body).digest()
+
+        file_path = self.get_binary_file_path()
+
+        with open(file_path + '.tmp', 'wb') as fp:
+            fp.write(self.HEADER.pack(self.MAGIC, self.VERSION, checksum, len(self._markets)))
+            fp.write(body)
+            fp.flush()
+            os.fsync(fp.fileno())
+
+        os.replace(file_path + '.tmp', file_path)
+
+    def load(self):
+        """
+        :return: list of active alerts, ids are record positions
+        """
+        if not self.read():
+            self.import_json()
+
+        alerts = []
+
+        for record_id, record in enumerate(self._records):
+            if record[1] != self.STATUS_ACTIVE:
+                continue
+
+            alerts.append(self.get_alert(record, record_id))
+
+        logging.debug('BINARY_ALERT_STORE:load:loaded_alerts:' + str(len(alerts)))
+
+        return alerts
+
+    def load_new(self, alerts_count: int):
+        alerts = super().load_new(alerts_count)
+
+        for alert in alerts:
+            # record is appended on next save
+            alert._id = None
+
+        return alerts
+
+    def import_json(self):
+        """
+        Replace records by all alerts of the json alerts file, including its journal
+        :return: number of imported alerts
+        """
+        if not os.path.isfile(self.file_path + self.file_name):
+            return 0
+
+        alerts = self.get_json_store().load()
+
+        self._markets = []
+        self._exact_decimals = []
+        self._records = [self.get_record(alert) for alert in alerts]
+        self._removed_ids = set()
+
+        self.write()
+
+        return len(alerts)
+
+    def export_json(self):
+        """
+        Write all records, not only active alerts, as json alerts file
+        :return: number of exported alerts
+        """
+        self.read()
+
+        alerts = [self.get_alert(record, record_id) for record_id, record in enumerate(self._records)]
+
+        self.get_json_store().save_snapshot(alerts)
+
+        return len(alerts)
+
+    def remove(self, alerts: list):
+        for alert in alerts:
+            if alert._id is not None:
+                self._removed_ids.add(alert._id)
+
+    def save(self, alerts: list, changed_attributes: dict):
+        """
+        Re-encode changed alerts, append new alerts and write the snapshot
+        :param alerts: loaded alerts
+        :param changed_attributes: dict of alert id => set of attribute names changed since last save
+        :return:
+        """
+        for alert in alerts:
+            if alert._id is None:
+                alert._id = len(self._records)
+                self._records.append(self.get_record(alert))
+            elif alert._id in changed_attributes:
+                self._records[alert._id] = self.get_record(alert)
+
+        if self._removed_ids:
+            ids = {}
+            records = []
+
+            for record_id, record in enumerate(self._records):
+                if record_id in self._removed_ids:
+                    continue
+
+                ids[record_id] = len(records)
+                records.append(record)
+
+            for alert in alerts:
+                alert._id = ids[alert._id]
+
+            self._records = records
+            self._removed_ids = set()
+
+        self.write()
+
+        logging.debug('BINARY_ALERT_STORE:save:saved_alerts:' + str(len(self._records)))
+
+    def save_snapshot(self, alerts: list):
+        self.save(alerts, {alert._id: set() for alert in alerts})
@@ -0,0 +1,181 @@
+import logging
+import os
+from decimal import Decimal
+from pathlib import Path
+
+import simplejson
+import simplejson as json
+
+from models.Alert import Alert
+from models.AlertJournal import AlertJournal
+
+
+class JsonAlertStore(object):
+    """
+    Alerts as json array in alerts file, new alerts handed over by new alert file, optionally with journal
+    """
+    file_path: str = None
+    file_name: str = None
+    new_alert_file_name: str = None
+    journal_file_name: str = None
+
+    _journal: AlertJournal = None
+    _journal_count: int = None
+    _snapshot_due: bool = False
+
+    def __init__(self, **kwargs):
+        for k, v in kwargs.items():
+            self.__setattr__(k, v)
+
+        if self.journal_file_name is not None and self._journal is None:
+            self._journal = AlertJournal(file_path=self.file_path + self.journal_file_name)
+
+    @classmethod
+    def get_decimal(cls, s):
+        return Decimal(s)
+
+    def load(self):
+        """
+        :return: list of all alerts, ids are positions in alerts file
+        """
+        alerts = list()
+        snapshot = b''
+
+        try:
+            with open(self.file_path + self.file_name, 'rb') as fp:
+                snapshot = fp.read()
+
+            alerts = json.loads(snapshot, parse_float=self.get_decimal, parse_int=self.get_decimal)
+        except FileNotFoundError:
+            logging.info('No alert file.')
+            Path(self.file_path + self.file_name).touch()
+            logging.info('Created alert file.')
+
+            return []
+        except simplejson.errors.JSONDecodeError as e:
+            logging.warning(e)
+
+        if self._journal is not None:
+            alerts = self._journal.replay(alerts, snapshot)
+            self._journal_count = len(alerts)
+
+        alerts = [Alert.get_by_dict(alert) for alert in alerts]
+
+        for idx, alert in enumerate(alerts):
+            alert._id = idx
+
+        if self._journal is not None and self._journal.torn:
+            self.save_snapshot(alerts)
+
+        return alerts
+
+    def load_new(self, alerts_count: int):
+        """
+        Load new alert from dedicated file, written by CreateAlert
+        :param alerts_count: number of loaded alerts
+        :return: list of new alerts
+        """
+        if self.new_alert_file_name is None:
+            return []
+
+        try:
+            with open(self.file_path + self.new_alert_file_name, 'r') as fp:
+                alert = json.load(fp, parse_float=self.get_decimal, parse_int=self.get_decimal)
+
+            os.remove(self.file_path + self.new_alert_file_name)
+        except FileNotFoundError:
+            logging.debug('No new alert file.')
+
+            return []
+        except simplejson.errors.JSONDecodeError as e:
+            logging.warning(e)
+
+            return []
+
+        logging.debug('JSON_ALERT_STORE:load_new:loaded_alert:' + str(alert))
+
+        alert = Alert.get_by_dict(alert)
+        alert._id = alerts_count
+
+        return [alert]
+
+    def add(self, alert: Alert):
+        """
+        Hand over new alert to the updating process by new alert file
+        :param alert:
+        :return:
+        """
+        with open(self.file_path + self.new_alert_file_name, 'w') as fp:
+            json.dump(alert.attributes(), fp, indent=4, sort_keys=True, default=str)
+
+    def remove(self, alerts: list):
+        """
+        Alerts were removed from the loaded alerts, ids are positions so the next save writes a snapshot
+        :param alerts: removed alerts
+        :return:
+        """
+        if alerts:
+            self._snapshot_due = True
+
+    def save(self, alerts: list, changed_attributes: dict):
+        """
+        :param alerts: all alerts
+        :param changed_attributes: dict of alert id => set of attribute names changed since last save
+        :return:
+        """
+        for idx, alert in enumerate(alerts):
+            if alert._id is None:
+                alert._id = idx
+
+        if self._snapshot_due or self._journal is None or self._journal_count is None or self._journal.is_compaction_due():
+            self.save_snapshot(alerts)
+
+            return
+
+        entries = []
+
+        for alert in alerts[self._journal_count:]:
+            entries.append({'id': alert._id, 'alert': alert.attributes()})
+
+        for alert_id, attributes_changed in sorted(changed_attributes.items()):
+            if alert_id >= self._journal_count:
+                continue
+
+            attributes = alerts[alert_id].attributes()
+
+            entries.append({'id': alert_id, 'changes': {k: attributes[k] for k in attributes_changed}})
+
+        self._journal.append(entries)
+        self._journal_count = len(alerts)
+
+        logging.debug('JSON_ALERT_STORE:save:journal_entries:' + str(len(entries)))
+
+    def save_snapshot(self, alerts: list):
+        """
+        Write all alerts to alerts file, replaced atomically so a crash can't truncate it
+        :param alerts:
+        :return:
+        """
+        for idx, alert in enumerate(alerts):
+            alert._id = idx
+
+        attributes = [alert.attributes() for alert in alerts]
+
+        snapshot = json.dumps(attributes, indent=4, sort_keys=True, default=str).encode('utf-8')
+
+        file_path = str(self.file_path) + str(self.file_name)
+
+        with open(file_path + '.tmp', 'wb') as fp:
+            fp.write(snapshot)
+            fp.flush()
+            os.fsync(fp.fileno())
+
+        os.replace(file_path + '.tmp', file_path)
+
+        if self._journal is not None:
+            self._journal.reset(snapshot)
+            self._journal_count = len(alerts)
+
+        self._snapshot_due = False
+
+        logging.debug('ALERT:save_alerts:saved_alerts:' + str(attributes))
@@ -0,0 +1,207 @@
+import logging
+import sqlite3
+from decimal import Decimal
+
+import simplejson as json
+
+from models.Alert import Alert
+
+
+class SqliteAlertStore(object):
+    """
+    Alerts as rows of a SQLite database, only active alerts are loaded and changes are written in one transaction
+    """
+    COLUMNS = [
+        'actions',
+        'amount',
+        'dt',
+        'init_dt',
+        'init_price',
+        'market',
+        'price',
+        'status',
+        'trailing_percentage',
+        'trailing_price'
+    ]
+
+    DECIMAL_COLUMNS = [
+        'amount',
+        'init_price',
+        'price',
+        'trailing_percentage',
+        'trailing_price'
+    ]
+
+    file_path: str = None
+
+    _connection: sqlite3.Connection = None
+    _last_id: int = 0
+    _own_ids: set = None
+
+    def __init__(self, **kwargs):
+        self._own_ids = set()
+
+        for k, v in kwargs.items():
+            self.__setattr__(k, v)
+
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.file_path)
+            self._connection.execute('PRAGMA journal_mode=WAL')
+
+        self.create_schema()
+
+    def create_schema(self):
+        with self._connection:
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS alerts ('
+                'id INTEGER PRIMARY KEY, '
+                'actions TEXT, '
+                'amount TEXT, '
+                'dt TEXT, '
+                'init_dt TEXT, '
+                'init_price TEXT, '
+                'market TEXT, '
+                'price TEXT, '
+                'status TEXT, '
+                'trailing_percentage TEXT, '
+                'trailing_price TEXT'
+                ')'
+            )
+            self._connection.execute('CREATE INDEX IF NOT EXISTS alerts_status ON alerts (status)')
+            self._connection.execute('CREATE INDEX IF NOT EXISTS alerts_market ON alerts (market)')
+
+    @classmethod
+    def get_row(cls, attributes: dict):
+        row = []
+
+        for column in cls.COLUMNS:
+            value = attributes[column]
+
+            if column == 'actions':
+                value = json.dumps(value)
+            elif value is not None:
+                value = str(value)
+
+            row.append(value)
+
+        return row
+
+    @classmethod
+    def get_alert(cls, row: tuple):
+        attributes = dict(zip(['id'] + cls.COLUMNS, row))
+        attributes['actions'] = json.loads(attributes['actions'])
+
+        for column in cls.DECIMAL_COLUMNS:
+            if attributes[column] is not None:
+                attributes[column] = Decimal(attributes[column])
+
+        alert = Alert.get_by_dict(attributes)
+        alert._id = attributes['id']
+
+        return alert
+
+    def select(self, where: str, parameters: tuple):
+        return self._connection.execute(
+            'SELECT id, ' + ', '.join(self.COLUMNS) + ' FROM alerts WHERE ' + where + ' ORDER BY id',
+            parameters
+        ).fetchall()
+
+    def load(self):
+        """
+        :return: list of active alerts
+        """
+        with self._connection:
+            # one read transaction, so no alert added meanwhile is skipped by load_new
+            self._connection.execute('BEGIN')
+
+            rows = self.select('status = ?', (Alert.STATUS_ACTIVE,))
+            last_id = self._connection.execute('SELECT MAX(id) FROM alerts').fetchone()[0]
+
+        self._last_id = last_id or 0
+
+        return [self.get_alert(row) for row in rows]
+
+    def load_new(self, alerts_count: int):
+        """
+        :param alerts_count: number of loaded alerts
+        :return: list of active alerts added by others since last load
+        """
+        rows = self.select('id > ?', (self._last_id,))
+
+        if not rows:
+            return []
+
+        self._last_id = rows[-1][0]
+
+        alerts = [
+            self.get_alert(row) for row in rows
+            if row[0] not in self._own_ids and row[1 + self.COLUMNS.index('status')] == Alert.STATUS_ACTIVE
+        ]
+
+        logging.debug('SQLITE_ALERT_STORE:load_new:loaded_alerts:' + str(len(alerts)))
+
+        return alerts
+
+    def add(self, alert: Alert):
+        with self._connection:
+            self.insert(alert)
+
+    def insert(self, alert: Alert):
+        cursor = self._connection.execute(
+            'INSERT INTO alerts (' + ', '.join(self.COLUMNS) + ') VALUES (' + ', '.join(['?'] * len(self.COLUMNS)) + ')',
+            self.get_row(alert.attributes())
+        )
+
+        alert._id = cursor.lastrowid
+        self._own_ids.add(alert._id)
+
+    def import_alerts(self, alerts: list):
+        """
+        Insert alerts of another store, like all alerts of a json alerts file
+        :param alerts:
+        :return:
+        """
+        with self._connection:
+            self._connection.executemany(
+                'INSERT INTO alerts (' + ', '.join(self.COLUMNS) + ') VALUES (' + ', '.join(['?'] * len(self.COLUMNS)) + ')',
+                [self.get_row(alert.attributes()) for alert in alerts]
+            )
+
+    def remove(self, alerts: list):
+        """
+        Delete rows of alerts, like hit alerts moved to the archive
+        :param alerts:
+        :return:
+        """
+        with self._connection:
+            self._connection.executemany(
+                'DELETE FROM alerts WHERE id = ?',
+                [(alert._id,) for alert in alerts if alert._id is not None]
+            )
+
+    def save(self, alerts: list, changed_attributes: dict):
+        """
+        Insert unsaved alerts and update changed attributes in one transaction
+        :param alerts: loaded alerts
+        :param changed_attributes: dict of alert id => set of attribute names changed since last save
+        :return:
+        """
+        alerts_by_id = {}
+
+        with self._connection:
+            for alert in alerts:
+                if alert._id is None:
+                    self.insert(alert)
+                elif alert._id in changed_attributes:
+                    alerts_by_id[alert._id] = alert
+
+            for alert_id, alert in alerts_by_id.items():
+                columns = sorted(changed_attributes[alert_id])
+                row = self.get_row(alert.attributes())
+
+                self._connection.execute(
+                    'UPDATE alerts SET ' + ', '.join([column + ' = ?' for column in columns]) + ' WHERE id = ?',
+                    [row[self.COLUMNS.index(column)] for column in columns] + [alert_id]
+                )
+
+        logging.debug('SQLITE_ALERT_STORE:save:updated_alerts:' + str(len(alerts_by_id)))
@@ -0,0 +1,25 @@
+import argparse
+import datetime
+import os
+
+import simplejson as json
+
+from models.AlertArchive import AlertArchive
+import main
+
+
+def get_date(s):
+    return datetime.datetime.strptime(s, AlertArchive.DATE_FORMAT).date()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Print archived hit alerts as json lines.')
+    parser.add_argument('--market', default=None)
+    parser.add_argument('--from', dest='date_from', type=get_date, default=None, help='first day hit, YYYY-MM-DD')
+    parser.add_argument('--to', dest='date_to', type=get_date, default=None, help='last day hit, YYYY-MM-DD')
+    args = parser.parse_args()
+
+    archive = AlertArchive(file_path=os.environ.get('ALERTS_ARCHIVE_PATH'))
+
+    for alert in archive.query(args.market, args.date_from, args.date_to):
+        print(json.dumps(alert.attributes(), sort_keys=True, default=str))
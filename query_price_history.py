@@ -0,0 +1,23 @@
+import argparse
+import os
+
+from models.PriceHistory import PriceHistory
+import main
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Print the recorded prices of a market as csv, read while the handler appends.')
+    parser.add_argument('market')
+    parser.add_argument('--last', type=int, default=None, help='number of latest prices, all kept prices if not set')
+    args = parser.parse_args()
+
+    history = PriceHistory(file_path=os.environ.get('PRICE_HISTORY_PATH'), writable=False)
+    series = history.get_series(args.market, args.last)
+
+    if series is not None:
+        print('timestamp,price')
+
+        for ts, price in zip(series.dt.astype('int64'), series.price):
+            print(str(ts) + ',' + str(series.get_decimal(price)))
+
+    history.close()
@@ -0,0 +1,83 @@
+import random
+from decimal import Decimal
+
+from models.clients.Bitvavo import BitvavoClient
+from models.clients.Cryptowatch import CryptowatchClient
+
+
+class PriceFeed(object):
+    """
+    Random walk of ticker prices of all markets, one step per tick
+    """
+    markets: list = None
+    volatility: float = 0.002
+    seed: int = 1
+    places: int = 2
+
+    prices: dict = None
+    _random: random.Random = None
+
+    def __init__(self, **kwargs):
+        for k, v in kwargs.items():
+            self.__setattr__(k, v)
+
+        self._random = random.Random(self.seed)
+
+        if self.prices is None:
+            self.prices = {market: 1000.0 + 100 * idx for idx, market in enumerate(self.markets)}
+
+    def step(self):
+        for market in self.markets:
+            self.prices[market] *= 1 + self._random.gauss(0, self.volatility)
+
+    def get_price(self, market: str):
+        return Decimal(round(self.prices[market], self.places)).quantize(Decimal(1).scaleb(-self.places))
+
+    def get_ticker_prices(self):
+        return [{'market': market, 'price': str(self.get_price(market))} for market in self.markets]
+
+
+class FakeBitvavoClient(BitvavoClient):
+    """
+    Bitvavo client answering from a price feed instead of the API, for offline benchmarks
+    """
+    _feed: PriceFeed = None
+
+    orders: list = None
+
+    def __init__(self, **kwargs):
+        self.orders = []
+
+        super().__init__(api_key='', api_secret='', **kwargs)
+
+    def tickerPrice(self, options=None):
+        if options and 'market' in options:
+            return {'market': options['market'], 'price': str(self._feed.get_price(options['market']))}
+
+        return self._feed.get_ticker_prices()
+
+    def balance(self, options=None):
+        return [{'symbol': options.get('symbol'), 'available': '1', 'inOrder': '0'}]
+
+    def candles(self, symbol, interval, options=None, limit=None, start=None, end=None):
+        # the feed has no history, no candles are missed
+        return []
+
+    def markets(self, options=None):
+        return [{'market': market, 'status': 'trading', 'pricePrecision': 5} for market in self._feed.markets]
+
+    def placeOrder(self, market, side, orderType, body):
+        self.orders.append((market, side, orderType, body))
+
+        return {'orderId': str(len(self.orders)), 'market': market, 'side': side, 'orderType': orderType}
+
+
+class FakeCryptowatchClient(CryptowatchClient):
+    """
+    Backup price client confirming prices of the feed
+    """
+    _feed: PriceFeed = None
+    market: str = None
+
+    def get_ticker_price(self):
+        return self._feed.get_price(self.market)
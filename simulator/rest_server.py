@@ -0,0 +1,392 @@
+import argparse
+import logging
+import random
+import threading
+import time
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import simplejson as json
+
+from simulator.fake_exchange import PriceFeed
+
+
+class FakeRestServer(object):
+    """
+    Local stand-in for the Bitvavo REST API (ticker/price, candles, markets, balance, order) and the Cryptowatch price endpoint.
+    Prices follow scripted paths per market, advanced by every ticker price request of all markets,
+    or a random walk feed if no paths are set. Latency, rate limit responses and timeouts are injected per request.
+    """
+    LATENCY_FIXED = 'fixed'
+    LATENCY_UNIFORM = 'uniform'
+    LATENCY_EXPONENTIAL = 'exponential'
+    LATENCY_LOGNORMAL = 'lognormal'
+
+    BITVAVO_PREFIX = '/v2'
+    CRYPTOWATCH_PREFIX = '/cryptowatch'
+
+    host: str = '127.0.0.1'
+    port: int = 0
+
+    price_paths: dict = None
+    # market => candles [timestamp, open, high, low, close, volume] of the candles endpoint, any order
+    candles: dict = None
+    feed: PriceFeed = None
+    # available balance of every symbol before the sell orders on the server
+    balance: str = '1'
+
+    latency: float = 0.0
+    latency_distribution: str = LATENCY_FIXED
+    latency_sigma: float = 0.5
+    rate_limit_ratio: float = 0.0
+    rate_limit: int = None
+    rate_limit_window: float = 60.0
+    timeout_ratio: float = 0.0
+    timeout_seconds: float = 30.0
+    seed: int = 1
+
+    requests: list = None
+    orders: list = None
+    # requests received and not answered yet, and the most of them at once
+    in_flight: int = 0
+    max_in_flight: int = 0
+
+    _server: ThreadingHTTPServer = None
+    _thread: threading.Thread = None
+    _lock: threading.Lock = None
+    _random: random.Random = None
+    _steps: int = 0
+    _window_started: float = None
+    _window_requests: int = 0
+    _sold: dict = None
+
+    def __init__(self, **kwargs):
+        self.requests = []
+        self.orders = []
+        self._sold = {}
+        self._lock = threading.Lock()
+
+        for k, v in kwargs.items():
+            self.__setattr__(k, v)
+
+        self._random = random.Random(self.seed)
+
+        if self.price_paths is None and self.feed is None:
+            self.feed = PriceFeed(markets=['BTC-EUR', 'ETH-EUR'], seed=self.seed)
+
+    def start(self):
+        server = self
+
+        class Handler(FakeRestRequestHandler):
+            fake_server = server
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+        logging.info('FAKE_REST_SERVER:start:LISTENING:' + self.get_url())
+
+        return self
+
+    def stop(self):
+        if self._server is None:
+            return
+
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+
+    def get_url(self):
+        return 'http://' + self.host + ':' + str(self._server.server_address[1])
+
+    def get_bitvavo_url(self):
+        return self.get_url() + self.BITVAVO_PREFIX
+
+    def get_cryptowatch_url(self):
+        return self.get_url() + self.CRYPTOWATCH_PREFIX
+
+    def get_balance(self, symbol: str):
+        """
+        :param symbol:
+        :return: balance less the amounts sold of the symbol, not below 0
+        """
+        with self._lock:
+            return max(Decimal('0'), Decimal(self.balance) - self._sold.get(symbol, Decimal('0')))
+
+    def get_markets(self):
+        if self.price_paths is not None:
+            return list(self.price_paths.keys())
+
+        return self.feed.markets
+
+    def get_price(self, market: str):
+        if self.price_paths is not None:
+            path = self.price_paths[market]
+
+            return Decimal(str(path[min(self._steps, len(path) - 1)]))
+
+        return self.feed.get_price(market)
+
+    def step(self):
+        with self._lock:
+            self._steps += 1
+
+            if self.price_paths is None:
+                self.feed.step()
+
+    def get_latency(self):
+        with self._lock:
+            if self.latency_distribution == self.LATENCY_UNIFORM:
+                return self._random.uniform(0, 2 * self.latency)
+
+            if self.latency_distribution == self.LATENCY_EXPONENTIAL:
+                return self._random.expovariate(1 / self.latency) if self.latency else 0.0
+
+            if self.latency_distribution == self.LATENCY_LOGNORMAL:
+                # median latency, long tail by sigma
+                return self.latency * self._random.lognormvariate(0, self.latency_sigma)
+
+        return self.latency
+
+    def is_rate_limited(self):
+        with self._lock:
+            now = time.monotonic()
+
+            if self._window_started is None or now - self._window_started >= self.rate_limit_window:
+                self._window_started = now
+                self._window_requests = 0
+
+            self._window_requests += 1
+
+            if self.rate_limit is not None and self._window_requests > self.rate_limit:
+                return True
+
+            return self._random.random() < self.rate_limit_ratio
+
+    def get_reset_at(self):
+        """
+        :return: epoch seconds of the end of the rate limit window
+        """
+        return (self._window_started or time.monotonic()) + self.rate_limit_window - time.monotonic() + time.time()
+
+    def get_rate_limit_headers(self):
+        with self._lock:
+            remaining = 1000 if self.rate_limit is None else max(0, self.rate_limit - self._window_requests)
+            reset_at = self.get_reset_at()
+
+        return {
+            'bitvavo-ratelimit-remaining': str(remaining),
+            'bitvavo-ratelimit-resetat': str(int(reset_at * 1000))
+        }
+
+    def get_ban_response(self):
+        """
+        Bitvavo answers an exceeded rate limit by a ban until the end of the window
+        :return: error response of error code 105
+        """
+        with self._lock:
+            banned_until = self.get_reset_at()
+
+        return {
+            'errorCode': 105,
+            'error': 'Your IP or API key has been banned for not respecting the rate limit. The ban expires at %d.' % int(banned_until * 1000)
+        }
+
+    def is_timed_out(self):
+        with self._lock:
+            return self._random.random() < self.timeout_ratio
+
+    def enter(self):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def leave(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def record(self, method: str, path: str, status: int):
+        with self._lock:
+            self.requests.append((time.perf_counter(), method, path, status))
+
+    def handle(self, method: str, path: str, query: dict, body: dict):
+        """
+        :return: status code and json response
+        """
+        if path.startswith(self.CRYPTOWATCH_PREFIX + '/markets/'):
+            # /cryptowatch/markets/<exchange>/<coin><currency>/price
+            pair = path.split('/')[4]
+
+            for market in self.get_markets():
+                if market.replace('-', '').lower() == pair:
+                    return 200, {'result': {'price': float(self.get_price(market))}}
+
+            return 404, {'error': 'Instrument not found'}
+
+        if path == self.BITVAVO_PREFIX + '/ticker/price':
+            if 'market' in query:
+                return 200, {'market': query['market'], 'price': str(self.get_price(query['market']))}
+
+            response = [{'market': market, 'price': str(self.get_price(market))} for market in self.get_markets()]
+
+            self.step()
+
+            return 200, response
+
+        if path.startswith(self.BITVAVO_PREFIX + '/') and path.endswith('/candles'):
+            market = path.split('/')[2]
+            start = int(query.get('start', 0))
+            end = int(query.get('end', 2 ** 62))
+
+            candles = [candle for candle in (self.candles or {}).get(market, []) if start <= candle[0] <= end]
+
+            return 200, sorted(candles, reverse=True)[:int(query.get('limit', 1440))]
+
+        if path == self.BITVAVO_PREFIX + '/markets':
+            markets = [query['market']] if 'market' in query else self.get_markets()
+            response = [{'market': market, 'status': 'trading', 'base': market.split('-')[0], 'quote': market.split('-')[1], 'pricePrecision': 5} for market in markets]
+
+            return 200, response[0] if 'market' in query else response
+
+        if path == self.BITVAVO_PREFIX + '/balance':
+            return 200, [{'symbol': query.get('symbol'), 'available': str(self.get_balance(query.get('symbol'))), 'inOrder': '0'}]
+
+        if path == self.BITVAVO_PREFIX + '/order' and method == 'POST':
+            try:
+                amount = Decimal(body.get('amount'))
+            except (TypeError, ArithmeticError):
+                return 400, {'errorCode': 205, 'error': 'amount parameter is invalid.'}
+
+            symbol = body.get('market', '').split('-')[0]
+
+            with self._lock:
+                order_id = str(len(self.orders) + 1)
+                self.orders.append((time.perf_counter(), body))
+
+                if body.get('side') == 'sell':
+                    self._sold[symbol] = self._sold.get(symbol, Decimal('0')) + amount
+
+            return 200, {
+                'orderId': order_id,
+                'market': body.get('market'),
+                'side': body.get('side'),
+                'orderType': body.get('orderType'),
+                'amount': body.get('amount'),
+                'status': 'filled',
+                'filledAmount': body.get('amount'),
+                'price': str(self.get_price(body.get('market')))
+            }
+
+        return 404, {'errorCode': 110, 'error': 'Unknown endpoint ' + path}
+
+
+class FakeRestRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    fake_server: FakeRestServer = None
+
+    def do_GET(self):
+        self.handle_request('GET')
+
+    def do_POST(self):
+        self.handle_request('POST')
+
+    def handle_request(self, method: str):
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        body = {}
+
+        length = int(self.headers.get('Content-Length') or 0)
+
+        if length:
+            body = json.loads(self.rfile.read(length))
+
+        server = self.fake_server
+        server.enter()
+
+        try:
+            self.respond(server, method, url, query, body)
+        finally:
+            server.leave()
+
+    def respond(self, server: FakeRestServer, method: str, url, query: dict, body: dict):
+        time.sleep(server.get_latency())
+
+        if server.is_timed_out():
+            # longer than the read timeout of the client, the response is never read
+            time.sleep(server.timeout_seconds)
+
+        if url.path.startswith(server.BITVAVO_PREFIX) and server.is_rate_limited():
+            status, response = 429, server.get_ban_response()
+        else:
+            status, response = server.handle(method, url.path, query, body)
+
+        server.record(method, url.path, status)
+
+        data = json.dumps(response).encode('utf-8')
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+
+        if url.path.startswith(server.BITVAVO_PREFIX):
+            for k, v in server.get_rate_limit_headers().items():
+                self.send_header(k, v)
+
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        logging.debug('FAKE_REST_SERVER:request:' + (format % args))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Local Bitvavo and Cryptowatch REST simulator.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--markets', nargs='+', default=['BTC-EUR', 'ETH-EUR'])
+    parser.add_argument('--price-paths', default=None, help='json file of market => list of prices')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds, median for lognormal')
+    parser.add_argument('--latency-distribution', default=FakeRestServer.LATENCY_FIXED, choices=[
+        FakeRestServer.LATENCY_FIXED,
+        FakeRestServer.LATENCY_UNIFORM,
+        FakeRestServer.LATENCY_EXPONENTIAL,
+        FakeRestServer.LATENCY_LOGNORMAL
+    ])
+    parser.add_argument('--rate-limit', type=int, default=None, help='requests per window before answering 429')
+    parser.add_argument('--rate-limit-ratio', type=float, default=0.0, help='share of requests answered by 429')
+    parser.add_argument('--timeout-ratio', type=float, default=0.0, help='share of requests answered after --timeout-seconds')
+    parser.add_argument('--timeout-seconds', type=float, default=30.0)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    price_paths = None
+
+    if args.price_paths is not None:
+        with open(args.price_paths, 'r') as fp:
+            price_paths = json.load(fp)
+
+    fake_server = FakeRestServer(
+        host=args.host,
+        port=args.port,
+        price_paths=price_paths,
+        feed=PriceFeed(markets=args.markets, seed=args.seed),
+        latency=args.latency,
+        latency_distribution=args.latency_distribution,
+        rate_limit=args.rate_limit,
+        rate_limit_ratio=args.rate_limit_ratio,
+        timeout_ratio=args.timeout_ratio,
+        timeout_seconds=args.timeout_seconds,
+        seed=args.seed
+    ).start()
+
+    print('BITVAVO_REST_URL=' + fake_server.get_bitvavo_url())
+    print('CRYPTOWATCH_URL=' + fake_server.get_cryptowatch_url())
+
+    try:
+        fake_server._thread.join()
+    except KeyboardInterrupt:
+        fake_server.stop()
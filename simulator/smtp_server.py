@@ -0,0 +1,155 @@
+import argparse
+import logging
+import socketserver
+import threading
+import time
+
+
+class FakeSmtpServer(object):
+    """
+    Local plain text SMTP server accepting any login, counts connections and logins and keeps received messages.
+    Connections are dropped after max_messages per connection, like mail providers limiting a session
+    """
+    host: str = '127.0.0.1'
+    port: int = 0
+    max_messages: int = None
+    latency: float = 0.0
+
+    connections: int = 0
+    logins: int = 0
+    messages: list = None
+
+    _server: socketserver.ThreadingTCPServer = None
+    _thread: threading.Thread = None
+    _lock: threading.Lock = None
+
+    def __init__(self, **kwargs):
+        self.messages = []
+        self._lock = threading.Lock()
+
+        for k, v in kwargs.items():
+            self.__setattr__(k, v)
+
+    def start(self):
+        server = self
+
+        class Handler(FakeSmtpRequestHandler):
+            fake_server = server
+
+        self._server = socketserver.ThreadingTCPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+        logging.info('FAKE_SMTP_SERVER:start:LISTENING:' + self.host + ':' + str(self.get_port()))
+
+        return self
+
+    def stop(self):
+        if self._server is None:
+            return
+
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+
+    def get_port(self):
+        return self._server.server_address[1]
+
+    def count(self, attribute: str):
+        with self._lock:
+            self.__setattr__(attribute, getattr(self, attribute) + 1)
+
+    def receive(self, mail_from: str, rcpt_to: list, data: str):
+        with self._lock:
+            self.messages.append((mail_from, rcpt_to, data))
+
+
+class FakeSmtpRequestHandler(socketserver.StreamRequestHandler):
+    fake_server: FakeSmtpServer = None
+
+    def reply(self, line: str):
+        self.wfile.write((line + '\r\n').encode('utf-8'))
+
+    def handle(self):
+        server = self.fake_server
+        server.count('connections')
+
+        self.reply('220 localhost fake smtp')
+
+        mail_from = None
+        rcpt_to = []
+        messages = 0
+
+        while True:
+            line = self.rfile.readline()
+
+            if not line:
+                return
+
+            command = line.decode('utf-8').rstrip('\r\n')
+            verb = command.split(' ')[0].upper()
+
+            if verb in ('EHLO', 'HELO'):
+                self.wfile.write(b'250-localhost\r\n250 AUTH PLAIN LOGIN\r\n')
+            elif verb == 'AUTH':
+                server.count('logins')
+                self.reply('235 2.7.0 Authentication successful')
+            elif verb == 'MAIL':
+                mail_from = command[10:]
+                rcpt_to = []
+                self.reply('250 OK')
+            elif verb == 'RCPT':
+                rcpt_to.append(command[8:])
+                self.reply('250 OK')
+            elif verb == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+
+                data = []
+
+                while True:
+                    data_line = self.rfile.readline().decode('utf-8')
+
+                    if data_line in ('.\r\n', '.\n', ''):
+                        break
+
+                    data.append(data_line)
+
+                time.sleep(server.latency)
+                server.receive(mail_from, rcpt_to, ''.join(data))
+                messages += 1
+
+                self.reply('250 OK queued')
+
+                if server.max_messages is not None and messages >= server.max_messages:
+                    # session limit of the provider, connection is closed without QUIT
+                    return
+            elif verb in ('RSET', 'NOOP'):
+                self.reply('250 OK')
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+
+                return
+            else:
+                self.reply('502 Command not implemented')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Local plain text SMTP server accepting any login.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8025)
+    parser.add_argument('--max-messages', type=int, default=None, help='messages per connection before closing it')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    fake_server = FakeSmtpServer(host=args.host, port=args.port, max_messages=args.max_messages).start()
+
+    print('SMTP_SERVER_URI=' + args.host)
+    print('SMTP_SERVER_PORT=' + str(fake_server.get_port()))
+    print('SMTP_SSL=0')
+
+    try:
+        fake_server._thread.join()
+    except KeyboardInterrupt:
+        fake_server.stop()
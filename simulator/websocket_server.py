@@ -0,0 +1,265 @@
+import base64
+import hashlib
+import logging
+import socket
+import struct
+import threading
+import time
+
+import simplejson as json
+
+
+class FakeWebsocketServer(object):
+    """
+    Local stand-in for the Bitvavo websocket, replays recorded ticker events of subscribed markets.
+    Replay starts as soon as all expected markets (or any market, if not set) are subscribed.
+    """
+    GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+    OPCODE_TEXT = 0x1
+    OPCODE_CLOSE = 0x8
+    OPCODE_PING = 0x9
+    OPCODE_PONG = 0xA
+
+    host: str = '127.0.0.1'
+    port: int = 0
+    ticks: list = None
+    ticks_per_second: float = None
+    expected_markets: set = None
+
+    ticks_sent: int = 0
+    subscribed_markets: set = None
+    received_messages: list = None
+
+    _socket: socket.socket = None
+    _thread: threading.Thread = None
+    _replayed: threading.Event = None
+    _subscribed: threading.Event = None
+    _stopped: threading.Event = None
+    _lock: threading.Lock = None
+
+    def __init__(self, **kwargs):
+        self.ticks = []
+        self.subscribed_markets = set()
+        self.received_messages = []
+        self._replayed = threading.Event()
+        self._subscribed = threading.Event()
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+
+        for k, v in kwargs.items():
+            self.__setattr__(k, v)
+
+    @classmethod
+    def load_ticks(cls, file_path: str):
+        """
+        Load recorded ticker events, one json object per line
+        :param file_path:
+        :return:
+        """
+        with open(file_path, 'r') as fp:
+            return [json.loads(line) for line in fp if line.strip()]
+
+    def get_url(self):
+        return 'ws://' + self.host + ':' + str(self.port) + '/'
+
+    def start(self):
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind((self.host, self.port))
+        self._socket.listen(5)
+        self._socket.settimeout(0.2)
+        self.port = self._socket.getsockname()[1]
+
+        self._thread = threading.Thread(target=self._accept, daemon=True)
+        self._thread.start()
+
+        return self
+
+    def stop(self):
+        self._stopped.set()
+
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+
+        if self._socket is not None:
+            self._socket.close()
+
+    def wait_replayed(self, timeout: float = None):
+        return self._replayed.wait(timeout)
+
+    def _accept(self):
+        while not self._stopped.is_set():
+            try:
+                conn, address = self._socket.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn: socket.socket):
+        try:
+            self._handshake(conn)
+        except (OSError, ValueError) as e:
+            logging.warning('FAKE_WEBSOCKET_SERVER:handshake:FAILED:' + str(e))
+            conn.close()
+
+            return
+
+        closed = threading.Event()
+
+        threading.Thread(target=self._replay, args=(conn, closed), daemon=True).start()
+
+        try:
+            while not self._stopped.is_set():
+                opcode, payload = self._read_frame(conn)
+
+                if opcode == self.OPCODE_CLOSE:
+                    self._send_frame(conn, self.OPCODE_CLOSE, payload[:2])
+                    break
+
+                if opcode == self.OPCODE_PING:
+                    self._send_frame(conn, self.OPCODE_PONG, payload)
+                    continue
+
+                if opcode == self.OPCODE_TEXT:
+                    self._handle_message(conn, json.loads(payload.decode('utf-8')))
+        except (OSError, ConnectionError, ValueError):
+            pass
+        finally:
+            closed.set()
+            conn.close()
+
+    def _handshake(self, conn: socket.socket):
+        request = b''
+
+        while b'\r\n\r\n' not in request:
+            chunk = conn.recv(4096)
+
+            if not chunk:
+                raise ValueError('Connection closed during handshake.')
+
+            request += chunk
+
+        key = None
+
+        for line in request.decode('latin-1').split('\r\n'):
+            if line.lower().startswith('sec-websocket-key:'):
+                key = line.split(':', 1)[1].strip()
+
+        if key is None:
+            raise ValueError('No websocket key.')
+
+        accept = base64.b64encode(hashlib.sha1((key + self.GUID).encode('latin-1')).digest()).decode('latin-1')
+
+        conn.sendall((
+            'HTTP/1.1 101 Switching Protocols\r\n'
+            'Upgrade: websocket\r\n'
+            'Connection: Upgrade\r\n'
+            'Sec-WebSocket-Accept: ' + accept + '\r\n\r\n'
+        ).encode('latin-1'))
+
+    def _handle_message(self, conn: socket.socket, message: dict):
+        self.received_messages.append(message)
+
+        if message.get('action') not in ['subscribe', 'unsubscribe']:
+            return
+
+        markets = set()
+
+        for channel in message.get('channels', []):
+            if channel.get('name') == 'ticker':
+                markets.update(channel.get('markets', []))
+
+        with self._lock:
+            if message['action'] == 'subscribe':
+                self.subscribed_markets.update(markets)
+            else:
+                self.subscribed_markets.difference_update(markets)
+
+            subscriptions = sorted(self.subscribed_markets)
+
+        self._send_json(conn, {'event': message['action'] + 'd', 'subscriptions': {'ticker': subscriptions}})
+
+        if message['action'] == 'subscribe' and set(self.expected_markets or []).issubset(subscriptions):
+            self._subscribed.set()
+
+    def _replay(self, conn: socket.socket, closed: threading.Event):
+        while not self._subscribed.wait(0.1):
+            if closed.is_set() or self._stopped.is_set():
+                return
+
+        delay = 1 / self.ticks_per_second if self.ticks_per_second else 0
+
+        try:
+            for tick in self.ticks:
+                if closed.is_set() or self._stopped.is_set():
+                    break
+
+                with self._lock:
+                    subscribed = tick.get('market') in self.subscribed_markets
+
+                if not subscribed:
+                    continue
+
+                self._send_json(conn, dict(tick, event='ticker'))
+                self.ticks_sent += 1
+
+                if delay:
+                    time.sleep(delay)
+        except OSError:
+            pass
+
+        self._replayed.set()
+
+    def _send_json(self, conn: socket.socket, message: dict):
+        self._send_frame(conn, self.OPCODE_TEXT, json.dumps(message).encode('utf-8'))
+
+    def _send_frame(self, conn: socket.socket, opcode: int, payload: bytes):
+        header = bytes([0x80 | opcode])
+        length = len(payload)
+
+        if length < 126:
+            header += bytes([length])
+        elif length < 65536:
+            header += bytes([126]) + struct.pack('!H', length)
+        else:
+            header += bytes([127]) + struct.pack('!Q', length)
+
+        with self._lock:
+            conn.sendall(header + payload)
+
+    def _read_frame(self, conn: socket.socket):
+        first, second = self._recv_exactly(conn, 2)
+        opcode = first & 0x0F
+        masked = second & 0x80
+        length = second & 0x7F
+
+        if length == 126:
+            length = struct.unpack('!H', self._recv_exactly(conn, 2))[0]
+        elif length == 127:
+            length = struct.unpack('!Q', self._recv_exactly(conn, 8))[0]
+
+        mask = self._recv_exactly(conn, 4) if masked else None
+        payload = self._recv_exactly(conn, length)
+
+        if mask is not None:
+            payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+
+        return opcode, payload
+
+    @classmethod
+    def _recv_exactly(cls, conn: socket.socket, length: int):
+        data = b''
+
+        while len(data) < length:
+            chunk = conn.recv(length - len(data))
+
+            if not chunk:
+                raise ConnectionError('Connection closed.')
+
+            data += chunk
+
+        return data
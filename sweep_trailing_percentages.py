@@ -0,0 +1,57 @@
+import argparse
+import datetime
+import os
+import sys
+import time
+from decimal import Decimal
+
+from models.Backtest import PriceSeries
+from models.ParameterSweep import ParameterSweep
+import main
+
+
+def get_file(s):
+    """
+    :param s: MARKET=file
+    :return: market and file path
+    """
+    market, file_path = s.split('=', 1)
+
+    return market, file_path
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Backtest a grid of trailing percentages x markets x start dates on all cores and rank them.')
+    parser.add_argument('files', type=get_file, nargs='+', help='MARKET=file per market, csv or candles json like backtest.py')
+    parser.add_argument('--from', dest='low', type=Decimal, default=Decimal('0.8'))
+    parser.add_argument('--to', dest='high', type=Decimal, default=Decimal('0.99'))
+    parser.add_argument('--step', type=Decimal, default=Decimal('0.005'))
+    parser.add_argument('--starts', type=datetime.datetime.fromisoformat, nargs='+', default=[None], help='alerts set at the first price from, ISO datetimes')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--top', type=int, default=5, help='rows printed per market')
+    parser.add_argument('--output', default=os.environ.get('SWEEP_RESULTS_FILE'), help='ranked results csv, suggested by create_new_alert.py')
+    args = parser.parse_args()
+
+    sweep = ParameterSweep(
+        series=[PriceSeries.load(file_path, market) for market, file_path in args.files],
+        trailing_percentages=ParameterSweep.get_trailing_percentages(args.low, args.high, args.step),
+        starts=args.starts,
+        workers=args.workers
+    )
+
+    started = time.perf_counter()
+    rows = ParameterSweep.rank(sweep.run())
+
+    print(
+        '%d backtests in %.2fs' % (sum(row['runs'] for row in rows if row['market'] == ParameterSweep.MARKET_ALL), time.perf_counter() - started),
+        file=sys.stderr
+    )
+
+    for row in rows:
+        if row['rank'] <= args.top:
+            print('%3d %-10s %s  profit %8.4f  max drawdown %.4f  hit %.2f  runs %d' % (
+                row['rank'], row['market'], row['trailing_percentage'], row['mean_profit'], row['mean_max_drawdown'], row['hit_ratio'], row['runs']
+            ))
+
+    if args.output:
+        ParameterSweep.write_csv(rows, args.output)
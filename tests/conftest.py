@@ -1,9 +1,146 @@
+import datetime
+import random
+from decimal import Decimal
+
 import pytest
 
+from models.Alert import Alert
+from models.AlertHandler import AlertHandler
+from models.clients.Bitvavo import BitvavoClient
+from models.clients.HttpSession import HttpSession
+from models.clients.RateLimiter import RateLimiter
+from simulator.rest_server import FakeRestServer
+
+MARKET = 'ETH-EUR'
+MARKETS = ['ETH-EUR', 'BTC-EUR', 'ADA-EUR']
+
 
 @pytest.fixture
 def bitvavo_credentials():
     return {
         'bitvavo_access_key': '34webnghjyu645etrfghfjyu5terwfsdsdffdsfdasq2345q34wetsdfxfgawetf',
         'bitvavo-access-signature': '7ac3ece85a99055fd2d46d9979f337c399e290265f0411473155771043faa138'
-    }
\ No newline at end of file
+    }
+
+@pytest.fixture(autouse=True)
+def rate_limiter():
+    """
+    Rate limit budget is process wide, every test starts with the full budget
+    """
+    RateLimiter.reset()
+
+    yield RateLimiter
+
+    RateLimiter.reset()
+
+
+@pytest.fixture
+def create_alert():
+    """
+    Active alert of ETH-EUR trailing by 0.9, updated now, attributes overridden by keyword
+    """
+    def create(price='1000', **kwargs):
+        price = Decimal(price)
+        dt = kwargs.pop('dt', None) or datetime.datetime.now()
+
+        attributes = {
+            'amount': None,
+            'actions': [],
+            'dt': dt,
+            'init_dt': dt,
+            'init_price': price,
+            'market': MARKET,
+            'price': price,
+            'status': Alert.STATUS_ACTIVE,
+            'trailing_percentage': Decimal('0.9'),
+            'trailing_price': price * Decimal('0.9')
+        }
+        attributes.update(kwargs)
+
+        return Alert(**attributes)
+
+    return create
+
+
+@pytest.fixture
+def create_random_alerts(create_alert):
+    """
+    Active alerts over ETH-EUR, BTC-EUR and ADA-EUR in turn, prices around 1000 and trailing percentages of 0.80 to 0.99
+    """
+    def create(rnd: random.Random, count: int):
+        alerts = []
+
+        for idx in range(count):
+            price = Decimal(rnd.randint(90000, 110000)) / 100
+            trailing_percentage = Decimal('0.' + str(rnd.randint(80, 99)))
+
+            alerts.append(create_alert(
+                price,
+                market=MARKETS[idx % len(MARKETS)],
+                trailing_percentage=trailing_percentage,
+                trailing_price=price * trailing_percentage
+            ))
+
+        return alerts
+
+    return create
+
+
+@pytest.fixture
+def create_random_ticks():
+    """
+    Price snapshots of ETH-EUR, BTC-EUR and ADA-EUR, moving by up to 3% per tick from 1000
+    """
+    def create(rnd: random.Random, count: int):
+        prices = {market: Decimal('1000.00') for market in MARKETS}
+        ticks = []
+
+        for idx in range(count):
+            for market in MARKETS:
+                prices[market] = (prices[market] * Decimal(rnd.randint(97, 103)) / 100).quantize(Decimal('0.01'))
+
+            ticks.append(dict(prices))
+
+        return ticks
+
+    return create
+
+
+@pytest.fixture
+def create_alert_handler(tmp_path):
+    """
+    Alert handler with alerts.json in tmp_path and a ticker price of 1100 for ETH-EUR, options overridden by keyword
+    """
+    def create(**kwargs):
+        options = {
+            'alerts_file_path': str(tmp_path) + '/',
+            'alerts_file_name': 'alerts.json',
+            'new_alert_file_name': None,
+            '_client': BitvavoClient(_response_ticker_prices=[{'market': MARKET, 'price': '1100'}])
+        }
+        options.update(kwargs)
+
+        return AlertHandler(**options)
+
+    return create
+
+
+@pytest.fixture
+def close_session():
+    """
+    Keep-alive connections are process wide, every test connects to its own server
+    """
+    HttpSession.close()
+
+    yield
+
+    HttpSession.close()
+
+
+@pytest.fixture
+def rest_server(close_session):
+    server = FakeRestServer(price_paths={MARKET: ['1000', '1100', '950']}).start()
+
+    yield server
+
+    server.stop()
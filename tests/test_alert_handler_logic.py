@@ -133,3 +133,27 @@ def test_update_alerts(tmp_path):
 
     assert ah.alerts[2].status == Alert.STATUS_ACTIVE
     assert ah.alerts[2].price == ah.alerts[2]._client._response_ticker_price['price']
+
+
+def test_update_alerts_by_shared_ticker_prices(create_alert):
+    market = 'ETH-EUR'
+
+    ah = AlertHandler(
+        alerts=[create_alert('1000'), create_alert('1200')],
+        _client=BitvavoClient(
+            _response_ticker_prices=[
+                {"market": market, "price": "1100"},
+                {"market": "BTC-EUR", "price": "30000"}
+            ]
+        )
+    )
+
+    ah.update_alerts()
+
+    assert ah._ticker_prices == {market: Decimal('1100'), 'BTC-EUR': Decimal('30000')}
+
+    assert ah.alerts[0].price == Decimal('1100')
+    assert ah.alerts[0].trailing_price == Decimal('990.0')
+
+    assert ah.alerts[1].price == Decimal('1100')
+    assert ah.alerts[1].trailing_price == Decimal('1080.0')
@@ -45,3 +45,44 @@ def test_create_alert_by_params(tmp_path):
     assert alerts['market'] == market
     assert alerts['price'] == price
     assert alerts['trailing_percentage'] == alert_trailing_percentage
+
+
+def test_create_alert_by_suggested_trailing_percentage(tmp_path, monkeypatch):
+    market = 'ADA-EUR'
+    sweep_results_file = tmp_path / 'sweep.csv'
+    sweep_results_file.write_text(
+        'rank,market,trailing_percentage,runs,hit_ratio,mean_profit,mean_max_drawdown,mean_ticks\n'
+        '1,ALL,0.9,1,1,0,0,1\n'
+        '1,ADA-EUR,0.93,1,1,0,0,1\n'
+    )
+    monkeypatch.setattr('builtins.input', lambda: '')
+
+    ca = CreateAlert(
+        market_selection_type='2',
+        market=market,
+        actions_selection='1',
+        init_price_type='2',
+        file_name='new_alert.json',
+        alerts_file_path=str(tmp_path) + '/',
+        sweep_results_file=str(sweep_results_file),
+        _client=BitvavoClient(
+            market=market,
+            _response_ticker_price={
+                "market": market,
+                "price": Decimal('1.004')
+            }
+        )
+    )
+    ca.add_by_console()
+
+    assert ca.alert.trailing_percentage == Decimal('0.93')
+
+
+def test_options_by_argv():
+    assert CreateAlert.get_options_by_argv([]) == {}
+    assert CreateAlert.get_options_by_argv(['0.9', '1', 'ADA-EUR', '3']) == {
+        'alert_trailing_percentage': Decimal('0.9'),
+        'market_selection_type': '1',
+        'market': 'ADA-EUR',
+        'actions_selection': '3'
+    }
@@ -0,0 +1,75 @@
+import os
+import subprocess
+import sys
+from decimal import Decimal
+
+import pytest
+
+from models.Alert import Alert
+from models.stores.JsonAlertStore import JsonAlertStore
+from simulator.rest_server import FakeRestServer
+
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = (
+    'import runpy, sys\n'
+    'runpy.run_path("handle_alerts.py", run_name="__main__")\n'
+    'print("\\n".join(sorted(sys.modules)))\n'
+)
+
+
+@pytest.fixture
+def run_handle_alerts(tmp_path, create_alert):
+    servers = []
+
+    def run(price_path: list, actions: list):
+        server = FakeRestServer(price_paths={'BTC-EUR': price_path}).start()
+        servers.append(server)
+
+        JsonAlertStore(file_path=str(tmp_path) + '/', file_name='alerts.json').save_snapshot([
+            create_alert(market='BTC-EUR', amount=Decimal('0.5'), actions=actions)
+        ])
+
+        env = dict(os.environ)
+
+        for key in ['NEW_ALERTS_FILE_NAME', 'ALERTS_JOURNAL_FILE_NAME', 'ALERT_STORE', 'ALERT_ENGINE', 'HTTP_TRANSPORT',
+                    'PRICE_HISTORY_PATH', 'NOTIFICATION_OUTBOX_PATH', 'METRICS_FILE']:
+            env.pop(key, None)
+
+        env.update({
+            'APIKEY': 'test',
+            'APISECRET': 'test',
+            'ALERTS_FILE_PATH': str(tmp_path) + '/',
+            'ALERTS_FILE_NAME': 'alerts.json',
+            'BITVAVO_REST_URL': server.get_bitvavo_url(),
+            'CRYPTOWATCH_URL': server.get_cryptowatch_url(),
+            'GAP_BACKFILL_SECONDS': '0',
+            'LOGGING_LEVEL': 'ERROR'
+        })
+
+        r = subprocess.run([sys.executable, '-c', PROBE], cwd=ROOT_PATH, env=env, check=True, capture_output=True, text=True)
+
+        return server, r.stdout.split()
+
+    yield run
+
+    for server in servers:
+        server.stop()
+
+
+def test_tick_without_hits_loads_no_order_or_mail_code(run_handle_alerts):
+    server, modules = run_handle_alerts(['1000'], [Alert.ACTION_SELL_ASSET])
+
+    assert server.requests
+    assert server.orders == []
+
+    for module in ['requests', 'python_bitvavo_api', 'smtplib', 'http.server', 'concurrent.futures']:
+        assert module not in modules
+
+
+def test_tick_with_hit_places_order(run_handle_alerts):
+    server, modules = run_handle_alerts(['800'], [Alert.ACTION_SELL_ASSET])
+
+    assert len(server.orders) == 1
+    assert server.orders[0][1]['market'] == 'BTC-EUR'
+    assert 'python_bitvavo_api' in modules
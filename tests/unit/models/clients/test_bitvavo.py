@@ -32,3 +32,20 @@ def test_get_ticker_price(bitvavo_credentials):
     )
 
     assert b_client.get_ticker_price() == Decimal("5003.2")
+
+
+def test_get_ticker_prices(bitvavo_credentials):
+    b_client = BitvavoClient(
+        api_key=bitvavo_credentials['bitvavo_access_key'],
+        api_secret=bitvavo_credentials['bitvavo-access-signature'],
+        _response_ticker_prices=[
+            {"market": "BTC-EUR", "price": "5003.2"},
+            {"market": "ETH-EUR", "price": "1500.1"},
+            {"market": "ADA-EUR"}
+        ]
+    )
+
+    assert b_client.get_ticker_prices() == {
+        "BTC-EUR": Decimal("5003.2"),
+        "ETH-EUR": Decimal("1500.1")
+    }
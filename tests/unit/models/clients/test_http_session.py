@@ -0,0 +1,127 @@
+import http.client
+import socket
+import threading
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import simplejson as json
+
+from models.Metrics import Metrics
+from models.clients.Bitvavo import BitvavoClient
+from models.clients.HttpSession import HttpSession, StdlibSession
+
+
+class TickerPriceHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    connections = set()
+    posts = 0
+
+    def do_GET(self):
+        TickerPriceHandler.connections.add(self.client_address)
+
+        body = json.dumps({'market': 'BTC-EUR', 'price': '5003.2'}).encode('utf-8')
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length') or 0))
+
+        # order read, the connection is dropped before the response
+        TickerPriceHandler.posts += 1
+        self.close_connection = True
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def ticker_server():
+    TickerPriceHandler.connections = set()
+    TickerPriceHandler.posts = 0
+    server = ThreadingHTTPServer(('127.0.0.1', 0), TickerPriceHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    HttpSession.close()
+
+    yield 'http://127.0.0.1:' + str(server.server_address[1])
+
+    HttpSession.close()
+    server.shutdown()
+    server.server_close()
+
+
+def test_get_session_is_shared():
+    assert HttpSession.get_session() is HttpSession.get_session()
+
+
+def test_get_timeout(monkeypatch):
+    monkeypatch.setenv('HTTP_CONNECT_TIMEOUT', '1.5')
+    monkeypatch.setenv('HTTP_READ_TIMEOUT', '4')
+
+    assert HttpSession.get_timeout() == (1.5, 4.0)
+
+
+def test_clients_reuse_connection(ticker_server):
+    for idx in range(3):
+        b_client = BitvavoClient(api_key='', api_secret='', market='BTC-EUR')
+        b_client.base = ticker_server
+
+        assert b_client.get_ticker_price() == Decimal('5003.2')
+
+    assert len(TickerPriceHandler.connections) == 1
+
+
+def test_request_records_metrics(ticker_server):
+    Metrics.reset()
+
+    HttpSession.request('GET', ticker_server + '/v2/ticker/price?market=BTC-EUR')
+
+    endpoint = ticker_server.replace('http://', '') + '/v2/ticker/price'
+
+    assert Metrics.get_value('api_requests_total', endpoint=endpoint, method='GET', status='200') == 1
+    assert Metrics.get_value('api_request_duration_seconds', endpoint=endpoint, method='GET') == 1
+
+
+def test_stdlib_transport_reuses_connection(ticker_server, monkeypatch):
+    monkeypatch.setenv('HTTP_TRANSPORT', HttpSession.TRANSPORT_STDLIB)
+
+    assert isinstance(HttpSession.get_session(), StdlibSession)
+
+    for idx in range(3):
+        r = HttpSession.request('GET', ticker_server + '/v2/ticker/price?market=BTC-EUR')
+
+        assert r.status_code == 200
+        assert r.json() == {'market': 'BTC-EUR', 'price': '5003.2'}
+
+    assert len(TickerPriceHandler.connections) == 1
+
+
+def test_stdlib_transport_reconnects_closed_connection(ticker_server, monkeypatch):
+    monkeypatch.setenv('HTTP_TRANSPORT', HttpSession.TRANSPORT_STDLIB)
+
+    HttpSession.request('GET', ticker_server + '/v2/ticker/price')
+
+    # closed while idle, like by a server after its keep-alive timeout
+    for idle in HttpSession.get_session()._idle.values():
+        for connection in idle:
+            connection.sock.shutdown(socket.SHUT_RDWR)
+
+    assert HttpSession.request('GET', ticker_server + '/v2/ticker/price').status_code == 200
+    assert len(TickerPriceHandler.connections) == 2
+
+
+def test_stdlib_transport_does_not_resend_post_read_by_server(ticker_server, monkeypatch):
+    monkeypatch.setenv('HTTP_TRANSPORT', HttpSession.TRANSPORT_STDLIB)
+
+    HttpSession.request('GET', ticker_server + '/v2/ticker/price')
+
+    with pytest.raises(http.client.RemoteDisconnected):
+        HttpSession.request('POST', ticker_server + '/v2/order', json={'market': 'BTC-EUR', 'amount': '1'})
+
+    assert TickerPriceHandler.posts == 1
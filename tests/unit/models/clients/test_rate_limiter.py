@@ -0,0 +1,91 @@
+import time
+
+import pytest
+
+from models.Metrics import Metrics
+from models.clients.Bitvavo import BitvavoClient
+from models.clients.RateLimiter import RateLimiter
+
+market = 'ETH-EUR'
+
+
+def get_client(server):
+    return BitvavoClient(api_key='key', api_secret='secret', rest_url=server.get_bitvavo_url(), market=market)
+
+
+def test_market_data_leaves_reserve_for_orders(monkeypatch):
+    monkeypatch.setenv('RATE_LIMIT', '10')
+    monkeypatch.setenv('RATE_LIMIT_ORDER_RESERVE', '5')
+    monkeypatch.setenv('RATE_LIMIT_ORDER_MAX_WAIT', '0')
+    Metrics.reset()
+
+    assert [RateLimiter.acquire(1, RateLimiter.PRIORITY_MARKET_DATA) for idx in range(6)] == [True] * 5 + [False]
+    assert RateLimiter.acquire(RateLimiter.get_weight('/balance?symbol=ETH'), RateLimiter.PRIORITY_ORDER) is True
+    assert RateLimiter.acquire(1, RateLimiter.PRIORITY_ORDER) is False
+
+    assert Metrics.get_value('rate_limit_remaining') == 0
+    assert Metrics.get_value('rate_limit_weight_total', priority=RateLimiter.PRIORITY_ORDER) == 5
+    assert Metrics.get_value('rate_limit_throttled_total', priority=RateLimiter.PRIORITY_MARKET_DATA) == 1
+
+
+def test_priority_and_weight_by_endpoint():
+    assert RateLimiter.get_priority('/order') == RateLimiter.PRIORITY_ORDER
+    assert RateLimiter.get_priority('/balance?symbol=ETH') == RateLimiter.PRIORITY_ORDER
+    assert RateLimiter.get_priority('/ticker/price') == RateLimiter.PRIORITY_MARKET_DATA
+    assert RateLimiter.get_weight('/balance?symbol=ETH') == 5
+    assert RateLimiter.get_weight('/ticker/price?market=ETH-EUR') == 1
+
+
+def test_backoff_is_exponential_with_jitter(monkeypatch):
+    monkeypatch.setenv('RATE_LIMIT_BACKOFF_SECONDS', '10')
+
+    for failures, backoff in [(1, 10), (2, 20), (3, 40)]:
+        now = time.time()
+        RateLimiter.update(429, {}, {'errorCode': 105})
+
+        blocked_until = RateLimiter.get_budget()[2]
+
+        assert now + backoff * 0.5 <= blocked_until <= time.time() + backoff * 1.5
+
+        RateLimiter._blocked_until = 0.0
+
+    RateLimiter.update(200, {}, {})
+
+    assert RateLimiter._failures == 0
+
+
+def test_ban_blocks_until_its_end():
+    banned_until = time.time() + 600
+
+    RateLimiter.update(403, {}, {'errorCode': 105, 'error': 'The account is temporarily banned until at ' + str(int(banned_until * 1000)) + '.'})
+
+    assert RateLimiter.get_budget()[2] == pytest.approx(banned_until, abs=0.01)
+    assert RateLimiter.acquire(1, RateLimiter.PRIORITY_MARKET_DATA) is False
+
+
+def test_order_waits_for_budget_reset(rest_server):
+    rest_server.rate_limit = 1
+    rest_server.rate_limit_window = 0.3
+
+    client = get_client(rest_server)
+
+    assert 'orderId' in client.place_order(BitvavoClient.SIDE_SELL, BitvavoClient.ORDER_TYPE, '1')
+
+    # market data does not wait for the reset of the budget, the order does
+    assert client.tickerPrice({}) == {'error': BitvavoClient.ERROR_RATE_LIMIT_BUDGET}
+    assert 'orderId' in client.place_order(BitvavoClient.SIDE_SELL, BitvavoClient.ORDER_TYPE, '1')
+    assert [request[3] for request in rest_server.requests] == [200, 200]
+
+
+def test_order_is_retried_after_backoff(rest_server, monkeypatch):
+    monkeypatch.setenv('RATE_LIMIT_BACKOFF_SECONDS', '0.01')
+    rest_server.rate_limit_ratio = 1.0
+    rest_server.rate_limit_window = 0.05
+
+    client = get_client(rest_server)
+    response = client.place_order(BitvavoClient.SIDE_SELL, BitvavoClient.ORDER_TYPE, '1')
+
+    assert response['errorCode'] == RateLimiter.ERROR_CODE_BANNED
+    assert [request[3] for request in rest_server.requests] == [429] * (BitvavoClient.RATE_LIMIT_RETRIES + 1)
+    # the ban of the last response blocks until the end of the window
+    assert RateLimiter.get_budget()[2] >= RateLimiter.get_banned_until(response) > 0
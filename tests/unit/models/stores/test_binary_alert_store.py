@@ -0,0 +1,115 @@
+from decimal import Decimal
+
+from models.Alert import Alert
+from models.AlertHandler import AlertHandler
+from models.stores.BinaryAlertStore import BinaryAlertStore
+from models.stores.JsonAlertStore import JsonAlertStore
+
+BINARY_OPTIONS = {'alert_store': AlertHandler.ALERT_STORE_BINARY}
+
+
+def get_store(d):
+    return BinaryAlertStore(file_path=str(d) + '/', file_name='alerts.json', binary_file_name='alerts.bin')
+
+
+def test_import_and_export_json(tmp_path, create_alert):
+    alerts = [create_alert('1000'), create_alert('1234.56789', status=Alert.STATUS_HIT)]
+    JsonAlertStore(file_path=str(tmp_path) + '/', file_name='alerts.json').save_snapshot(alerts)
+
+    loaded = get_store(tmp_path).load()
+
+    assert len(loaded) == 1
+    assert loaded[0].attributes() == alerts[0].attributes()
+
+    (tmp_path / 'alerts.json').unlink()
+
+    assert get_store(tmp_path).export_json() == 2
+    assert [alert.attributes() for alert in JsonAlertStore(file_path=str(tmp_path) + '/', file_name='alerts.json').load()] == [alert.attributes() for alert in alerts]
+
+
+def test_save_alerts_round_trip(tmp_path, create_alert, create_alert_handler):
+    actions = [Alert.ACTION_SEND_EMAIL, Alert.ACTION_SELL_ASSET]
+
+    ah = create_alert_handler(**BINARY_OPTIONS, alerts=[create_alert('1000', actions=actions), create_alert('1200', actions=actions)])
+    ah.save_alerts()
+
+    ah.update_alerts()
+    ah.save_alerts()
+
+    ah_load = create_alert_handler(**BINARY_OPTIONS)
+
+    assert [alert._id for alert in ah_load.alerts] == [0, 1]
+    assert [alert.price for alert in ah_load.alerts] == [Decimal('1100'), Decimal('1100')]
+    assert [alert.trailing_price for alert in ah_load.alerts] == [Decimal('990.0'), Decimal('1080.0')]
+    assert ah_load.alerts[0].actions == [Alert.ACTION_SEND_EMAIL, Alert.ACTION_SELL_ASSET]
+
+
+def test_uid_does_not_depend_on_action_order(tmp_path, create_alert, create_alert_handler):
+    alert = create_alert('1000', actions=[Alert.ACTION_SELL_ASSET, Alert.ACTION_SEND_EMAIL])
+    uid = alert.get_uid()
+
+    create_alert_handler(**BINARY_OPTIONS, alerts=[alert]).save_alerts()
+
+    loaded = create_alert_handler(**BINARY_OPTIONS).alerts[0]
+
+    # reordered by the bitmask of the binary store, the same alert to a shard
+    assert loaded.actions == [Alert.ACTION_SEND_EMAIL, Alert.ACTION_SELL_ASSET]
+    assert loaded.get_uid() == uid
+
+
+def test_decimals_beyond_int64_are_saved_exactly(tmp_path, create_alert):
+    alert = create_alert('1234.56789012345678901', trailing_percentage=Decimal('0.9123456789123456789'))
+    alert.trailing_price = alert.price * alert.trailing_percentage
+    alert.amount = Decimal('1E-200')
+
+    get_store(tmp_path).save([alert], {})
+
+    loaded = get_store(tmp_path).load()
+
+    assert loaded[0].attributes() == alert.attributes()
+
+    # exact trailing price replaced by one fitting int64 is dropped from the exact decimals
+    store = get_store(tmp_path)
+    alerts = store.load()
+    alerts[0].trailing_price = Decimal('1100')
+    store.save(alerts, {alerts[0]._id: {'trailing_price'}})
+
+    assert get_store(tmp_path).read() is True
+    assert [alert.attributes() for alert in get_store(tmp_path).load()] == [alerts[0].attributes()]
+    assert store._exact_decimals == ['1E-200', '1234.56789012345678901', '1234.56789012345678901']
+
+
+def test_corrupt_snapshot_raises(tmp_path, create_alert):
+    get_store(tmp_path).save([create_alert('1000')], {})
+
+    with open(tmp_path / 'alerts.bin', 'r+b') as fp:
+        fp.seek(-2, 2)
+        byte = fp.read(1)
+        fp.seek(-2, 2)
+        fp.write(bytes([byte[0] ^ 1]))
+
+    try:
+        get_store(tmp_path).load()
+        assert False
+    except ValueError as e:
+        assert 'checksum' in str(e)
+
+
+def test_remove_renumbers_ids(tmp_path, create_alert):
+    store = get_store(tmp_path)
+    alerts = [create_alert('1'), create_alert('2'), create_alert('3')]
+    store.save(alerts, {})
+
+    store.remove([alerts[1]])
+    del alerts[1]
+    store.save(alerts, {})
+
+    assert [alert._id for alert in alerts] == [0, 1]
+    assert [alert.price for alert in get_store(tmp_path).load()] == [Decimal('1'), Decimal('3')]
+
+
+def test_decimal_parts_fit_int64_and_byte():
+    assert BinaryAlertStore.get_decimal_parts(Decimal('-990.0')) == (-9900, -1)
+    assert BinaryAlertStore.get_decimal_parts(Decimal('1.23456789012345678')) == (123456789012345678, -17)
+    assert BinaryAlertStore.get_decimal_parts(Decimal('1.23456789012345678901')) is None
+    assert BinaryAlertStore.get_decimal_parts(Decimal('1E-200')) is None
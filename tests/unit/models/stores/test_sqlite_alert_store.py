@@ -0,0 +1,82 @@
+import datetime
+from decimal import Decimal
+
+from models.Alert import Alert
+from models.AlertHandler import AlertHandler
+from models.clients.Cryptowatch import CryptowatchClient
+from models.stores.JsonAlertStore import JsonAlertStore
+from models.stores.SqliteAlertStore import SqliteAlertStore
+
+market = 'ETH-EUR'
+
+SQLITE_OPTIONS = {'alerts_db_file_name': 'alerts.sqlite', 'alert_store': AlertHandler.ALERT_STORE_SQLITE}
+
+
+def test_load_only_active_alerts(tmp_path, create_alert):
+    dt = datetime.datetime(2021, 5, 1, 12, 0, 0, 1)
+
+    store = SqliteAlertStore(file_path=str(tmp_path / 'alerts.sqlite'))
+    store.import_alerts([
+        create_alert(actions=[Alert.ACTION_SEND_EMAIL], dt=dt),
+        create_alert(actions=[Alert.ACTION_SEND_EMAIL], dt=dt, status=Alert.STATUS_HIT)
+    ])
+
+    alerts = SqliteAlertStore(file_path=str(tmp_path / 'alerts.sqlite')).load()
+
+    assert len(alerts) == 1
+    assert alerts[0]._id == 1
+    assert alerts[0].status == Alert.STATUS_ACTIVE
+    assert alerts[0].price == Decimal('1000')
+    assert alerts[0].actions == [Alert.ACTION_SEND_EMAIL]
+    assert alerts[0].dt == dt
+
+
+def test_save_alerts_updates_changed_attributes(tmp_path, create_alert, create_alert_handler):
+    ah = create_alert_handler(**SQLITE_OPTIONS, alerts=[create_alert('1000'), create_alert('1200')])
+    ah.save_alerts()
+
+    ah.update_alerts()
+    ah.save_alerts()
+
+    ah_load = create_alert_handler(**SQLITE_OPTIONS)
+
+    assert [alert.price for alert in ah_load.alerts] == [Decimal('1100'), Decimal('1100')]
+    assert [alert.trailing_price for alert in ah_load.alerts] == [Decimal('990.0'), Decimal('1080.0')]
+
+
+def test_load_new_alerts_added_by_other_store(tmp_path, create_alert, create_alert_handler):
+    ah = create_alert_handler(**SQLITE_OPTIONS, alerts=[create_alert('1000')])
+    ah.save_alerts()
+
+    assert ah.load_new_alerts() == 0
+
+    SqliteAlertStore(file_path=str(tmp_path / 'alerts.sqlite')).add(create_alert('1500'))
+
+    assert ah.load_new_alerts() == 1
+    assert ah.alerts[1].price == Decimal('1500')
+    assert ah.load_new_alerts() == 0
+
+
+def test_import_alerts_of_json_store(tmp_path, create_alert, create_alert_handler):
+    json_store = JsonAlertStore(file_path=str(tmp_path) + '/', file_name='alerts.json')
+    json_store.save_snapshot([create_alert('1000'), create_alert('2000', status=Alert.STATUS_HIT)])
+
+    SqliteAlertStore(file_path=str(tmp_path / 'alerts.sqlite')).import_alerts(json_store.load())
+
+    ah = create_alert_handler(**SQLITE_OPTIONS)
+
+    assert len(ah.alerts) == 1
+    assert ah.alerts[0].price == Decimal('1000')
+
+
+def test_save_alerts_deletes_archived_alerts(tmp_path, create_alert, create_alert_handler):
+    ah = create_alert_handler(**SQLITE_OPTIONS, alerts=[create_alert('1000'), create_alert('1300')], alerts_archive_path=str(tmp_path / 'archive'))
+    ah.save_alerts()
+
+    ah._backup_clients = {market: CryptowatchClient(_response_ticker_price={'result': {'price': '1100'}})}
+    ah.update_alerts()
+    ah.save_alerts()
+
+    store = SqliteAlertStore(file_path=str(tmp_path / 'alerts.sqlite'))
+
+    assert [row[0] for row in store.select('1 = 1', ())] == [1]
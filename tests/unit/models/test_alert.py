@@ -1,7 +1,9 @@
 from models.clients.Cryptowatch import CryptowatchClient
 
 import datetime
+import sys
 from decimal import Decimal
+import simplejson as json
 from faker import Faker
 
 from models.Alert import Alert
@@ -205,9 +207,9 @@ def test_update_by_client_price_increased():
     assert updated == True
 
     if old_trailing_price < alert.trailing_price:
-        assert alert.changedAttributes == ['price', 'dt']
-    else:
         assert alert.changedAttributes == ['trailing_price', 'price', 'dt']
+    else:
+        assert alert.changedAttributes == ['price', 'dt']
 
     assert Alert.STATUS_ACTIVE == alert.status
 
@@ -221,3 +223,43 @@ def test_update_by_client_price_decreased():
     assert alert.changedAttributes == ['price', 'dt']
     assert Alert.STATUS_ACTIVE == alert.status
 
+
+def test_actions_as_bitmask():
+    alert = Alert(actions=[Alert.ACTION_SELL_ASSET], market=''.join(['ETH', '-EUR']))
+
+    assert alert.actions == [Alert.ACTION_SELL_ASSET]
+    assert alert.has_action(Alert.ACTION_SELL_ASSET)
+    assert not alert.has_action(Alert.ACTION_SEND_EMAIL)
+
+    alert.actions = [Alert.ACTION_SEND_EMAIL, Alert.ACTION_SELL_ASSET]
+
+    assert alert._actions_list is None
+    assert alert.attributes()['actions'] == [Alert.ACTION_SEND_EMAIL, Alert.ACTION_SELL_ASSET]
+
+    # reordered and repeated actions are kept as set
+    alert.actions = [Alert.ACTION_SELL_ASSET, Alert.ACTION_SEND_EMAIL, Alert.ACTION_SELL_ASSET]
+
+    assert alert.actions == [Alert.ACTION_SELL_ASSET, Alert.ACTION_SEND_EMAIL, Alert.ACTION_SELL_ASSET]
+    assert alert.attributes()['actions'] == [Alert.ACTION_SELL_ASSET, Alert.ACTION_SEND_EMAIL, Alert.ACTION_SELL_ASSET]
+    assert alert.market is sys.intern('ETH-EUR')
+    assert not hasattr(alert, '__dict__')
+
+
+def test_update_by_client_unchanged():
+    alert = get_alert(status=Alert.STATUS_HIT)
+
+    updated = alert.update_by_client()
+
+    assert updated == False
+    assert alert.changedAttributes is Alert.NO_CHANGES
+
+
+def test_unknown_action_is_skipped(create_alert):
+    attributes = json.loads(json.dumps(create_alert().attributes(), default=str))
+    attributes['actions'] = ['call_me', Alert.ACTION_SELL_ASSET]
+
+    alert = Alert.get_by_dict(attributes)
+
+    assert alert.has_action(Alert.ACTION_SELL_ASSET)
+    assert not alert.has_action(Alert.ACTION_SEND_EMAIL)
+    assert alert.attributes()['actions'] == ['call_me', Alert.ACTION_SELL_ASSET]
@@ -0,0 +1,78 @@
+import datetime
+import gzip
+from decimal import Decimal
+
+import simplejson as json
+
+from models.Alert import Alert
+from models.AlertArchive import AlertArchive
+from models.clients.Cryptowatch import CryptowatchClient
+
+market = 'ETH-EUR'
+
+
+def test_save_alerts_archives_hit_alerts(tmp_path, create_alert, create_alert_handler):
+    options = {
+        'alerts_journal_file_name': 'alerts.journal',
+        'alerts_archive_path': str(tmp_path / 'archive'),
+        '_backup_clients': {market: CryptowatchClient(_response_ticker_price={'result': {'price': '1100'}})}
+    }
+
+    ah = create_alert_handler(**options, alerts=[create_alert('1000'), create_alert('1300')])
+    ah.save_alerts()
+
+    ah.update_alerts()
+    ah.save_alerts()
+
+    assert len(ah.alerts) == 1
+
+    with open(tmp_path / 'alerts.json', 'r') as fp:
+        assert len(json.load(fp)) == 1
+
+    ah_load = create_alert_handler(**options)
+
+    assert [alert.price for alert in ah_load.alerts] == [Decimal('1100')]
+    assert [alert._id for alert in ah_load.alerts] == [0]
+
+    archived = list(AlertArchive(file_path=str(tmp_path / 'archive')).query())
+
+    assert len(archived) == 1
+    assert archived[0].status == Alert.STATUS_HIT
+    assert archived[0].price == Decimal('1100')
+    assert archived[0].init_price == Decimal('1300')
+
+
+def test_query_archive_by_market_and_date(tmp_path, create_alert):
+    archive = AlertArchive(file_path=str(tmp_path))
+
+    other_alert = create_alert('2', status=Alert.STATUS_HIT, dt=datetime.datetime(2021, 5, 2, 1, 0, 0, 1))
+    other_alert.market = 'ADA-EUR'
+
+    archive.append([
+        create_alert('1', status=Alert.STATUS_HIT, dt=datetime.datetime(2021, 5, 1, 1, 0, 0, 1)),
+        other_alert
+    ])
+    archive.append([create_alert('3', status=Alert.STATUS_HIT, dt=datetime.datetime(2021, 5, 2, 2, 0, 0, 1))])
+
+    assert archive.get_file_dates() == [datetime.date(2021, 5, 1), datetime.date(2021, 5, 2)]
+    assert [alert.price for alert in archive.query()] == [Decimal('1'), Decimal('2'), Decimal('3')]
+    assert [alert.price for alert in archive.query(market=market)] == [Decimal('1'), Decimal('3')]
+    assert [alert.price for alert in archive.query(date_from=datetime.date(2021, 5, 2))] == [Decimal('2'), Decimal('3')]
+    assert [alert.price for alert in archive.query(date_to=datetime.date(2021, 5, 1))] == [Decimal('1')]
+
+
+def test_query_returns_alerts_before_torn_member(tmp_path, create_alert):
+    archive = AlertArchive(file_path=str(tmp_path))
+    dt = datetime.datetime(2021, 5, 1, 1, 0, 0, 1)
+
+    archive.append([create_alert('1', status=Alert.STATUS_HIT, dt=dt)])
+    archive.append([create_alert('2', status=Alert.STATUS_HIT, dt=dt)])
+    archive.append([create_alert('4', status=Alert.STATUS_HIT, dt=dt + datetime.timedelta(days=1))])
+
+    # crash while appending a member to the first day
+    member = gzip.compress((json.dumps(create_alert('3', status=Alert.STATUS_HIT, dt=dt).attributes(), default=str) + '\n').encode('utf-8'))
+
+    with open(archive.get_file_name(dt.date()), 'ab') as fp:
+        fp.write(member[:len(member) // 2])
+
+    assert [alert.price for alert in archive.query()] == [Decimal('1'), Decimal('2'), Decimal('4')]
@@ -0,0 +1,62 @@
+from decimal import Decimal
+
+import pytest
+
+from models.Alert import Alert
+from simulator.rest_server import FakeRestServer
+
+markets = ['BTC-EUR', 'ETH-EUR', 'ADA-EUR']
+
+
+@pytest.fixture
+def create_hit_alert_handler(monkeypatch, create_alert, create_alert_handler):
+    """
+    Five alerts per market, all hit by the ticker prices, backup prices of the server
+    """
+    def create(server: FakeRestServer):
+        monkeypatch.setenv('CRYPTOWATCH_URL', server.get_cryptowatch_url())
+
+        ah = create_alert_handler(alerts=[create_alert(market=market) for market in markets for idx in range(5)])
+        ah._ticker_prices = {market: Decimal('850') for market in markets}
+
+        return ah
+
+    return create
+
+
+def test_backup_prices_are_fetched_once_per_market_concurrently(monkeypatch, close_session, create_hit_alert_handler):
+    server = FakeRestServer(price_paths={market: ['851'] for market in markets}, latency=0.2).start()
+
+    try:
+        ah = create_hit_alert_handler(server)
+        evaluated, changed, hit = ah.update_alerts_by_ticker_prices()
+    finally:
+        server.stop()
+
+    assert hit == 15
+    assert len(server.requests) == len(markets)
+    # the requests of all markets are in flight at once, not one after the other
+    assert server.max_in_flight == len(markets)
+
+    for alert in ah.alerts:
+        assert alert.status == Alert.STATUS_HIT
+        assert alert.backup_price == Decimal('851')
+
+
+def test_backup_price_timeout_does_not_confirm_hit(monkeypatch, close_session, create_hit_alert_handler):
+    server = FakeRestServer(price_paths={market: ['851'] for market in markets}, timeout_ratio=1.0, timeout_seconds=1.0).start()
+
+    try:
+        monkeypatch.setenv('BACKUP_PRICE_TIMEOUT', '0.2')
+        ah = create_hit_alert_handler(server)
+        ah.update_alerts_by_ticker_prices()
+        # the client gave up while the server has not answered yet
+        in_flight = server.in_flight
+    finally:
+        server.stop()
+
+    assert in_flight == len(markets)
+
+    for alert in ah.alerts:
+        assert alert.status == Alert.STATUS_HIT
+        assert alert.backup_price is None
@@ -0,0 +1,91 @@
+import signal
+from decimal import Decimal
+
+import pytest
+import simplejson as json
+
+from models.Alert import Alert
+from models.AlertDaemon import AlertDaemon
+from models.clients.Bitvavo import BitvavoClient
+from models.clients.Cryptowatch import CryptowatchClient
+
+market = 'ETH-EUR'
+
+
+class ScriptedBitvavoClient(BitvavoClient):
+    prices: list = None
+
+    def tickerPrice(self, options=None):
+        return [{'market': market, 'price': self.prices.pop(0)}]
+
+
+@pytest.fixture
+def create_daemon_alert_handler(create_alert, create_alert_handler):
+    """
+    Alert handler of one alert, ticker prices of the ticks by the list of prices
+    """
+    def create(prices: list):
+        return create_alert_handler(
+            new_alert_file_name='new_alert.json',
+            alerts=[create_alert('1000')],
+            _client=ScriptedBitvavoClient(prices=prices)
+        )
+
+    return create
+
+
+def test_run_refreshes_prices_per_tick(tmp_path, create_daemon_alert_handler):
+    ah = create_daemon_alert_handler(['1100', '1200', '1050'])
+
+    daemon = AlertDaemon(_alert_handler=ah, interval=0, save_interval=3600)
+    daemon.run(max_ticks=3)
+
+    assert ah.alerts[0].price == Decimal('1050')
+    assert ah.alerts[0].trailing_price == Decimal('1080.0')
+
+    with open(tmp_path / 'alerts.json', 'r') as fp:
+        alerts = json.load(fp, use_decimal=True)
+
+    assert alerts[0]['price'] == Decimal('1050')
+
+
+def test_tick_loads_new_alert(tmp_path, create_alert, create_daemon_alert_handler):
+    ah = create_daemon_alert_handler(['1100'])
+
+    new_alert = create_alert('1100', trailing_percentage=Decimal('0.8'), trailing_price=Decimal('880'))
+
+    with open(tmp_path / 'new_alert.json', 'w') as fp:
+        json.dump(new_alert.attributes(), fp, default=str)
+
+    daemon = AlertDaemon(_alert_handler=ah, interval=0, save_interval=3600)
+    daemon.tick()
+
+    assert len(ah.alerts) == 2
+    assert not (tmp_path / 'new_alert.json').exists()
+
+
+def test_stop_by_signal(tmp_path, create_daemon_alert_handler):
+    ah = create_daemon_alert_handler(['1100', '1200'])
+
+    daemon = AlertDaemon(_alert_handler=ah, interval=3600, save_interval=3600)
+    daemon.handle_signal(signal.SIGTERM, None)
+    daemon.run()
+
+    assert daemon.is_stopped()
+    assert (tmp_path / 'alerts.json').exists()
+
+
+def test_hit_is_saved_before_next_save(create_alert_handler, create_daemon_alert_handler):
+    ah = create_daemon_alert_handler(['1100', '800'])
+    ah._backup_clients = {market: CryptowatchClient(_response_ticker_price={'result': {'price': '800'}})}
+
+    daemon = AlertDaemon(_alert_handler=ah, interval=0, save_interval=3600)
+    daemon.tick()
+    daemon.tick()
+
+    assert ah.alerts[0].status == Alert.STATUS_HIT
+
+    # crashed before the next save
+    ah_restarted = create_alert_handler()
+
+    assert ah_restarted.alerts[0].status == Alert.STATUS_HIT
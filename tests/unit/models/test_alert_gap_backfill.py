@@ -0,0 +1,228 @@
+import datetime
+import time
+from decimal import Decimal
+
+import pytest
+
+from models.Alert import Alert
+from models.AlertHandler import AlertHandler
+from models.clients.Bitvavo import BitvavoClient
+from simulator.rest_server import FakeRestServer
+
+markets = ['BTC-EUR', 'ETH-EUR']
+
+
+def get_candle(dt: datetime.datetime, high: str, low: str):
+    return [int(dt.timestamp() * 1000), '1000', high, low, '1000', '1']
+
+
+@pytest.fixture
+def create_backfill_alert_handler(monkeypatch, create_alert_handler):
+    """
+    Alert handler on the prices and candles of the server
+    """
+    def create(server: FakeRestServer, alerts: list, **kwargs):
+        monkeypatch.setenv('CRYPTOWATCH_URL', server.get_cryptowatch_url())
+
+        return create_alert_handler(
+            alerts=alerts,
+            _client=BitvavoClient(api_key='', api_secret='', rest_url=server.get_bitvavo_url()),
+            **kwargs
+        )
+
+    return create
+
+
+def get_candle_requests(server: FakeRestServer):
+    return [request for request in server.requests if request[2].endswith('/candles')]
+
+
+def test_candle_interval():
+    assert BitvavoClient.get_candle_interval(600) == '1m'
+    assert BitvavoClient.get_candle_interval(86400) == '1m'
+    assert BitvavoClient.get_candle_interval(86400 * 2) == '5m'
+    assert BitvavoClient.get_candle_interval(86400 * 10000) == '1d'
+
+
+def test_update_by_candles(create_alert):
+    dt = datetime.datetime.now()
+    alert = create_alert(market='BTC-EUR', dt=dt)
+
+    assert alert.update_by_candles([(0, Decimal('990'), Decimal('950'))], Decimal('1000')) is False
+    assert alert.changedAttributes == Alert.NO_CHANGES
+
+    assert alert.update_by_candles([(0, Decimal('1100'), Decimal('950')), (1, Decimal('1050'), Decimal('991'))], Decimal('1000')) is True
+    assert alert.trailing_price == Decimal('990.0')
+    assert alert.status == Alert.STATUS_ACTIVE
+    assert alert.changedAttributes == ['trailing_price']
+
+    # the low of a candle is checked against the trailing price by the candles before, not by its own high
+    alert = create_alert(market='BTC-EUR', dt=dt)
+
+    assert alert.update_by_candles([(0, Decimal('1200'), Decimal('1000')), (1, Decimal('1250'), Decimal('1070'))], Decimal('1150')) is True
+    assert alert.status == Alert.STATUS_HIT
+    assert alert.price == Decimal('1150')
+    assert alert.changedAttributes == ['trailing_price', 'price', 'dt', 'status']
+
+
+def test_startup_gap_is_backfilled_once_per_market(close_session, create_alert, create_backfill_alert_handler):
+    dt = datetime.datetime.now() - datetime.timedelta(hours=1)
+
+    server = FakeRestServer(
+        price_paths={'BTC-EUR': ['950'], 'ETH-EUR': ['1000']},
+        candles={
+            # low before the last update of the alerts is not replayed
+            'BTC-EUR': [get_candle(dt - datetime.timedelta(minutes=1), '1000', '800'), get_candle(dt + datetime.timedelta(minutes=5), '1000', '850')],
+            'ETH-EUR': [get_candle(dt - datetime.timedelta(minutes=1), '1200', '950'), get_candle(dt + datetime.timedelta(minutes=5), '1100', '950')]
+        }
+    ).start()
+
+    try:
+        ah = create_backfill_alert_handler(server, [create_alert(market=market, dt=dt) for market in markets for idx in range(5)])
+        ah.update_alerts()
+        ah.update_alerts()
+    finally:
+        server.stop()
+
+    assert len(get_candle_requests(server)) == len(markets)
+
+    for alert in ah.alerts:
+        if alert.market == 'BTC-EUR':
+            # missed low of the gap hits the alert, acted on at the current price
+            assert alert.status == Alert.STATUS_HIT
+            assert alert.price == Decimal('950')
+            assert alert.backup_price == Decimal('950')
+        else:
+            # missed high of the gap raises the trailing price
+            assert alert.status == Alert.STATUS_ACTIVE
+            assert alert.trailing_price == Decimal('990.0')
+
+
+def test_gap_after_failed_ticks_is_backfilled(close_session, create_alert, create_backfill_alert_handler):
+    server = FakeRestServer(price_paths={market: ['1000'] for market in markets}).start()
+
+    try:
+        ah = create_backfill_alert_handler(server, [create_alert(market=market) for market in markets])
+        ah.update_alerts()
+
+        assert get_candle_requests(server) == []
+
+        # ticks failed for ten minutes, after the last update of the alerts
+        gap_started = time.time() - 600
+        ah._price_times = {market: gap_started for market in markets}
+
+        for alert in ah.alerts:
+            alert.dt = datetime.datetime.fromtimestamp(gap_started - 60)
+        server.candles = {'BTC-EUR': [get_candle(datetime.datetime.fromtimestamp(gap_started + 60), '1200', '1000')]}
+
+        ah._client.reset_responses()
+        ah.update_alerts()
+        ah._client.reset_responses()
+        ah.update_alerts()
+    finally:
+        server.stop()
+
+    assert len(get_candle_requests(server)) == len(markets)
+    assert ah.alerts[0].trailing_price == Decimal('1080.0')
+    assert ah.alerts[1].trailing_price == Decimal('900')
+
+
+def test_gap_is_retried_after_failed_candles(monkeypatch, close_session, create_alert, create_backfill_alert_handler):
+    dt = datetime.datetime.now() - datetime.timedelta(hours=1)
+
+    server = FakeRestServer(
+        price_paths={'BTC-EUR': ['1000'], 'ETH-EUR': ['1000', '1050']},
+        candles={market: [get_candle(dt + datetime.timedelta(minutes=5), '2000', '1000')] for market in markets}
+    ).start()
+
+    try:
+        ah = create_backfill_alert_handler(server, [create_alert(market=market, dt=dt) for market in markets])
+
+        # candles of both markets fail on the first two updates
+        get_candles = ah._client.get_candles
+        failures = [None] * 2 * len(markets)
+        monkeypatch.setattr(ah._client, 'get_candles', lambda *args: failures.pop() if failures else get_candles(*args))
+
+        ah.update_alerts()
+
+        assert [alert.status for alert in ah.alerts] == [Alert.STATUS_ACTIVE] * len(markets)
+
+        ah._client.reset_responses()
+        ah.update_alerts()
+
+        # updated after the gap, the alert of ETH-EUR still replays the missed high
+        assert ah.alerts[1].price == Decimal('1050')
+        assert ah.alerts[1].status == Alert.STATUS_ACTIVE
+
+        ah._client.reset_responses()
+        ah.update_alerts()
+    finally:
+        server.stop()
+
+    assert len(get_candle_requests(server)) == len(markets)
+    assert [alert.status for alert in ah.alerts] == [Alert.STATUS_HIT] * len(markets)
+    assert [alert.price for alert in ah.alerts] == [Decimal('1000'), Decimal('1050')]
+    assert ah._gap_starts == {}
+
+
+def test_flat_price_is_no_gap_on_next_cold_start(close_session, create_alert, create_backfill_alert_handler):
+    dt = datetime.datetime.now() - datetime.timedelta(hours=1)
+
+    server = FakeRestServer(price_paths={market: ['1000'] for market in markets}, candles={}).start()
+
+    try:
+        # runs of cron a minute apart, the price of the alerts unchanged since their last update
+        for run in range(2):
+            ah = create_backfill_alert_handler(server, [create_alert(market=market, dt=dt) for market in markets])
+            ah.update_alerts()
+            ah.save_alerts()
+
+            # low of a wick between the ticks, never seen by them, replayed only in a gap
+            server.candles = {'BTC-EUR': [get_candle(dt + datetime.timedelta(minutes=5), '1000', '800')]}
+    finally:
+        server.stop()
+
+    # backfilled by the first start since the last update of the alerts, not again by the next
+    assert len(get_candle_requests(server)) == len(markets)
+
+    for alert in ah.alerts:
+        assert alert.status == Alert.STATUS_ACTIVE
+
+
+def test_backfill_rebuilds_columnar_engine(close_session, create_alert, create_backfill_alert_handler):
+    server = FakeRestServer(price_paths={market: ['1000', '1050'] for market in markets}).start()
+
+    try:
+        ah = create_backfill_alert_handler(server, [create_alert(market=market) for market in markets], alert_engine=AlertHandler.ALERT_ENGINE_COLUMNAR)
+        ah.update_alerts()
+
+        gap_started = time.time() - 600
+        ah._price_times = {market: gap_started for market in markets}
+
+        for alert in ah.alerts:
+            alert.dt = datetime.datetime.fromtimestamp(gap_started - 60)
+        server.candles = {'ETH-EUR': [get_candle(datetime.datetime.fromtimestamp(gap_started + 60), '1200', '1000')]}
+
+        ah._client.reset_responses()
+        ah.update_alerts()
+        ah.save_alerts()
+    finally:
+        server.stop()
+
+    # 1050 of the next tick is at or below the trailing price raised by the candles
+    assert ah.alerts[0].status == Alert.STATUS_ACTIVE
+    assert ah.alerts[1].status == Alert.STATUS_HIT
+
+
+def test_gap_backfill_disabled(monkeypatch, close_session, create_alert, create_backfill_alert_handler):
+    monkeypatch.setenv('GAP_BACKFILL_SECONDS', '0')
+
+    server = FakeRestServer(price_paths={market: ['1000'] for market in markets}).start()
+
+    try:
+        ah = create_backfill_alert_handler(server, [create_alert(market=market, dt=datetime.datetime.now() - datetime.timedelta(hours=1)) for market in markets])
+        ah.update_alerts()
+    finally:
+        server.stop()
+
+    assert get_candle_requests(server) == []
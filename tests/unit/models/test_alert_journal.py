@@ -0,0 +1,78 @@
+from decimal import Decimal
+
+JOURNAL_OPTIONS = {'alerts_journal_file_name': 'alerts.journal'}
+
+
+def test_save_alerts_appends_changed_attributes(tmp_path, create_alert, create_alert_handler):
+    ah = create_alert_handler(**JOURNAL_OPTIONS, alerts=[create_alert('1000'), create_alert('1100')])
+    ah.save_alerts()
+
+    snapshot = (tmp_path / 'alerts.json').read_bytes()
+
+    ah_load = create_alert_handler(**JOURNAL_OPTIONS)
+    ah_load.update_alerts()
+    ah_load.save_alerts()
+
+    journal = (tmp_path / 'alerts.journal').read_text().splitlines()
+
+    # header and one entry of the only changed alert, snapshot untouched
+    assert len(journal) == 2
+    assert '"id": 0' in journal[1]
+    assert (tmp_path / 'alerts.json').read_bytes() == snapshot
+
+    ah_replay = create_alert_handler(**JOURNAL_OPTIONS)
+
+    assert [alert.attributes() for alert in ah_replay.alerts] == [alert.attributes() for alert in ah_load.alerts]
+    assert ah_replay.alerts[0].trailing_price == Decimal('990.0')
+
+
+def test_save_alerts_compacts_journal(tmp_path, create_alert, create_alert_handler):
+    ah = create_alert_handler(**JOURNAL_OPTIONS, alerts=[create_alert('1000')])
+    ah.save_alerts()
+
+    ah_load = create_alert_handler(**JOURNAL_OPTIONS)
+    ah_load._store._journal.compaction_entries = 1
+    ah_load.update_alerts()
+    ah_load.save_alerts()
+
+    ah_load.alerts[0].price = Decimal('1050')
+    ah_load.alerts[0].changedAttributes = ['price']
+    ah_load.mark_changed(ah_load.alerts[0])
+    ah_load.save_alerts()
+
+    assert len((tmp_path / 'alerts.journal').read_text().splitlines()) == 1
+    assert create_alert_handler(**JOURNAL_OPTIONS).alerts[0].price == Decimal('1050')
+
+
+def test_load_alerts_ignores_journal_of_other_snapshot(tmp_path, create_alert, create_alert_handler):
+    ah = create_alert_handler(**JOURNAL_OPTIONS, alerts=[create_alert('1000')])
+    ah.save_alerts()
+
+    ah_load = create_alert_handler(**JOURNAL_OPTIONS)
+    ah_load.update_alerts()
+    ah_load.save_alerts()
+
+    # snapshot replaced, crash before journal was reset
+    journal = (tmp_path / 'alerts.journal').read_bytes()
+    ah_load.alerts[0].price = Decimal('1200')
+    ah_load._store.save_snapshot(ah_load.alerts)
+    (tmp_path / 'alerts.journal').write_bytes(journal)
+
+    assert create_alert_handler(**JOURNAL_OPTIONS).alerts[0].price == Decimal('1200')
+
+
+def test_load_alerts_ignores_torn_entry(tmp_path, create_alert, create_alert_handler):
+    ah = create_alert_handler(**JOURNAL_OPTIONS, alerts=[create_alert('1000')])
+    ah.save_alerts()
+
+    ah_load = create_alert_handler(**JOURNAL_OPTIONS)
+    ah_load.update_alerts()
+    ah_load.save_alerts()
+
+    with open(tmp_path / 'alerts.journal', 'a') as fp:
+        fp.write('{"changes": {"price": 12')
+
+    ah_replay = create_alert_handler(**JOURNAL_OPTIONS)
+
+    assert ah_replay.alerts[0].price == Decimal('1100')
+    assert len((tmp_path / 'alerts.journal').read_text().splitlines()) == 1
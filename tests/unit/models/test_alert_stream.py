@@ -0,0 +1,59 @@
+import time
+from decimal import Decimal
+
+from models.Alert import Alert
+from models.AlertStream import AlertStream
+from models.clients.Bitvavo import BitvavoClient
+from models.clients.Cryptowatch import CryptowatchClient
+from simulator.websocket_server import FakeWebsocketServer
+
+market = 'ETH-EUR'
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    return condition()
+
+
+def test_stream_updates_alerts_by_every_tick(create_alert, create_alert_handler):
+    prices = ['1010', '1100', '1250', '1150', '1120', '1000']
+
+    server = FakeWebsocketServer(
+        ticks=[{'market': market, 'lastPrice': price} for price in prices] + [{'market': 'BTC-EUR', 'lastPrice': '1'}]
+    ).start()
+
+    ah = create_alert_handler(
+        alerts=[create_alert('1000', _client_backup=CryptowatchClient(_response_ticker_price={'result': {'price': '1120'}}))],
+        _client=None
+    )
+
+    stream = AlertStream(
+        _alert_handler=ah,
+        _client=BitvavoClient(api_key='', api_secret='', wsUrl=server.get_url()),
+        interval=0,
+        save_interval=3600
+    )
+
+    try:
+        stream.connect()
+        stream.tick()
+
+        assert server.wait_replayed(5)
+        assert wait_for(lambda: stream.ticks_processed == len(prices))
+
+        # peak between polls raised the trailing price, drop below it was hit
+        assert ah.alerts[0].trailing_price == Decimal('1125.0')
+        assert ah.alerts[0].status == Alert.STATUS_HIT
+        assert ah.alerts[0].price == Decimal('1120')
+
+        stream.tick()
+
+        assert wait_for(lambda: market not in server.subscribed_markets)
+        assert stream.get_subscribed_markets() == set()
+    finally:
+        stream.close()
+        server.stop()
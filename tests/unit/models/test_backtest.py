@@ -0,0 +1,119 @@
+import datetime
+import random
+from decimal import Decimal
+
+import simplejson as json
+
+from models.Alert import Alert
+from models.Backtest import Backtest, PriceSeries
+from models.clients.Bitvavo import BitvavoClient
+
+market = 'ETH-EUR'
+
+
+def get_prices(seed: int, count: int, places: int = 2):
+    rnd = random.Random(seed)
+    price = Decimal('1000')
+    prices = []
+
+    for idx in range(count):
+        price = max(Decimal('0.01'), (price * Decimal(str(1 + rnd.gauss(0, 0.01)))).quantize(Decimal(1).scaleb(-places)))
+        prices.append(price)
+
+    return prices
+
+
+def run_alert(prices: list, trailing_percentage: Decimal):
+    """
+    Reference by the scalar alert logic
+    :return: index of hit price, None if not hit, and alert
+    """
+    alert = Alert(
+        actions=[],
+        market=market,
+        trailing_percentage=trailing_percentage,
+        _client=BitvavoClient(api_key='', api_secret='', market=market, _response_ticker_price={'market': market, 'price': str(prices[0])})
+    )
+    alert.init_attributes()
+
+    for idx, price in enumerate(prices[1:], 1):
+        alert.update_by_client(price)
+
+        if alert.status == Alert.STATUS_HIT:
+            return idx, alert
+
+    return None, alert
+
+
+def get_series(prices: list):
+    return PriceSeries.get_by_prices(market, [1609459200000 + idx * 60000 for idx in range(len(prices))], prices)
+
+
+def test_same_results_as_alert():
+    for seed in range(20):
+        prices = get_prices(seed, 500)
+        backtest = Backtest(series=get_series(prices))
+
+        for trailing_percentage in [Decimal('0.9'), Decimal('0.95'), Decimal('0.97'), Decimal('0.985')]:
+            hit_idx, alert = run_alert(prices, trailing_percentage)
+            result = backtest.run(trailing_percentage)
+
+            assert result.hit is (hit_idx is not None)
+            assert result.trailing_price == alert.trailing_price
+
+            if hit_idx is not None:
+                assert result.exit_price == alert.price
+                assert result.ticks == hit_idx + 1
+                assert result.hit_dt == datetime.datetime(2021, 1, 1) + datetime.timedelta(minutes=hit_idx)
+
+
+def test_hit_at_trailing_price_and_drawdown():
+    prices = [Decimal(price) for price in ['100', '110', '105', '120', '110', '108', '130']]
+    result = Backtest(series=get_series(prices)).run(Decimal('0.9'))
+
+    assert result.hit is True
+    assert result.exit_price == Decimal('108')
+    assert result.peak_price == Decimal('120')
+    assert result.trailing_price == Decimal('108.0')
+    assert result.drawdown == Decimal('0.1')
+    assert result.max_drawdown == Decimal('0.1')
+    assert result.profit == Decimal('0.08')
+
+    result = Backtest(series=get_series(prices)).run(Decimal('0.9'), start=5)
+
+    assert result.hit is False
+    assert result.exit_price is None
+    assert result.entry_price == Decimal('108')
+    assert result.ticks == 2
+
+
+def test_prices_exceeding_int64():
+    prices = [Decimal('1E+20'), Decimal('1.1E+20'), Decimal('9.9E+19'), Decimal('0.5')]
+
+    result = Backtest(series=get_series(prices)).run(Decimal('0.9'))
+
+    assert result.hit is True
+    assert result.exit_price == Decimal('9.9E+19')
+
+
+def test_load_csv_and_candles(tmp_path):
+    with open(tmp_path / 'prices.csv', 'w') as fp:
+        fp.write('dt,market,price\n')
+        fp.write('2021-01-01 00:00:00,ETH-EUR,100.5\n')
+        fp.write('2021-01-01 00:00:00,BTC-EUR,30000\n')
+        fp.write('2021-01-01 00:01:00,ETH-EUR,101\n')
+
+    series = PriceSeries.load(str(tmp_path / 'prices.csv'), market)
+
+    assert len(series) == 2
+    assert series.scale == 1
+    assert series.get_decimal(series.price[0]) == Decimal('100.5')
+    assert series.get_dt(1) == datetime.datetime(2021, 1, 1, 0, 1)
+
+    with open(tmp_path / 'candles.json', 'w') as fp:
+        json.dump([[1609459260000, '1', '1', '1', '101', '1'], [1609459200000, '1', '1', '1', '100.5', '1']], fp)
+
+    candles = PriceSeries.load(str(tmp_path / 'candles.json'), market)
+
+    assert list(candles.price) == list(series.price)
+    assert candles.get_dt(0) == datetime.datetime(2021, 1, 1)
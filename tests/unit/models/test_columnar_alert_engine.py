@@ -0,0 +1,102 @@
+import copy
+import random
+from decimal import Decimal
+
+from models.Alert import Alert
+from models.AlertHandler import AlertHandler
+from models.ColumnarAlertEngine import ColumnarAlertEngine, MarketBook
+from models.clients.Bitvavo import BitvavoClient
+
+markets = ['ETH-EUR', 'BTC-EUR', 'ADA-EUR']
+
+
+def test_update_matches_scalar_path(create_random_alerts, create_random_ticks):
+    rnd = random.Random(7)
+
+    alerts = create_random_alerts(rnd, 300)
+    scalar_alerts = copy.deepcopy(alerts)
+
+    engine = ColumnarAlertEngine()
+    engine.load(alerts)
+
+    for ticker_prices in create_random_ticks(rnd, 50):
+        hit_alerts = engine.update(ticker_prices)
+
+        scalar_hit_idx = []
+
+        for idx, alert in enumerate(scalar_alerts):
+            if alert.update_by_client(ticker_prices[alert.market]) and alert.status == Alert.STATUS_HIT:
+                scalar_hit_idx.append(idx)
+
+        assert sorted([alerts.index(alert) for alert in hit_alerts]) == scalar_hit_idx
+
+        for alert in hit_alerts:
+            assert alert.price == scalar_alerts[alerts.index(alert)].price
+
+    engine.sync_alerts()
+
+    assert any(alert.status == Alert.STATUS_HIT for alert in alerts)
+    assert any(alert.status == Alert.STATUS_ACTIVE for alert in alerts)
+
+    for alert, scalar_alert in zip(alerts, scalar_alerts):
+        assert alert.status == scalar_alert.status
+        assert alert.price == scalar_alert.price
+        assert alert.trailing_price == scalar_alert.trailing_price
+
+
+def test_update_rescales_for_more_decimal_places(create_random_alerts):
+    alert = create_random_alerts(random.Random(1), 1)[0]
+    alert.price = Decimal('1000')
+    alert.trailing_price = Decimal('900')
+    alert.trailing_percentage = Decimal('0.9')
+
+    engine = ColumnarAlertEngine()
+    engine.load([alert])
+    engine.update({'ETH-EUR': Decimal('1000.12345')})
+    engine.sync_alerts()
+
+    assert alert.price == Decimal('1000.12345')
+    assert alert.trailing_price == Decimal('900.111105')
+    assert alert.changedAttributes == ['trailing_price', 'price', 'dt']
+
+
+def test_scale_by_price_precision(create_random_alerts):
+    alert = create_random_alerts(random.Random(1), 1)[0]
+    alert.price = Decimal('0.12')
+    alert.trailing_price = Decimal('0.108')
+    alert.trailing_percentage = Decimal('0.9')
+
+    engine = ColumnarAlertEngine(precisions={'ETH-EUR': 5})
+    engine.load([alert])
+    book = engine._books['ETH-EUR']
+
+    # 5 significant digits of 0.12xxx, no rescale by the ticks
+    assert isinstance(book, MarketBook)
+    assert book.scale == 5
+
+    engine.update({'ETH-EUR': Decimal('0.12345')})
+
+    assert book.scale == 5
+    assert book.price.tolist() == [12345]
+
+
+def test_update_alerts_by_columnar_engine(create_random_alerts):
+    alerts = create_random_alerts(random.Random(3), 3)
+
+    ah = AlertHandler(
+        alert_engine=AlertHandler.ALERT_ENGINE_COLUMNAR,
+        alerts=alerts,
+        _client=BitvavoClient(
+            _response_ticker_prices=[
+                {'market': 'ETH-EUR', 'price': '1200'},
+                {'market': 'BTC-EUR', 'price': '1300'},
+                {'market': 'ADA-EUR', 'price': '1400'}
+            ]
+        )
+    )
+
+    ah.update_alerts()
+    ah.get_engine().sync_alerts()
+
+    assert [alert.price for alert in ah.alerts] == [Decimal('1200'), Decimal('1300'), Decimal('1400')]
+    assert ah.alerts[0].trailing_price == Decimal('1200') * ah.alerts[0].trailing_percentage
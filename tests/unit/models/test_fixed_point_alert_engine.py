@@ -0,0 +1,114 @@
+import copy
+import random
+from decimal import Decimal
+
+from models.Alert import Alert
+from models.AlertHandler import AlertHandler
+from models.FixedPointAlertEngine import FixedPointAlertEngine, FixedPointBook
+from simulator.fake_exchange import FakeBitvavoClient, PriceFeed
+
+markets = ['ETH-EUR', 'BTC-EUR', 'ADA-EUR']
+
+
+def test_update_matches_decimal_path(create_random_alerts, create_random_ticks):
+    rnd = random.Random(7)
+
+    alerts = create_random_alerts(rnd, 300)
+    scalar_alerts = copy.deepcopy(alerts)
+
+    engine = FixedPointAlertEngine(precisions={'ETH-EUR': 5})
+    engine.load(alerts)
+
+    for ticker_prices in create_random_ticks(rnd, 50):
+        hit_alerts = engine.update(ticker_prices)
+
+        scalar_hit_idx = []
+        scalar_changed = 0
+
+        for idx, alert in enumerate(scalar_alerts):
+            if alert.update_by_client(ticker_prices[alert.market]):
+                scalar_changed += 1
+
+                if alert.status == Alert.STATUS_HIT:
+                    scalar_hit_idx.append(idx)
+
+        assert sorted([alerts.index(alert) for alert in hit_alerts]) == scalar_hit_idx
+        assert engine.changed == scalar_changed
+
+    engine.sync_alerts()
+
+    assert any(alert.status == Alert.STATUS_HIT for alert in alerts)
+    assert any(alert.status == Alert.STATUS_ACTIVE for alert in alerts)
+
+    for alert, scalar_alert in zip(alerts, scalar_alerts):
+        assert alert.status == scalar_alert.status
+        assert alert.price == scalar_alert.price
+        assert alert.trailing_price == scalar_alert.trailing_price
+
+
+def test_scale_by_price_precision(create_random_alerts):
+    alert = create_random_alerts(random.Random(1), 1)[0]
+    alert.price = Decimal('0.12')
+    alert.trailing_price = Decimal('0.108')
+    alert.trailing_percentage = Decimal('0.9')
+
+    book = FixedPointBook(market='ETH-EUR', precision=5)
+    book.add_alerts([alert])
+
+    # 5 significant digits of 0.12xxx
+    assert book.scale == 5
+    assert FixedPointBook.get_precision_places(5, Decimal('45000')) == 0
+    assert FixedPointBook.get_precision_places(5, Decimal('0.000012345')) == 9
+
+
+def test_update_rescales_for_more_decimal_places(create_random_alerts):
+    alert = create_random_alerts(random.Random(1), 1)[0]
+    alert.price = Decimal('1000')
+    alert.trailing_price = Decimal('900')
+    alert.trailing_percentage = Decimal('0.9')
+
+    engine = FixedPointAlertEngine()
+    engine.load([alert])
+    engine.update({'ETH-EUR': Decimal('1000.12345')})
+    engine.sync_alerts()
+
+    assert alert.price == Decimal('1000.12345')
+    assert alert.trailing_price == Decimal('900.111105')
+    assert alert.changedAttributes == ['trailing_price', 'price', 'dt']
+
+
+def test_values_beyond_decimal_precision_are_updated_by_alert(create_random_alerts):
+    alert = create_random_alerts(random.Random(1), 1)[0]
+    alert.price = Decimal('1000')
+    alert.trailing_price = Decimal('900')
+    alert.trailing_percentage = Decimal('0.9')
+
+    scalar_alert = copy.deepcopy(alert)
+    ticker_price = Decimal('1000.12345678901234567890123456')
+
+    engine = FixedPointAlertEngine()
+    engine.load([alert])
+    engine.update({'ETH-EUR': ticker_price})
+    scalar_alert.update_by_client(ticker_price)
+
+    assert engine._books['ETH-EUR'].scalar is True
+    assert alert.trailing_price == scalar_alert.trailing_price
+
+
+def test_update_alerts_by_fixed_point_engine(tmp_path, create_random_alerts):
+    feed = PriceFeed(markets=markets)
+
+    ah = AlertHandler(
+        alerts_file_path=str(tmp_path) + '/',
+        alerts_file_name='alerts.json',
+        new_alert_file_name=None,
+        alert_engine=AlertHandler.ALERT_ENGINE_FIXED,
+        alerts=create_random_alerts(random.Random(3), 3),
+        _client=FakeBitvavoClient(_feed=feed)
+    )
+
+    ah.update_alerts()
+    ah.save_alerts()
+
+    assert ah.get_engine().precisions == {market: 5 for market in markets}
+    assert [alert.price for alert in ah.alerts] == [feed.get_price(market) for market in markets]
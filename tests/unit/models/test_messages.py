@@ -0,0 +1,89 @@
+import time
+
+import pytest
+
+from models.Messages import Messages
+from models.Metrics import Metrics
+from simulator.smtp_server import FakeSmtpServer
+
+
+@pytest.fixture
+def smtp_server(monkeypatch):
+    server = FakeSmtpServer().start()
+
+    monkeypatch.setenv('SMTP_SERVER_URI', server.host)
+    monkeypatch.setenv('SMTP_SERVER_PORT', str(server.get_port()))
+    monkeypatch.setenv('SMTP_SSL', '0')
+    monkeypatch.setenv('EMAIL_USER', 'user')
+    monkeypatch.setenv('EMAIL_USER_PW', 'pw')
+    monkeypatch.setenv('SENDER_EMAIL', 'sender@example.com')
+    monkeypatch.setenv('RECEIVER_EMAIL', 'receiver@example.com')
+    Messages.close()
+
+    yield server
+
+    Messages.close()
+    server.stop()
+
+
+def test_connection_is_reused(smtp_server):
+    for idx in range(5):
+        assert Messages.send_email('message ' + str(idx)) is True
+
+    assert len(smtp_server.messages) == 5
+    assert smtp_server.connections == 1
+    assert smtp_server.logins == 1
+
+
+def test_connection_is_renewed_by_age(smtp_server, monkeypatch):
+    monkeypatch.setenv('SMTP_CONNECTION_MAX_AGE', '0.05')
+
+    Messages.send_email('first')
+    time.sleep(0.1)
+    Messages.send_email('second')
+
+    assert smtp_server.connections == 2
+
+
+def test_reconnect_on_closed_connection(smtp_server):
+    smtp_server.max_messages = 2
+    Metrics.reset()
+
+    for idx in range(5):
+        assert Messages.send_email('message ' + str(idx)) is True
+
+    assert len(smtp_server.messages) == 5
+    assert smtp_server.connections == 3
+    assert Metrics.get_value('errors_total', component='smtp') is None
+
+
+def test_send_fails_without_server(smtp_server):
+    smtp_server.stop()
+    Metrics.reset()
+
+    assert Messages.send_email('message') is False
+    assert Metrics.get_value('errors_total', component='smtp') == 1
+
+
+def test_digest_merges_emails_by_subject(smtp_server, monkeypatch):
+    monkeypatch.setenv('EMAIL_DIGEST', '1')
+
+    with Messages.digest():
+        for idx in range(3):
+            Messages.send_email('hit ' + str(idx))
+
+        Messages.send_email('diverted', 'Ticker price diversion')
+
+        assert smtp_server.messages == []
+
+    assert len(smtp_server.messages) == 2
+    assert 'Subject: Trailing stop hit. (3)' in smtp_server.messages[0][2]
+    assert 'hit 0' in smtp_server.messages[0][2] and 'hit 2' in smtp_server.messages[0][2]
+    assert 'Subject: Ticker price diversion\n' in smtp_server.messages[1][2].replace('\r\n', '\n')
+
+
+def test_digest_disabled_sends_right_away(smtp_server):
+    with Messages.digest():
+        Messages.send_email('hit')
+
+        assert len(smtp_server.messages) == 1
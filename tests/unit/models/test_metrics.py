@@ -0,0 +1,57 @@
+import urllib.request
+
+from models.Metrics import Metrics
+from models.clients.Cryptowatch import CryptowatchClient
+
+market = 'ETH-EUR'
+
+
+def test_update_alerts_records_phases_and_counts(create_alert, create_alert_handler):
+    Metrics.reset()
+
+    ah = create_alert_handler(
+        alerts=[create_alert('1000'), create_alert('1100'), create_alert('1300')],
+        _backup_clients={market: CryptowatchClient(_response_ticker_price={'result': {'price': '1100'}})}
+    )
+    ah.update_alerts()
+    ah.save_alerts()
+
+    assert Metrics.get_value('alerts_evaluated') == 3
+    assert Metrics.get_value('alerts_changed') == 2
+    assert Metrics.get_value('alerts_hit') == 1
+    assert Metrics.get_value('alerts_hit_total') == 1
+
+    for phase in ['fetch', 'evaluate', 'divergence_check', 'save']:
+        assert Metrics.get_value('phase_duration_seconds', phase=phase) == 1
+
+    assert Metrics.get_value('phase_duration_seconds', phase='trade') is None
+
+
+def test_text_format_and_http_endpoint(tmp_path):
+    Metrics.reset()
+    Metrics.inc('api_requests_total', endpoint='api.bitvavo.com/v2/ticker/price', method='GET', status='200')
+    Metrics.observe('phase_duration_seconds', 0.02, phase='fetch')
+    Metrics.set('tick_budget_seconds', 60)
+
+    text = Metrics.get_text()
+
+    assert '# TYPE trailing_alert_api_requests_total counter' in text
+    assert 'trailing_alert_api_requests_total{endpoint="api.bitvavo.com/v2/ticker/price",method="GET",status="200"} 1' in text
+    assert 'trailing_alert_phase_duration_seconds_bucket{phase="fetch",le="0.01"} 0' in text
+    assert 'trailing_alert_phase_duration_seconds_bucket{phase="fetch",le="0.025"} 1' in text
+    assert 'trailing_alert_phase_duration_seconds_bucket{phase="fetch",le="+Inf"} 1' in text
+    assert 'trailing_alert_phase_duration_seconds_count{phase="fetch"} 1' in text
+    assert 'trailing_alert_tick_budget_seconds 60' in text
+
+    assert Metrics.write_text_file(str(tmp_path / 'metrics.prom'))
+
+    with open(tmp_path / 'metrics.prom', 'r') as fp:
+        assert fp.read() == text
+
+    server = Metrics.start_http_server(0)
+
+    try:
+        with urllib.request.urlopen('http://127.0.0.1:' + str(server.server_address[1]) + '/metrics') as r:
+            assert r.read().decode('utf-8') == text
+    finally:
+        Metrics.stop_http_server()
@@ -0,0 +1,124 @@
+import time
+
+import pytest
+
+from models.Messages import Messages
+from models.NotificationOutbox import NotificationOutbox
+from simulator.smtp_server import FakeSmtpServer
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    return condition()
+
+
+@pytest.fixture
+def smtp_server(monkeypatch):
+    server = FakeSmtpServer(latency=0.2).start()
+
+    monkeypatch.setenv('SMTP_SERVER_URI', server.host)
+    monkeypatch.setenv('SMTP_SERVER_PORT', str(server.get_port()))
+    monkeypatch.setenv('SMTP_SSL', '0')
+    monkeypatch.setenv('RECEIVER_EMAIL', 'receiver@example.com')
+    Messages.close()
+
+    yield server
+
+    Messages.stop_outbox()
+    Messages.close()
+    server.stop()
+
+
+def test_emails_are_delivered_by_worker(smtp_server, tmp_path):
+    outbox = Messages.start_outbox(str(tmp_path))
+
+    started = time.perf_counter()
+
+    for idx in range(3):
+        assert Messages.send_email('hit ' + str(idx)) is True
+
+    # queued on disk, not sent by the caller
+    assert time.perf_counter() - started < 0.1
+    assert len(outbox.get_pending()) + len(smtp_server.messages) == 3
+
+    assert Messages.stop_outbox(5) is True
+    assert ['hit 0' in smtp_server.messages[0][2], 'hit 2' in smtp_server.messages[2][2]] == [True, True]
+
+
+class FailingSend(object):
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.sent = []
+
+    def __call__(self, message: str, subject: str):
+        if self.failures > 0:
+            self.failures -= 1
+
+            return False
+
+        self.sent.append((subject, message))
+
+        return True
+
+
+def test_failed_delivery_is_retried(tmp_path):
+    send = FailingSend(2)
+    outbox = NotificationOutbox(file_path=str(tmp_path), retry_seconds=0.05, _send=send).start()
+
+    outbox.put('hit', 'subject')
+
+    assert wait_for(lambda: send.sent == [('subject', 'hit')])
+    assert outbox.stop() is True
+
+
+def test_email_is_given_up_after_max_attempts(tmp_path):
+    outbox = NotificationOutbox(file_path=str(tmp_path), retry_seconds=0.01, max_attempts=3, _send=FailingSend(10)).start()
+
+    file_name = outbox.put('hit', 'subject')
+
+    assert wait_for(lambda: outbox.get_failed() == [file_name])
+    assert outbox.stop() is True
+
+
+def test_stop_does_not_wait_for_emails_in_backoff(tmp_path):
+    send = FailingSend(10)
+    outbox = NotificationOutbox(file_path=str(tmp_path), retry_seconds=60, _send=send).start()
+
+    outbox.put('hit', 'subject')
+
+    assert wait_for(lambda: send.failures == 9 and not outbox.get_due())
+
+    started = time.perf_counter()
+
+    # left queued for the next start instead of waiting for its retry
+    assert outbox.stop(30) is False
+    assert time.perf_counter() - started < 10
+    assert len(outbox.get_pending()) == 1
+
+
+def test_queued_emails_survive_restart(tmp_path):
+    NotificationOutbox(file_path=str(tmp_path), _send=FailingSend(0)).put('hit', 'subject')
+
+    send = FailingSend(0)
+    outbox = NotificationOutbox(file_path=str(tmp_path), _send=send).start()
+
+    assert wait_for(lambda: send.sent == [('subject', 'hit')])
+    assert outbox.stop() is True
+
+
+def test_emails_queued_by_another_process_are_delivered_on_wakeup(tmp_path):
+    send = FailingSend(0)
+    outbox = NotificationOutbox(file_path=str(tmp_path), _send=send).start()
+
+    # like a shard of a sharded handler, queueing without a worker of its own
+    NotificationOutbox(file_path=str(tmp_path)).put('hit', 'subject')
+
+    outbox.wakeup()
+
+    assert wait_for(lambda: send.sent == [('subject', 'hit')])
+
+    outbox.stop()
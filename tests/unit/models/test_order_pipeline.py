@@ -0,0 +1,115 @@
+from decimal import Decimal
+
+import pytest
+
+from models.Alert import Alert
+from models.Trade import Trade
+from models.clients.Cryptowatch import CryptowatchClient
+from simulator.rest_server import FakeRestServer
+
+markets = ['BTC-EUR', 'ETH-EUR', 'ADA-EUR']
+
+
+@pytest.fixture
+def create_order_alert_handler(monkeypatch, create_alert_handler):
+    """
+    Alert handler placing orders on the server, hit alerts confirmed by a backup price of 851
+    """
+    def create(server: FakeRestServer, alerts: list):
+        monkeypatch.setenv('BITVAVO_REST_URL', server.get_bitvavo_url())
+        monkeypatch.setenv('APIKEY', 'key')
+        monkeypatch.setenv('APISECRET', 'secret')
+
+        ah = create_alert_handler(
+            alerts=alerts,
+            _client=None,
+            _backup_clients={market: CryptowatchClient(_response_ticker_price={'result': {'price': '851'}}) for market in markets}
+        )
+        ah._ticker_prices = {market: Decimal('850') for market in markets}
+
+        return ah
+
+    return create
+
+
+def test_orders_of_a_tick_are_placed_concurrently(close_session, create_alert, create_order_alert_handler):
+    server = FakeRestServer(price_paths={market: ['850'] for market in markets}, latency=0.2).start()
+    alerts = [create_alert(market=market, amount=Decimal('0.5'), actions=[Alert.ACTION_SELL_ASSET]) for market in markets for idx in range(3)]
+
+    try:
+        ah = create_order_alert_handler(server, alerts)
+        ah.update_alerts_by_ticker_prices()
+    finally:
+        server.stop()
+
+    assert len(server.orders) == len(alerts)
+    # the orders of all markets are in flight at once, not one after the other
+    assert server.max_in_flight >= len(markets)
+    assert sorted(order[1]['market'] for order in server.orders) == sorted(alert.market for alert in alerts)
+
+
+def test_order_results_are_reported_per_alert(close_session, create_alert, create_order_alert_handler):
+    server = FakeRestServer(price_paths={market: ['850'] for market in markets}).start()
+    alerts = [create_alert(market=market, amount=Decimal('0.5'), actions=[Alert.ACTION_SELL_ASSET]) for market in markets] + [create_alert(market='XRP-EUR', actions=[Alert.ACTION_SELL_ASSET])]
+
+    try:
+        ah = create_order_alert_handler(server, alerts)
+        ah._backup_clients['XRP-EUR'] = ah._backup_clients['BTC-EUR']
+        ah._ticker_prices['XRP-EUR'] = Decimal('850')
+
+        trades = ah.handle_hits([alert for alert in alerts if alert.update_by_client(Decimal('850'))])
+    finally:
+        server.stop()
+
+    results = {trade._alert.market: trade for trade in trades}
+
+    for market in markets:
+        assert results[market].is_placed() is True
+        assert results[market].response['amount'] == '0.5'
+        assert results[market].seconds is not None
+
+    # unknown market on the simulator, its order fails without failing the others
+    assert results['XRP-EUR'].is_placed() is False
+    assert results['XRP-EUR'].error is not None
+
+
+def test_order_timeout_fails_order(monkeypatch, close_session, create_alert, create_order_alert_handler):
+    server = FakeRestServer(price_paths={market: ['850'] for market in markets}, timeout_ratio=1.0, timeout_seconds=1.0).start()
+    alerts = [create_alert(market=market, amount=Decimal('0.5'), actions=[Alert.ACTION_SELL_ASSET]) for market in markets]
+
+    try:
+        monkeypatch.setenv('ORDER_TIMEOUT', '0.2')
+        ah = create_order_alert_handler(server, alerts)
+        trades = ah.handle_hits([alert for alert in alerts if alert.update_by_client(Decimal('850'))])
+        # the orders gave up while the server has not answered yet
+        in_flight = server.in_flight
+    finally:
+        server.stop()
+
+    assert in_flight == len(markets)
+    assert len(trades) == len(markets)
+
+    for trade in trades:
+        assert trade.is_placed() is False
+        assert trade.error is not None
+
+
+def test_second_sell_all_of_a_market_finds_no_balance(close_session, create_alert, create_order_alert_handler):
+    server = FakeRestServer(price_paths={market: ['850'] for market in markets}, balance='1').start()
+    alerts = [
+        create_alert(actions=[Alert.ACTION_SELL_ASSET]),
+        create_alert(actions=[Alert.ACTION_SELL_ASSET]),
+        create_alert(amount=Decimal('0.25'), actions=[Alert.ACTION_SELL_ASSET])
+    ]
+
+    try:
+        ah = create_order_alert_handler(server, alerts)
+        trades = ah.handle_hits([alert for alert in alerts if alert.update_by_client(Decimal('850'))])
+    finally:
+        server.stop()
+
+    # the fixed amount first, then the balance left, never more than the balance
+    assert [order[1]['amount'] for order in server.orders] == ['0.25', '0.75']
+    assert [trade.is_placed() for trade in trades] == [True, False, True]
+    assert trades[1].error == Trade.ERROR_NO_BALANCE
+    assert server.get_balance('ETH') == 0
@@ -0,0 +1,63 @@
+import datetime
+from decimal import Decimal
+
+import numpy as np
+
+from models.Backtest import PriceSeries
+from models.ParameterSweep import ParameterSweep
+
+
+def get_series(market: str, seed: int, count: int = 5000):
+    rnd = np.random.default_rng(seed)
+    price = np.maximum(1, np.round(100000 * np.exp(np.cumsum(rnd.normal(0, 0.002, count))))).astype(np.int64)
+    dt = (np.int64(1609459200000) + np.arange(count, dtype=np.int64) * 60000).astype('datetime64[ms]')
+
+    return PriceSeries(market=market, scale=2, dt=dt, price=price)
+
+
+def get_sweep(workers: int):
+    return ParameterSweep(
+        series=[get_series('ETH-EUR', 1), get_series('BTC-EUR', 2)],
+        trailing_percentages=ParameterSweep.get_trailing_percentages(Decimal('0.9'), Decimal('0.99'), Decimal('0.01')),
+        starts=[None, datetime.datetime(2021, 1, 2), datetime.datetime(2022, 1, 1)],
+        workers=workers
+    )
+
+
+def test_get_trailing_percentages():
+    trailing_percentages = ParameterSweep.get_trailing_percentages(Decimal('0.8'), Decimal('0.99'), Decimal('0.005'))
+
+    assert len(trailing_percentages) == 39
+    assert trailing_percentages[0] == Decimal('0.8')
+    assert trailing_percentages[-1] == Decimal('0.990')
+
+
+def test_process_pool_same_results_as_single_process():
+    sweep = get_sweep(2)
+
+    # start after the last price is skipped
+    assert len(sweep.get_tasks()) == 4
+
+    results = sweep.run()
+
+    assert len(results) == 4 * 10
+    assert sweep._shared_memory == []
+    assert [result.attributes() for result in results] == [result.attributes() for result in get_sweep(1).run()]
+
+
+def test_rank_and_suggestion(tmp_path):
+    rows = ParameterSweep.rank(get_sweep(1).run())
+
+    assert [row['market'] for row in rows[:10]] == [ParameterSweep.MARKET_ALL] * 10
+    assert [row['rank'] for row in rows[:10]] == list(range(1, 11))
+    assert rows[0]['runs'] == 4
+    assert rows[0]['mean_profit'] >= rows[1]['mean_profit']
+
+    file_path = str(tmp_path / 'sweep.csv')
+    ParameterSweep.write_csv(rows, file_path)
+
+    btc_first = [row for row in rows if row['market'] == 'BTC-EUR' and row['rank'] == 1][0]
+
+    assert ParameterSweep.get_suggestion(file_path, 'BTC-EUR') == btc_first['trailing_percentage']
+    assert ParameterSweep.get_suggestion(file_path, 'ADA-EUR') == rows[0]['trailing_percentage']
+    assert ParameterSweep.get_suggestion(str(tmp_path / 'missing.csv'), 'BTC-EUR') is None
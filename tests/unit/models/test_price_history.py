@@ -0,0 +1,181 @@
+import datetime
+import threading
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from models.AlertHandler import AlertHandler
+from models.PriceHistory import PriceHistory, PriceRingBuffer
+from simulator.fake_exchange import FakeBitvavoClient, PriceFeed
+
+
+def get_buffer(tmp_path, capacity: int = 5, writable: bool = True):
+    return PriceRingBuffer(file_path=str(tmp_path / 'BTC-EUR.ring'), capacity=capacity, scale=2, writable=writable).open()
+
+
+def test_append_and_wrap_around(tmp_path):
+    buffer = get_buffer(tmp_path)
+
+    for idx in range(3):
+        buffer.append(idx, Decimal(idx) + Decimal('0.25'))
+
+    assert len(buffer) == 3
+    assert buffer.read()['ts'].tolist() == [0, 1, 2]
+    assert buffer.read()['price'].tolist() == [25, 125, 225]
+
+    for idx in range(3, 8):
+        buffer.append(idx, Decimal(idx))
+
+    assert len(buffer) == 5
+    assert buffer.get_count() == 8
+    # the record being overwritten next is dropped by read
+    assert buffer.read()['ts'].tolist() == [4, 5, 6, 7]
+    assert buffer.read(2)['ts'].tolist() == [6, 7]
+    assert np.concatenate(buffer.get_views())['ts'].tolist() == [3, 4, 5, 6, 7]
+
+    buffer.close()
+
+
+def test_views_are_zero_copy(tmp_path):
+    buffer = get_buffer(tmp_path)
+
+    for idx in range(7):
+        buffer.append(idx, Decimal(idx))
+
+    views = buffer.get_views()
+
+    assert len(views) == 2
+    assert all(np.shares_memory(view, buffer._records) for view in views)
+
+    buffer.close()
+
+
+def test_single_writer(tmp_path):
+    buffer = get_buffer(tmp_path)
+
+    with pytest.raises(OSError):
+        get_buffer(tmp_path)
+
+    reader = get_buffer(tmp_path, writable=False)
+    buffer.append(1, Decimal('1'))
+
+    assert reader.read()['price'].tolist() == [100]
+
+    with pytest.raises(ValueError):
+        reader.append(2, Decimal('2'))
+
+    reader.close()
+    buffer.close()
+
+
+def test_reader_sees_consistent_records_while_appended(tmp_path):
+    buffer = get_buffer(tmp_path, capacity=64)
+    reader = get_buffer(tmp_path, capacity=64, writable=False)
+    stop = threading.Event()
+    errors = []
+
+    def read():
+        while not stop.is_set():
+            records = reader.read()
+
+            # every record was written with price = ts, in order without gaps
+            if not (np.array_equal(records['ts'], records['price']) and np.all(np.diff(records['ts']) == 1)):
+                errors.append(records)
+
+    thread = threading.Thread(target=read)
+    thread.start()
+
+    for idx in range(20000):
+        buffer.append(idx, Decimal(idx).scaleb(-2))
+
+    stop.set()
+    thread.join()
+
+    assert errors == []
+    assert reader.read()['ts'][-1] == 19999
+
+    reader.close()
+    buffer.close()
+
+
+def test_price_history_series(tmp_path):
+    history = PriceHistory(file_path=str(tmp_path), capacity=10, scale=2)
+    dt = datetime.datetime(2021, 5, 1, 12)
+
+    history.append_prices({'BTC-EUR': Decimal('45000.5'), 'ETH-EUR': Decimal('3000')}, dt)
+    history.append('BTC-EUR', Decimal('45100'), dt + datetime.timedelta(seconds=10))
+
+    reader = PriceHistory(file_path=str(tmp_path), writable=False)
+    series = reader.get_series('BTC-EUR')
+
+    assert reader.get_series('ADA-EUR') is None
+    assert series.scale == 2
+    assert [series.get_decimal(price) for price in series.price] == [Decimal('45000.5'), Decimal('45100')]
+    assert series.get_dt(0) == dt
+    assert len(reader.get_series('ETH-EUR', last=5)) == 1
+
+    reader.close()
+    history.close()
+
+
+def test_price_not_fitting_scale_is_refused(tmp_path):
+    buffer = get_buffer(tmp_path)
+
+    with pytest.raises(ValueError):
+        buffer.append(1, Decimal('1.234'))
+
+    buffer.close()
+
+    history = PriceHistory(file_path=str(tmp_path / 'history'), capacity=10, scale=2)
+    history.append_prices({'BTC-EUR': Decimal('1.234'), 'ETH-EUR': Decimal('1.23')})
+
+    assert len(history.get_series('BTC-EUR')) == 0
+    assert len(history.get_series('ETH-EUR')) == 1
+
+    history.close()
+
+
+def test_scale_by_price_precision(tmp_path):
+    history = PriceHistory(file_path=str(tmp_path), capacity=10, _get_precisions=lambda: {'SHIB-EUR': 5, 'BTC-EUR': 5})
+
+    history.append_prices({'SHIB-EUR': Decimal('0.0000086123'), 'BTC-EUR': Decimal('45000.5')})
+    history.append('SHIB-EUR', Decimal('0.00000012345'))
+
+    series = history.get_series('SHIB-EUR')
+
+    # 5 significant digits of 0.0000086123 and of prices down to a hundredth of it
+    assert series.scale == 12
+    assert [series.get_decimal(price) for price in series.price] == [Decimal('0.0000086123'), Decimal('0.00000012345')]
+    assert history.get_series('BTC-EUR').scale == PriceHistory.SCALE
+
+    history.close()
+
+
+def test_alert_handler_fills_price_history(tmp_path):
+    markets = ['BTC-EUR', 'ETH-EUR']
+    feed = PriceFeed(markets=markets)
+
+    ah = AlertHandler(
+        alerts_file_path=str(tmp_path) + '/',
+        alerts_file_name='alerts.json',
+        new_alert_file_name=None,
+        alerts=[],
+        price_history_path=str(tmp_path / 'history'),
+        _client=FakeBitvavoClient(_feed=feed)
+    )
+
+    for idx in range(3):
+        ah.update_alerts()
+        feed.step()
+
+    ah.update_alerts_by_ticker_price('BTC-EUR', Decimal('1234.56'))
+
+    reader = PriceHistory(file_path=str(tmp_path / 'history'), writable=False)
+
+    assert len(reader.get_series('ETH-EUR')) == 3
+    assert len(reader.get_series('BTC-EUR')) == 4
+    assert reader.get_series('BTC-EUR', last=1).get_decimal(reader.get_series('BTC-EUR', last=1).price[0]) == Decimal('1234.56')
+
+    reader.close()
+    ah.close()
@@ -0,0 +1,192 @@
+import os
+import queue
+from decimal import Decimal
+
+import pytest
+
+from models.Alert import Alert
+from models.Metrics import Metrics
+from models.ShardedAlertHandler import AlertShard, ShardedAlertHandler
+from models.stores.JsonAlertStore import JsonAlertStore
+
+MARKETS = ['BTC-EUR', 'ETH-EUR', 'ADA-EUR', 'XRP-EUR', 'DOT-EUR', 'SOL-EUR']
+
+
+def load_shard(file_path: str, shard: int, shards: int):
+    return JsonAlertStore(file_path=file_path + ShardedAlertHandler.SHARD_PATH % (shard, shards), file_name='alerts.json').load()
+
+
+@pytest.fixture
+def alerts_file_path(tmp_path, create_alert):
+    file_path = str(tmp_path) + '/'
+
+    JsonAlertStore(file_path=file_path, file_name='alerts.json').save_snapshot([create_alert('100', market=market) for market in MARKETS])
+
+    return file_path
+
+
+@pytest.fixture
+def sharded_handler(alerts_file_path):
+    handlers = []
+
+    def create(shards: int = 2):
+        handler = ShardedAlertHandler(
+            shards=shards,
+            alerts_file_path=alerts_file_path,
+            handler_options={
+                'alerts_file_name': 'alerts.json',
+                'new_alert_file_name': 'new_alert.json',
+                'alerts_journal_file_name': None,
+                'alert_store': 'json',
+                'alert_engine': 'scalar',
+                'alerts_archive_path': None,
+                'price_history_path': None,
+                'gap_seconds': 0
+            }
+        )
+        handlers.append(handler)
+
+        assert handler.wait(60)
+
+        return handler
+
+    yield create
+
+    for handler in handlers:
+        if len(handler._stopped) < handler.shards:
+            handler.close()
+
+
+def test_get_shard_is_stable():
+    assert ShardedAlertHandler.get_shard('BTC-EUR', 4) == ShardedAlertHandler.get_shard('BTC-EUR', 4)
+    assert ShardedAlertHandler.get_shard(None, 4) == 0
+    assert set(ShardedAlertHandler.get_shard(market, 3) for market in MARKETS) <= {0, 1, 2}
+
+
+def test_alerts_are_moved_to_shards_of_their_markets(sharded_handler, alerts_file_path):
+    handler = sharded_handler(3)
+    handler.close()
+
+    assert JsonAlertStore(file_path=alerts_file_path, file_name='alerts.json').load() == []
+
+    markets = []
+
+    for shard in range(3):
+        shard_markets = [alert.market for alert in load_shard(alerts_file_path, shard, 3)]
+
+        assert all(ShardedAlertHandler.get_shard(market, 3) == shard for market in shard_markets)
+
+        markets.extend(shard_markets)
+
+    assert sorted(markets) == sorted(MARKETS)
+
+
+def test_alerts_are_rebalanced_on_other_shard_count(sharded_handler, alerts_file_path):
+    sharded_handler(3).close()
+    sharded_handler(2).close()
+
+    markets = []
+
+    for shard in range(2):
+        shard_markets = [alert.market for alert in load_shard(alerts_file_path, shard, 2)]
+
+        assert all(ShardedAlertHandler.get_shard(market, 2) == shard for market in shard_markets)
+
+        markets.extend(shard_markets)
+
+    assert sorted(markets) == sorted(MARKETS)
+    assert not [name for name in os.listdir(alerts_file_path) if name.endswith('-of-3')]
+    assert len(os.listdir(alerts_file_path + ShardedAlertHandler.REBALANCED_PATH)) == 3
+
+
+def test_new_alert_is_routed(sharded_handler, alerts_file_path, create_alert):
+    handler = sharded_handler()
+
+    JsonAlertStore(file_path=alerts_file_path, new_alert_file_name='new_alert.json').add(create_alert('50', market='LTC-EUR'))
+
+    assert handler.load_new_alerts() == 1
+
+    handler.close()
+
+    shard = ShardedAlertHandler.get_shard('LTC-EUR', 2)
+
+    assert 'LTC-EUR' in [alert.market for alert in load_shard(alerts_file_path, shard, 2)]
+    assert handler._pending_alerts == {}
+
+
+def test_alerts_routed_again_are_skipped(sharded_handler, alerts_file_path):
+    inbox = JsonAlertStore(file_path=alerts_file_path, file_name='alerts.json')
+    alerts = inbox.load()
+
+    sharded_handler().close()
+
+    # coordinator died after the shards saved the alerts, before it removed them from the inbox
+    inbox.save_snapshot(alerts)
+
+    sharded_handler().close()
+
+    markets = [alert.market for shard in range(2) for alert in load_shard(alerts_file_path, shard, 2)]
+
+    assert sorted(markets) == sorted(MARKETS)
+    assert inbox.load() == []
+
+
+def test_get_new_alerts_skips_held_uids(create_alert):
+    alert = create_alert('100')
+    twin = create_alert('100', init_dt=alert.init_dt)
+    other = create_alert('100', market='BTC-EUR')
+
+    assert alert.get_uid() == twin.get_uid() != other.get_uid()
+    assert AlertShard.get_new_alerts([alert, twin, other], [twin]) == [twin, other]
+
+
+def test_shards_evaluate_their_prices(sharded_handler, alerts_file_path):
+    Metrics.reset()
+
+    handler = sharded_handler()
+
+    ticker_prices = {market: Decimal('110') for market in MARKETS}
+    ticker_prices['BTC-EUR'] = Decimal('80')
+
+    assert handler.update_alerts(ticker_prices)
+    assert handler.wait(60)
+
+    assert Metrics.get_value('alerts_evaluated_total') == len(MARKETS)
+    assert Metrics.get_value('alerts_hit_total') == 1
+
+    handler.close()
+
+    alerts = {alert.market: alert for shard in range(2) for alert in load_shard(alerts_file_path, shard, 2)}
+
+    assert alerts['BTC-EUR'].status == Alert.STATUS_HIT
+    assert alerts['ETH-EUR'].trailing_price == Decimal('99')
+
+
+def test_dead_shard_is_restarted(sharded_handler):
+    handler = sharded_handler()
+
+    handler._processes[1].terminate()
+    handler._processes[1].join()
+
+    assert handler.update_alerts({market: Decimal('105') for market in MARKETS})
+    assert handler.wait(60)
+    assert handler._processes[1].is_alive()
+
+
+def test_busy_shard_skips_to_latest_snapshot():
+    messages = queue.Queue()
+
+    for message in [
+        (AlertShard.MESSAGE_PRICES, 1, {'BTC-EUR': Decimal('1')}),
+        (AlertShard.MESSAGE_ALERTS, 1, []),
+        (AlertShard.MESSAGE_PRICES, 2, {'BTC-EUR': Decimal('2')}),
+        (AlertShard.MESSAGE_SAVE,),
+        (AlertShard.MESSAGE_PRICES, 3, {'BTC-EUR': Decimal('3')})
+    ]:
+        messages.put(message)
+
+    shard_messages, skipped = AlertShard(_messages=messages).get_messages()
+
+    assert [message[0] for message in shard_messages] == [AlertShard.MESSAGE_ALERTS, AlertShard.MESSAGE_SAVE, AlertShard.MESSAGE_PRICES]
+    assert shard_messages[-1][1] == 3
+    assert skipped == 2
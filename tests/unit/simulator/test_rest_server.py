@@ -0,0 +1,85 @@
+from decimal import Decimal
+
+import pytest
+import requests
+
+from models.Alert import Alert
+from models.Metrics import Metrics
+from models.clients.Bitvavo import BitvavoClient
+from models.clients.Cryptowatch import CryptowatchClient
+from simulator.rest_server import FakeRestServer
+
+market = 'ETH-EUR'
+
+
+def get_client(server, **kwargs):
+    return BitvavoClient(api_key='key', api_secret='secret', rest_url=server.get_bitvavo_url(), **kwargs)
+
+
+def test_ticker_prices_follow_price_path(rest_server):
+    client = get_client(rest_server)
+
+    for price in ['1000', '1100', '950', '950']:
+        client.reset_responses()
+
+        assert client.get_ticker_prices() == {market: Decimal(price)}
+
+    backup_client = CryptowatchClient(base_url=rest_server.get_cryptowatch_url(), _coin='eth', _currency='eur')
+
+    assert backup_client.get_ticker_price() == Decimal('950')
+
+
+def test_hit_alert_sells_on_simulator(rest_server, monkeypatch, create_alert, create_alert_handler):
+    monkeypatch.setenv('BITVAVO_REST_URL', rest_server.get_bitvavo_url())
+    monkeypatch.setenv('CRYPTOWATCH_URL', rest_server.get_cryptowatch_url())
+    monkeypatch.setenv('APIKEY', 'key')
+    monkeypatch.setenv('APISECRET', 'secret')
+
+    ah = create_alert_handler(
+        alerts=[create_alert(amount=Decimal('0.5'), actions=[Alert.ACTION_SELL_ASSET])],
+        _client=BitvavoClient()
+    )
+
+    for idx in range(3):
+        ah._client.reset_responses()
+        ah.update_alerts()
+
+    assert ah.alerts[0].status == Alert.STATUS_HIT
+    assert ah.alerts[0].price == Decimal('950')
+    assert len(rest_server.orders) == 1
+    assert rest_server.orders[0][1] == {'market': market, 'side': 'sell', 'orderType': 'market', 'amount': '0.5'}
+
+
+def test_rate_limit_response(rest_server):
+    rest_server.rate_limit = 1
+    Metrics.reset()
+
+    client = get_client(rest_server, market=market)
+
+    assert 'orderId' in client.place_order(BitvavoClient.SIDE_SELL, BitvavoClient.ORDER_TYPE, '1')
+    assert client.rateLimitRemaining == 0
+
+    # budget of the window is used up by the response headers, the order is not sent into a 429
+
+    assert client.place_order(BitvavoClient.SIDE_SELL, BitvavoClient.ORDER_TYPE, '1') == {'error': BitvavoClient.ERROR_RATE_LIMIT_BUDGET}
+    assert Metrics.get_value('errors_total', component='bitvavo') == 1
+    assert [request[3] for request in rest_server.requests] == [200]
+
+
+def test_timeout(rest_server, monkeypatch):
+    monkeypatch.setenv('HTTP_READ_TIMEOUT', '0.2')
+
+    rest_server.timeout_ratio = 1.0
+    rest_server.timeout_seconds = 1.0
+
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        get_client(rest_server).get_ticker_prices()
+
+
+def test_latency_distributions():
+    for distribution in [FakeRestServer.LATENCY_FIXED, FakeRestServer.LATENCY_UNIFORM, FakeRestServer.LATENCY_EXPONENTIAL, FakeRestServer.LATENCY_LOGNORMAL]:
+        server = FakeRestServer(latency=0.01, latency_distribution=distribution)
+        latencies = [server.get_latency() for idx in range(1000)]
+
+        assert min(latencies) >= 0
+        assert 0.005 < sum(latencies) / len(latencies) < 0.02